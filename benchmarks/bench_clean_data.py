@@ -0,0 +1,108 @@
+import io
+import json
+import os
+import random
+import re
+import sys
+import time
+from src.extractors import clean_data
+
+# Usage: python -m benchmarks.bench_clean_data [articles.json]
+# Compares the cleaning engine against the original per-call logic and
+# checks that the output is byte-identical.
+
+def reference_clean_text(text):
+    """
+    The original clean_text_logic, kept verbatim as the ground truth.
+    """
+    if not text:
+        return ""
+    text = re.sub(r'(?:\+91|91)?[\s-]?\d{5}[\s-]?\d{5}', '', text)
+    text = re.sub(r'(?i)(meeting\s?id|passcode|zoom)\s?[:\-]?\s?\d+', '', text)
+    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+    for phrase in clean_data.NOISE_PHRASES:
+        text = text.replace(phrase, "")
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    return text.strip()
+
+def reference_output(raw_data):
+    cleaned = []
+    for entry in raw_data:
+        content = reference_clean_text(entry.get('content', ''))
+        if len(content) < 50:
+            continue
+        cleaned.append({
+            "title": entry.get('title'),
+            "link": entry.get('link'),
+            "date": entry.get('date'),
+            "content": content
+        })
+    f = io.StringIO()
+    json.dump(cleaned, f, indent=4, ensure_ascii=False)
+    return f.getvalue()
+
+def engine_output(raw_data, workers):
+    f = io.StringIO()
+    kept = (e for e in clean_data.clean_entries(raw_data, workers) if e is not None)
+    clean_data.write_json_array(kept, f)
+    return f.getvalue()
+
+def synthetic_corpus(n=2000, seed=7):
+    """
+    Articles sprinkled with every kind of noise the cleaner removes.
+    """
+    rng = random.Random(seed)
+    words = "Sri Ramanuja Acharya divya desam pasuram Perumal Thayar kainkaryam upanyasam".split()
+    noise = clean_data.NOISE_PHRASES + [
+        "Call +91 98450 12345", "Meeting ID: 8812345", "https://example.org/a?b=c", "\n\n   \n\n",
+    ]
+    corpus = []
+    for i in range(n):
+        parts = []
+        for _ in range(rng.randint(50, 600)):
+            parts.append(rng.choice(noise) if rng.random() < 0.03 else rng.choice(words))
+        corpus.append({"title": f"Article {i}", "link": f"https://example.org/{i}", "date": "", "content": " ".join(parts)})
+    # A few that clean down to nothing
+    corpus += [{"title": "Empty", "link": "x", "date": "", "content": "WhatsApp Contact 98450 12345"}] * 5
+    # Overlapping phrases, and phrases that only appear once another is removed
+    tail = " ".join(words * 8)
+    corpus += [
+        {"title": "Overlap", "link": "y", "date": "", "content": f"WhatsApp Contact details to purchase the book. {tail}"},
+        {"title": "Composed", "link": "z", "date": "", "content": f"WhatsApp Contwritten by Sri APN Swamiact now. {tail}"},
+        {"title": "Nested", "link": "w", "date": "", "content": f"Download and WhatsApp ContactRead it. {tail}"},
+    ]
+    return corpus
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'r', encoding='utf-8') as f:
+            raw_data = json.load(f)
+        print(f"📂 Loaded {len(raw_data)} articles from '{sys.argv[1]}'.")
+    else:
+        raw_data = synthetic_corpus()
+        print(f"🧪 Using {len(raw_data)} synthetic articles.")
+    n = len(raw_data)
+
+    expected, t_ref = timed(reference_output, raw_data)
+    single, t_single = timed(engine_output, raw_data, 1)
+    workers = os.cpu_count() or 1
+    pooled, t_pool = timed(engine_output, raw_data, workers)
+
+    print("-" * 60)
+    print(f"{'engine':<22}{'total (s)':>12}{'per article (µs)':>18}{'articles/s':>12}")
+    for name, t in [("reference", t_ref), ("compiled, 1 proc", t_single), (f"compiled, pool x{workers}", t_pool)]:
+        print(f"{name:<22}{t:>12.3f}{t / n * 1e6:>18.1f}{n / t:>12.0f}")
+    print("-" * 60)
+
+    identical = expected == single == pooled
+    print(f"{'✅' if identical else '❌'} Output byte-identical to the original logic: {identical}")
+    if not identical:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
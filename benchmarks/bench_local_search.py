@@ -0,0 +1,57 @@
+import random
+import sys
+import time
+import numpy as np
+from qdrant_client import QdrantClient
+from src import config
+from src.local_vectors import LocalVectorIndex
+
+# Usage: python -m benchmarks.bench_local_search [n_queries] [k]
+# Compares the remote query_points path with the local memory-mapped snapshot:
+# latency (p50/p99) and recall@k of the local results against Qdrant's.
+# Queries are stored vectors with a little noise, so no embedding calls are made.
+
+def percentile(values, p):
+    return float(np.percentile(np.asarray(values) * 1000, p))
+
+def main():
+    n_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    client = QdrantClient(url=config.QDRANT_URL, api_key=config.QDRANT_API_KEY)
+    print("🔄 Syncing local snapshot...")
+    start = time.perf_counter()
+    local = LocalVectorIndex()
+    added, removed = local.sync(client)
+    print(f"   +{added} / -{removed} in {time.perf_counter() - start:.1f}s ({len(local)} vectors, {local.dtype.name}).")
+    if not len(local):
+        print("❌ Collection is empty.")
+        return
+
+    rng = np.random.default_rng(0)
+    rows = random.Random(0).sample(range(len(local)), min(n_queries, len(local)))
+    matrix = np.asarray(local.matrix, dtype=np.float32)
+    queries = [matrix[r] + rng.normal(0, 0.01, matrix.shape[1]).astype(np.float32) for r in rows]
+
+    remote_times, local_times, recalls = [], [], []
+    for q in queries:
+        t = time.perf_counter()
+        remote_hits = client.query_points(collection_name=config.COLLECTION_NAME, query=q.tolist(), limit=k).points
+        remote_times.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        local_hits = local.search(q, k)
+        local_times.append(time.perf_counter() - t)
+
+        expected = {h.id for h in remote_hits}
+        recalls.append(len(expected & {h.id for h in local_hits}) / max(1, len(expected)))
+
+    print("-" * 60)
+    print(f"{'backend':<10}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    print(f"{'qdrant':<10}{percentile(remote_times, 50):>12.2f}{percentile(remote_times, 99):>12.2f}")
+    print(f"{'local':<10}{percentile(local_times, 50):>12.2f}{percentile(local_times, 99):>12.2f}")
+    print("-" * 60)
+    print(f"📏 recall@{k} of local vs qdrant over {len(queries)} queries: {np.mean(recalls):.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.embedding_batcher import QueryBatcher
+
+# Usage: python -m benchmarks.bench_query_batching [n_queries] [concurrency] [max_wait_ms]
+# Fires concurrent embed_query calls at a stub embedder (fixed per-call latency)
+# with and without the coalescer: API calls made, latency p50/p99 and the
+# batch-size distribution. No network calls are made.
+
+# --- CONFIGURATION ---
+CALL_LATENCY = 0.08      # seconds per API call
+PER_TEXT_LATENCY = 0.001
+
+class StubEmbedder:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def _call(self, n):
+        with self.lock:
+            self.calls += 1
+        time.sleep(CALL_LATENCY + PER_TEXT_LATENCY * n)
+
+    def embed_query(self, text):
+        self._call(1)
+        return [float(len(text))]
+
+    def embed_documents(self, texts, task_type=None):
+        self._call(len(texts))
+        return [[float(len(t))] for t in texts]
+
+def run(embedder, n_queries, concurrency):
+    def one(i):
+        start = time.perf_counter()
+        embedder.embed_query(f"question {i}")
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = np.array(list(pool.map(one, range(n_queries)))) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+def main():
+    n_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    max_wait_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    direct = StubEmbedder()
+    p50, p99 = run(direct, n_queries, concurrency)
+    print("-" * 60)
+    print(f"{'mode':<10}{'API calls':>12}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    print(f"{'direct':<10}{direct.calls:>12}{p50:>12.1f}{p99:>12.1f}")
+
+    stub = StubEmbedder()
+    batcher = QueryBatcher(stub, max_batch=32, max_wait=max_wait_ms / 1000)
+    p50, p99 = run(batcher, n_queries, concurrency)
+    print(f"{'batched':<10}{stub.calls:>12}{p50:>12.1f}{p99:>12.1f}")
+    print("-" * 60)
+    stats = batcher.stats()
+    print(f"📦 Batch sizes: {stats['batch_sizes']} (mean {stats['mean_batch']:.1f})")
+    print(f"⏳ Added wait: p50 {stats['wait_p50_ms']:.2f} ms / p99 {stats['wait_p99_ms']:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import json
+import random
+import sys
+import time
+import numpy as np
+from src import config
+from src.chunk_store import ChunkStore
+from src.local_vectors import LocalVectorIndex
+
+# Usage: python -m benchmarks.bench_slim_payloads [n_queries] [k]
+# Same queries two ways: full payloads from Qdrant vs IDs + scores from Qdrant
+# with text resolved from the local chunk store (chunks missing there are fetched
+# with retrieve, as hybrid_search does). Reports latency p50/p99 and response KB
+# per query: every returned point (id, score, payload) serialized as the REST API's
+# JSON, including the retrieve fallback. Needs the chunk store (run ingestion or
+# utils/build_lexical_index.py first); query vectors come from the local snapshot.
+
+def percentile(values, p):
+    return float(np.percentile(np.asarray(values) * 1000, p))
+
+def response_bytes(points):
+    return len(json.dumps([p.model_dump(mode="json", exclude_none=True) for p in points],
+                          ensure_ascii=False).encode("utf-8"))
+
+def main():
+    n_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    client = config.get_qdrant_client()
+    store = ChunkStore()
+    if not len(store):
+        print("❌ Chunk store is empty. Run ingestion or utils/build_lexical_index.py first.")
+        return
+    local = LocalVectorIndex()
+    local.sync(client)
+    matrix = np.asarray(local.matrix, dtype=np.float32)
+    rows = random.Random(0).sample(range(len(matrix)), min(n_queries, len(matrix)))
+
+    full_times, slim_times, full_bytes, slim_bytes, misses = [], [], [], [], 0
+    for r in rows:
+        q = matrix[r].tolist()
+        t = time.perf_counter()
+        full = client.query_points(collection_name=config.COLLECTION_NAME, query=q, limit=k).points
+        full_times.append(time.perf_counter() - t)
+        full_bytes.append(response_bytes(full))
+
+        t = time.perf_counter()
+        slim = client.query_points(collection_name=config.COLLECTION_NAME, query=q, limit=k, with_payload=False).points
+        wire = response_bytes(slim)
+        missing = store.fill(slim)
+        if missing:
+            fetched = client.retrieve(config.COLLECTION_NAME, ids=missing, with_payload=True)
+            wire += response_bytes(fetched)
+            misses += len(missing)
+        slim_times.append(time.perf_counter() - t)
+        slim_bytes.append(wire)
+
+    print("-" * 60)
+    print(f"{'mode':<8}{'p50 (ms)':>12}{'p99 (ms)':>12}{'response KB/query':>20}")
+    print(f"{'full':<8}{percentile(full_times, 50):>12.2f}{percentile(full_times, 99):>12.2f}{np.mean(full_bytes) / 1024:>20.2f}")
+    print(f"{'slim':<8}{percentile(slim_times, 50):>12.2f}{percentile(slim_times, 99):>12.2f}{np.mean(slim_bytes) / 1024:>20.2f}")
+    print("-" * 60)
+    print(f"🗃️  {misses} hits were missing from the chunk store and fetched from Qdrant (counted above).")
+
+if __name__ == "__main__":
+    main()
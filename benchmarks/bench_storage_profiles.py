@@ -0,0 +1,106 @@
+import os
+import random
+import sys
+import time
+import numpy as np
+from qdrant_client import QdrantClient, models
+from src import config
+from src.local_vectors import LocalVectorIndex
+from src.storage_profiles import PROFILES, vectors_config, quantization_config, search_params, truncate
+
+# Usage: python -m benchmarks.bench_storage_profiles [n_queries] [k] [profile ...]
+# Loads every vector of the live collection (via the local snapshot), then for
+# each storage profile builds a scratch collection on BENCH_QDRANT_URL (a local
+# Qdrant, e.g. docker) and reports estimated RAM, p50/p99 latency and recall@k
+# against exact full-precision search. No embedding calls are made.
+
+# --- CONFIGURATION ---
+BENCH_QDRANT_URL = os.getenv("BENCH_QDRANT_URL", "http://localhost:6333")
+HNSW_M = 16
+
+def percentile(values, p):
+    return float(np.percentile(np.asarray(values) * 1000, p))
+
+def estimate_ram(profile, n, dim):
+    """
+    Rough resident bytes: originals (unless on disk) + quantized copy + HNSW links.
+    """
+    ram = 0 if profile["on_disk"] else n * dim * 4
+    if profile["quantization"] == "scalar":
+        ram += n * dim
+    elif profile["quantization"] == "binary":
+        ram += n * dim // 8
+    return ram + n * HNSW_M * 2 * 4
+
+def build_collection(client, name, profile, vectors, batch_size=256):
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=vectors_config(profile, vectors.shape[1]),
+        quantization_config=quantization_config(profile),
+    )
+    for i in range(0, len(vectors), batch_size):
+        client.upsert(
+            collection_name=name,
+            points=models.Batch(ids=list(range(i, min(i + batch_size, len(vectors)))),
+                                vectors=vectors[i:i + batch_size].tolist()),
+        )
+    # Wait for the HNSW graph / quantized copy so latencies reflect the indexed state
+    while client.get_collection(name).status != models.CollectionStatus.GREEN:
+        time.sleep(0.5)
+
+def main():
+    n_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    names = sys.argv[3:] or list(PROFILES)
+
+    live = QdrantClient(url=config.QDRANT_URL, api_key=config.QDRANT_API_KEY)
+    print("🔄 Syncing local snapshot...")
+    local = LocalVectorIndex()
+    local.sync(live)
+    if not len(local):
+        print("❌ Collection is empty.")
+        return
+    base = np.asarray(local.matrix, dtype=np.float32)
+    full_dim = base.shape[1]
+
+    # Queries are stored vectors with a little noise; ground truth is exact full-precision top-k
+    rng = np.random.default_rng(0)
+    rows = random.Random(0).sample(range(len(base)), min(n_queries, len(base)))
+    queries = truncate(base[rows] + rng.normal(0, 0.01, (len(rows), full_dim)), full_dim)
+    truth = [set(np.argsort(-(base @ q))[:k].tolist()) for q in queries]
+
+    bench = QdrantClient(url=BENCH_QDRANT_URL, timeout=120)
+    results = []
+    for name in names:
+        profile = PROFILES[name]
+        dim = profile["dim"] or full_dim
+        if dim > full_dim:
+            print(f"⏭️  Skipping '{name}': collection only has {full_dim} dimensions.")
+            continue
+        collection = f"{config.COLLECTION_NAME}_bench_{name}"
+        print(f"🏗️  Building '{collection}' ({len(base)} x {dim})...")
+        build_collection(bench, collection, profile, truncate(base, dim))
+
+        params = search_params(profile)
+        times, recalls = [], []
+        for q, expected in zip(truncate(queries, dim), truth):
+            t = time.perf_counter()
+            hits = bench.query_points(collection_name=collection, query=q.tolist(), limit=k,
+                                      search_params=params).points
+            times.append(time.perf_counter() - t)
+            recalls.append(len(expected & {h.id for h in hits}) / k)
+        results.append((name, estimate_ram(profile, len(base), dim), times, np.mean(recalls)))
+        bench.delete_collection(collection)
+
+    print("-" * 72)
+    print(f"{'profile':<16}{'est. RAM (MB)':>15}{'p50 (ms)':>12}{'p99 (ms)':>12}{f'recall@{k}':>12}")
+    for name, ram, times, recall in results:
+        print(f"{name:<16}{ram / 1024 / 1024:>15.1f}{percentile(times, 50):>12.2f}"
+              f"{percentile(times, 99):>12.2f}{recall:>12.3f}")
+    print("-" * 72)
+    print(f"📏 Recall is against exact full-precision search over {len(queries)} queries.")
+
+if __name__ == "__main__":
+    main()
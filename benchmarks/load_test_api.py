@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+import numpy as np
+
+# Stub backends only: no real Gemini or Qdrant calls are made
+os.environ.setdefault("GOOGLE_API_KEY", "stub")
+os.environ.setdefault("QDRANT_URL", "http://stub")
+os.environ.setdefault("QDRANT_API_KEY", "stub")
+
+import httpx
+import uvicorn
+from langchain_core.messages import AIMessage, AIMessageChunk
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+from src import config
+from src.api import Resources, create_app
+from src.engine import RAGEngine
+from src.prompts import ANSWER_TEMPLATE
+from src.query_cache import RetrievalCache
+
+# Usage: python -m benchmarks.load_test_api [requests_per_level] [concurrency ...]
+# Starts the API on a local port with stub embedder / LLM (fixed sleeps standing
+# in for network latency) and an in-memory Qdrant, then fires /chat requests at
+# increasing concurrency. Throughput should grow with concurrency because every
+# stage awaits instead of blocking a thread.
+
+# --- CONFIGURATION ---
+PORT = 8765
+DIM = 64
+N_POINTS = 2000
+EMBED_LATENCY = 0.05
+LLM_FIRST_TOKEN = 0.3
+LLM_TOKEN_INTERVAL = 0.01
+LLM_TOKENS = 40
+
+class StubEmbedder:
+    async def aembed_query(self, text):
+        await asyncio.sleep(EMBED_LATENCY)
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return rng.normal(size=DIM).tolist()
+
+class StubLLM:
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(LLM_FIRST_TOKEN)
+        return AIMessage(content="rewritten question")
+
+    async def astream(self, prompt):
+        await asyncio.sleep(LLM_FIRST_TOKEN)
+        for i in range(LLM_TOKENS):
+            await asyncio.sleep(LLM_TOKEN_INTERVAL)
+            yield AIMessageChunk(content=f"tok{i} ")
+
+async def build_resources():
+    client = AsyncQdrantClient(location=":memory:")
+    await client.create_collection(
+        collection_name=config.COLLECTION_NAME,
+        vectors_config=models.VectorParams(size=DIM, distance=models.Distance.COSINE),
+    )
+    vectors = np.random.default_rng(0).normal(size=(N_POINTS, DIM))
+    await client.upsert(
+        collection_name=config.COLLECTION_NAME,
+        points=[
+            models.PointStruct(id=i, vector=vectors[i].tolist(), payload={
+                "page_content": f"Chunk {i} about the acharyas. " * 20,
+                "metadata": {"source": f"https://example.org/{i // 4}", "title": f"Article {i // 4}"},
+            })
+            for i in range(N_POINTS)
+        ],
+    )
+    # The sync client only serves the periodic version check (no version collection: always 0),
+    # and the cache starts without a lexical index, so every request takes the dense path
+    engine = RAGEngine(
+        QdrantClient(location=":memory:"), StubLLM(), StubEmbedder(),
+        RetrievalCache(lexical_path=os.path.join("data", "load_test_no_lexical.json")), ANSWER_TEMPLATE,
+        aclient=client,
+    )
+    return Resources(engine)
+
+async def one_request(http, i):
+    start = time.perf_counter()
+    first = None
+    async with http.stream("POST", f"http://127.0.0.1:{PORT}/chat", json={"question": f"question {i}", "history": []}) as r:
+        async for line in r.aiter_lines():
+            if first is None and line == "event: token":
+                first = time.perf_counter() - start
+    return time.perf_counter() - start, first
+
+async def run_level(http, concurrency, n_requests):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(i):
+        async with semaphore:
+            # Unique across levels, so no level is served from the previous one's caches
+            return await one_request(http, f"{concurrency}-{i}")
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(limited(i) for i in range(n_requests)))
+    elapsed = time.perf_counter() - start
+    totals = np.array([r[0] for r in results]) * 1000
+    firsts = np.array([r[1] for r in results]) * 1000
+    return n_requests / elapsed, np.percentile(totals, 50), np.percentile(totals, 99), np.percentile(firsts, 50)
+
+async def main():
+    # One structured log line per request would drown the table
+    logging.getLogger("atul.rag").setLevel(logging.WARNING)
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    levels = [int(c) for c in sys.argv[2:]] or [1, 4, 16, 64]
+
+    app = create_app(await build_resources())
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=PORT, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    print("-" * 66)
+    print(f"{'concurrency':<13}{'req/s':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}{'TTFT p50 (ms)':>16}")
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        for concurrency in levels:
+            rps, p50, p99, ttft = await run_level(http, concurrency, max(n_requests, concurrency))
+            print(f"{concurrency:<13}{rps:>10.1f}{p50:>12.1f}{p99:>12.1f}{ttft:>16.1f}")
+    print("-" * 66)
+
+    server.should_exit = True
+    await task
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,229 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+import numpy as np
+
+# Usage: python -m benchmarks.offline_suite [--docs 300] [--queries 200] [--embed-ms 20] [--llm-first-ms 200]
+#                                           [--llm-token-ms 5] [--error-rate 0.0] [--compare old.json]
+# Runs fully offline: fake embeddings / LLM (FAKE_MODELS) and an in-memory Qdrant
+# (QDRANT_LOCATION), inside a scratch directory with a synthetic corpus. Measures
+# ingest throughput through ingest.run_pipeline and upload_chunks, and end-to-end
+# query latency through the chat pipeline (RAGEngine). Results are saved as JSON
+# under benchmarks/results/ so runs can be compared across commits.
+
+# --- CONFIGURATION ---
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+WORDS = (
+    "ramanuja alwar acharya perumal thayar divya prabandham pasuram sloka kainkaryam saranagati "
+    "bhakti prapatti vedanta visishtadvaita srirangam tirumala kanchi utsavam thiruppavai "
+    "margazhi archa avatara namaskaram sampradayam guru parampara upanyasam anushtanam"
+).split()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline ingest + query benchmark")
+    parser.add_argument("--docs", type=int, default=300)
+    parser.add_argument("--words-per-doc", type=int, default=600)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--embed-ms", type=float, default=20.0, help="fake embedding latency per call")
+    parser.add_argument("--llm-first-ms", type=float, default=200.0, help="fake LLM time to first token")
+    parser.add_argument("--llm-token-ms", type=float, default=5.0, help="fake LLM gap between tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake calls failing with 429")
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--compare", default=None, help="earlier results JSON to diff against")
+    return parser.parse_args()
+
+def configure_environment(args):
+    # Must happen before anything imports src.config
+    os.environ.update({
+        "QDRANT_LOCATION": ":memory:",
+        "FAKE_MODELS": "1",
+        "FAKE_EMBED_DIM": str(args.dim),
+        "FAKE_EMBED_LATENCY_MS": str(args.embed_ms),
+        "FAKE_LLM_FIRST_TOKEN_MS": str(args.llm_first_ms),
+        "FAKE_LLM_TOKEN_MS": str(args.llm_token_ms),
+        "FAKE_429_RATE": str(args.error_rate),
+        # Measure the pipeline, not the cache or the production quota
+        "EMBEDDING_CACHE_MAX_MB": "0",
+        "EMBED_RPM": "1000000",
+        "EMBED_TPM": "1000000000",
+    })
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def percentiles(seconds):
+    if not seconds:
+        return {"p50_ms": None, "p99_ms": None}
+    ms = np.asarray(seconds) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 2), "p99_ms": round(float(np.percentile(ms, 99)), 2)}
+
+# 1. CORPUS
+def make_corpus(n_docs, words_per_doc, seed=0):
+    rng = random.Random(seed)
+    articles = []
+    for i in range(n_docs):
+        # Shared vocabulary plus a few words unique to this article, so retrieval has something to find
+        own = [f"{rng.choice(WORDS)[:4]}{i}{k}" for k in range(20)]
+        body = " ".join(rng.choice(own if rng.random() < 0.3 else WORDS) for _ in range(words_per_doc))
+        articles.append({"title": f"Article {i} on {rng.choice(WORDS)}", "link": f"https://example.org/{i}", "content": body})
+    os.makedirs("data", exist_ok=True)
+    with open(os.path.join("data", "cleaned_articles.json"), 'w', encoding='utf-8') as f:
+        json.dump(articles, f)
+    return articles
+
+# 2. INGEST
+def bench_ingest():
+    import ingest
+    from src import config
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ingest.run_pipeline()
+    seconds = time.perf_counter() - start
+    chunks = config.get_qdrant_client().count(config.COLLECTION_NAME).count
+
+    # Second run: nothing changed, so this is the cost of the idempotency scan alone
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ingest.run_pipeline()
+    noop_seconds = time.perf_counter() - start
+    return {
+        "chunks": chunks,
+        "seconds": round(seconds, 3),
+        "chunks_per_sec": round(chunks / seconds, 1),
+        "noop_seconds": round(noop_seconds, 3),
+    }
+
+def bench_upload(articles):
+    from langchain_core.documents import Document
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from src import config
+    from src.database import upload_chunks
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=config.CHUNK_SIZE, chunk_overlap=config.CHUNK_OVERLAP)
+    docs = [Document(page_content=a["content"], metadata={"source": a["link"], "title": a["title"]}) for a in articles]
+    chunks = splitter.split_documents(docs)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        saved = upload_chunks(chunks, ids=[str(uuid.uuid4()) for _ in chunks])
+    seconds = time.perf_counter() - start
+    return {"chunks": saved, "seconds": round(seconds, 3), "chunks_per_sec": round(saved / seconds, 1)}
+
+# 3. QUERIES
+def bench_queries(articles, n_queries, seed=1):
+    from src import config
+    from src.engine import RAGEngine
+    from src.prompts import ANSWER_TEMPLATE
+    from src.query_cache import RetrievalCache
+    from src.telemetry import METRICS
+
+    logging.getLogger("atul.rag").setLevel(logging.WARNING)
+    engine = RAGEngine(
+        config.get_qdrant_client(), config.get_llm(), config.get_embeddings(),
+        RetrievalCache(), ANSWER_TEMPLATE,
+    )
+    rng = random.Random(seed)
+    latencies, first_tokens, errors, found = [], [], {}, 0
+    for i in range(n_queries):
+        article = rng.choice(articles)
+        words = article["content"].split()
+        offset = rng.randrange(max(1, len(words) - 12))
+        # Unique questions, so the result cache never answers for the pipeline
+        question = f"{' '.join(words[offset:offset + 12])} ({i})"
+        start = time.perf_counter()
+        try:
+            turn = engine.ask(question, [])
+            for _ in turn:
+                pass
+        except Exception as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            continue
+        latencies.append(time.perf_counter() - start)
+        first_tokens.append(turn.stream.first_token)
+        found += article["link"] in turn.sources
+
+    answered = len(latencies)
+    return {
+        "queries": n_queries,
+        "errors": errors,
+        **percentiles(latencies),
+        "first_token": percentiles(first_tokens),
+        "source_hit_rate": round(found / answered, 3) if answered else None,
+        "stages": METRICS.summary(),
+    }
+
+# 4. REPORT
+def compare(current, previous_path):
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    print(f"\n📈 Compared with {previous.get('commit')} ({os.path.basename(previous_path)}):")
+    rows = [
+        ("ingest chunks/s", ("ingest", "chunks_per_sec"), True),
+        ("upload chunks/s", ("upload", "chunks_per_sec"), True),
+        ("query p50 ms", ("query", "p50_ms"), False),
+        ("query p99 ms", ("query", "p99_ms"), False),
+    ]
+    for label, (section, key), higher_is_better in rows:
+        old = previous.get(section, {}).get(key)
+        new = current[section][key]
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        better = change > 0 if higher_is_better else change < 0
+        mark = "✅" if better or abs(change) < 2 else "⚠️ "
+        print(f"   {mark} {label:<16} {old:>10} -> {new:>10} ({change:+.1f}%)")
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    out_path = args.out or os.path.join(RESULTS_DIR, f"offline-{git_commit()}-{int(time.time())}.json")
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    workdir = tempfile.mkdtemp(prefix="atul-bench-")
+    os.chdir(workdir)   # every data/ path below is scratch
+    sys.path.insert(0, REPO_ROOT)
+    print(f"🧪 Offline benchmark in {workdir}")
+
+    articles = make_corpus(args.docs, args.words_per_doc)
+    print(f"📄 Corpus: {len(articles)} synthetic articles.")
+    ingest_result = bench_ingest()
+    print(f"📥 run_pipeline: {ingest_result['chunks']} chunks at {ingest_result['chunks_per_sec']} chunks/s "
+          f"(no-op re-run {ingest_result['noop_seconds']}s).")
+    upload_result = bench_upload(articles)
+    print(f"📤 upload_chunks: {upload_result['chunks']} chunks at {upload_result['chunks_per_sec']} chunks/s.")
+    query_result = bench_queries(articles, args.queries)
+    print(f"💬 Queries: p50 {query_result['p50_ms']} ms / p99 {query_result['p99_ms']} ms "
+          f"({sum(query_result['errors'].values())} errors, source hit rate {query_result['source_hit_rate']}).")
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "params": vars(args),
+        "ingest": ingest_result,
+        "upload": upload_result,
+        "query": query_result,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to {out_path}")
+    if compare_path:
+        compare(results, compare_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+from qdrant_client import QdrantClient, models
+from src import config
+from src.local_vectors import LocalVectorIndex
+from src.storage_profiles import vectors_config, quantization_config, hnsw_config, search_params
+
+# Usage: python -m benchmarks.tune_search golden.jsonl [--m 8 16 32] [--ef-construct 64 100 200]
+#                                         [--hnsw-ef 16 32 64 128] [--k 3 4 5 8] [--target-recall 0.9]
+# golden.jsonl holds one {"question": "...", "sources": ["https://...", ...]} per line.
+# Copies every vector of the live collection (via the local snapshot) into scratch
+# collections on BENCH_QDRANT_URL, one per (m, ef_construct), then sweeps exact vs.
+# approximate search at each hnsw_ef. Reports recall@k of the expected source URLs
+# (dense search only; BM25 fusion is not part of the sweep) against p50/p99 latency,
+# and prints the .env lines for the cheapest setting that reaches the target recall.
+
+# --- CONFIGURATION ---
+BENCH_QDRANT_URL = os.getenv("BENCH_QDRANT_URL", "http://localhost:6333")
+REPEATS = 3   # each question is timed this many times
+INDEX_TIMEOUT = 600   # seconds to wait for a scratch collection's HNSW graph
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="HNSW / search-parameter sweep against a golden set")
+    parser.add_argument("golden")
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--ef-construct", type=int, nargs="+", default=[64, 100, 200])
+    parser.add_argument("--hnsw-ef", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 4, 5, 8])
+    parser.add_argument("--target-recall", type=float, default=0.9)
+    return parser.parse_args()
+
+def load_golden(path):
+    golden = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                golden.append((record["question"], set(record["sources"])))
+    return golden
+
+def percentile(values, p):
+    return float(np.percentile(np.asarray(values) * 1000, p))
+
+def build_collection(client, name, m, ef_construct, vectors, batch_size=256, wait_for_index=True):
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=vectors_config(config.STORAGE_PROFILE, vectors.shape[1]),
+        quantization_config=quantization_config(config.STORAGE_PROFILE),
+        hnsw_config=hnsw_config(m, ef_construct),
+        # Below the default indexing threshold (~3k chunks at 768 dims) Qdrant never builds
+        # the graph and every row would time brute-force search. 1 KB indexes every
+        # segment (0 would disable indexing altogether)
+        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=1),
+    )
+    for i in range(0, len(vectors), batch_size):
+        client.upsert(
+            collection_name=name,
+            points=models.Batch(ids=list(range(i, min(i + batch_size, len(vectors)))),
+                                vectors=vectors[i:i + batch_size].tolist()),
+        )
+    if not wait_for_index:
+        return
+    # Wait until every vector is in the HNSW graph, so latencies reflect the indexed state
+    # (GREEN alone can mean "nothing left to optimize" with no graph at all)
+    deadline = time.monotonic() + INDEX_TIMEOUT
+    while True:
+        info = client.get_collection(name)
+        indexed = info.indexed_vectors_count or 0
+        if info.status == models.CollectionStatus.GREEN and indexed >= len(vectors):
+            return
+        if time.monotonic() > deadline:
+            print(f"   ⚠️ Only {indexed}/{len(vectors)} vectors indexed after {INDEX_TIMEOUT}s; "
+                  "approximate rows partly measure brute-force search.")
+            return
+        time.sleep(0.5)
+
+def run_queries(client, name, queries, golden, sources, ks, params):
+    """
+    Returns (latencies, {k: recall@k}). Recall@k is the share of each question's
+    expected sources that appear among the sources of its top-k chunks.
+    """
+    times = []
+    recalls = {k: [] for k in ks}
+    for q, (_, expected) in zip(queries, golden):
+        for _ in range(REPEATS):
+            t = time.perf_counter()
+            hits = client.query_points(collection_name=name, query=q, limit=max(ks), search_params=params).points
+            times.append(time.perf_counter() - t)
+        for k in ks:
+            found = {sources[h.id] for h in hits[:k]}
+            recalls[k].append(len(expected & found) / len(expected))
+    return times, {k: float(np.mean(r)) for k, r in recalls.items()}
+
+def recommend(results, target):
+    """
+    Cheapest (p99) setting reaching the target recall, preferring smaller k
+    (less context per prompt). Falls back to the best recall seen.
+    """
+    candidates = [(row, k) for row in results for k, recall in row["recall"].items() if recall >= target]
+    if candidates:
+        return min(candidates, key=lambda c: (c[0]["p99"], c[1]))
+    return max(((row, k) for row in results for k in row["recall"]), key=lambda c: c[0]["recall"][c[1]])
+
+def main():
+    args = parse_args()
+    golden = load_golden(args.golden)
+    if not golden:
+        print("❌ Golden set is empty.")
+        return
+
+    live = config.get_qdrant_client()
+    print("🔄 Syncing local snapshot...")
+    local = LocalVectorIndex()
+    local.sync(live)
+    if not len(local):
+        print("❌ Collection is empty.")
+        return
+    base = np.asarray(local.matrix, dtype=np.float32)
+    sources = [(p.get("metadata") or {}).get("source", "") for p in local.payloads]
+    missing = {s for _, expected in golden for s in expected} - set(sources)
+    if missing:
+        print(f"⚠️  {len(missing)} expected sources are not in the collection (they count as misses).")
+
+    # One embedding call per question; the query embeddings are cached on disk anyway
+    embedder = config.get_embeddings()
+    queries = [embedder.embed_query(question) for question, _ in golden]
+    ks = sorted(args.k)
+
+    local_bench = BENCH_QDRANT_URL == ":memory:"
+    if local_bench:
+        bench = QdrantClient(location=":memory:")   # smoke runs only: local mode has no HNSW graph
+    else:
+        bench = QdrantClient(url=BENCH_QDRANT_URL, timeout=120)
+    results = []
+    for m in args.m:
+        for ef_construct in args.ef_construct:
+            name = f"{config.COLLECTION_NAME}_tune_m{m}_ef{ef_construct}"
+            print(f"🏗️  Building '{name}' ({len(base)} x {base.shape[1]})...")
+            build_collection(bench, name, m, ef_construct, base, wait_for_index=not local_bench)
+            settings = [("exact", None, True)] + [(f"ef={ef}", ef, False) for ef in args.hnsw_ef]
+            for label, ef, exact in settings:
+                params = search_params(config.STORAGE_PROFILE, hnsw_ef=ef, exact=exact)
+                times, recall = run_queries(bench, name, queries, golden, sources, ks, params)
+                results.append({"m": m, "ef_construct": ef_construct, "search": label, "hnsw_ef": ef,
+                                "exact": exact, "p50": percentile(times, 50), "p99": percentile(times, 99),
+                                "recall": recall})
+            bench.delete_collection(name)
+
+    width = 44 + 12 * len(ks)
+    print("-" * width)
+    print(f"{'m':>4}{'ef_constr':>10}{'search':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}"
+          + "".join(f"{f'R@{k}':>12}" for k in ks))
+    for row in results:
+        print(f"{row['m']:>4}{row['ef_construct']:>10}{row['search']:>10}{row['p50']:>10.2f}{row['p99']:>10.2f}"
+              + "".join(f"{row['recall'][k]:>12.3f}" for k in ks))
+    print("-" * width)
+
+    best, k = recommend(results, args.target_recall)
+    reached = "reaches" if best["recall"][k] >= args.target_recall else "is the best available, below"
+    print(f"🏆 m={best['m']}, ef_construct={best['ef_construct']}, {best['search']}, k={k}: "
+          f"recall {best['recall'][k]:.3f} ({reached} the {args.target_recall} target), p99 {best['p99']:.2f} ms.")
+    print("📝 To apply, set in .env (the next ingest run updates the collection's HNSW graph):")
+    print(f"   HNSW_M={best['m']}")
+    print(f"   HNSW_EF_CONSTRUCT={best['ef_construct']}")
+    print(f"   HNSW_EF={best['hnsw_ef'] or 0}")
+    print(f"   SEARCH_EXACT={int(best['exact'])}")
+    print(f"   SEARCH_LIMIT={k}")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import warnings
-import time
-from qdrant_client import QdrantClient
+import uuid
 from langchain_core.prompts import PromptTemplate 
 from langchain_core.messages import HumanMessage, AIMessage # New imports for history
 from src import config
+from src.query_cache import RetrievalCache
+from src.api_client import APIStream, to_history
+from src.history import HistoryManager
+from src.engine import RAGEngine
 
 # Silence warnings
 warnings.filterwarnings("ignore")
@@ -11,16 +14,23 @@ warnings.filterwarnings("ignore")
 def start_chat():
     print("Atul")
     
-    # 1. Connect to Qdrant & AI
-    client = QdrantClient(url=config.QDRANT_URL, api_key=config.QDRANT_API_KEY)
-    llm = config.get_llm()
-    embedder = config.get_embeddings()
+    # 1. Connect to Qdrant & AI (or, with API_URL set, just talk to the API server)
+    llm = None
+    if config.API_URL:
+        print(f"🌐 Using API at {config.API_URL}")
+    else:
+        client = config.get_qdrant_client()
+        llm = config.get_llm()
+        embedder = config.get_embeddings()
+        # Lexical index, local vectors and chunk store per config, plus query caching
+        retrieval_cache = RetrievalCache()
 
     # 2. Setup Chat History
     # This list will store HumanMessage and AIMessage objects
     chat_history = [] 
-    # Limit to last 5 exchanges to avoid cluttering the brain
-    MAX_HISTORY = 10 
+    # The full history is kept; the prompt only ever sees a summary + the latest turns
+    history = HistoryManager(llm)
+    session_id = uuid.uuid4().hex
 
     # 3. Define the Prompt (Updated to include History)
     template = PromptTemplate.from_template("""
@@ -32,7 +42,7 @@ def start_chat():
     2. Keep the answer spiritual, respectful, and accurate.
 
     Conversation History:
-    {history}
+    {chat_history}
 
     Context from Articles:
     {context}
@@ -41,6 +51,10 @@ def start_chat():
     
     Answer:
     """)
+    if not config.API_URL:
+        engine = RAGEngine(
+            client, llm, embedder, retrieval_cache, template, empty_history="No previous history.",
+        )
 
     print("\n🙏 Namaskaram! I am ready. Ask me anything about the articles.")
     print("-" * 60)
@@ -55,6 +69,8 @@ def start_chat():
         if query.lower() in ["quit", "exit", "bye", "clear"]:
             if query.lower() == "clear":
                 chat_history = []
+                history = HistoryManager(llm)
+                session_id = uuid.uuid4().hex
                 print("✨ Chat history cleared!")
                 continue
             print("👋 Dhanyosmi!")
@@ -65,58 +81,33 @@ def start_chat():
             
         print("   Thinking...")
         try:
-            # --- STEP A: EMBEDDING & SEARCH ---
-            query_vector = embedder.embed_query(query)
-            hits = client.query_points(
-                collection_name=config.COLLECTION_NAME,
-                query=query_vector,
-                limit=4
-            ).points
-            
-            # --- STEP B: BUILD CONTEXT & LINKS ---
-            context_parts = []
-            current_sources = set()
-            
-            for hit in hits:
-                payload = hit.payload
-                text = payload.get('page_content', '')
-                metadata = payload.get('metadata', {})
-                link = metadata.get('source', 'Link not available')
-                title = metadata.get('title', 'Article')
-                
-                if text:
-                    context_parts.append(text)
-                    current_sources.add(f"{title}: {link}")
+            if config.API_URL:
+                # Thin client: the server retrieves, builds the prompt and streams the answer
+                stream = APIStream(config.API_URL, query, to_history(chat_history), session_id=session_id)
+            else:
+                # Search (dense + BM25), context packing and the prompt, all timed per stage
+                stream = engine.ask(query, chat_history, history)
 
-            context_text = "\n\n".join(context_parts)
-            
-            # --- STEP C: FORMAT HISTORY ---
-            # Turn history into a string the AI can read
-            history_str = ""
-            for msg in chat_history:
-                prefix = "User" if isinstance(msg, HumanMessage) else "Bot"
-                history_str += f"{prefix}: {msg.content}\n"
+            # Print tokens as they arrive instead of waiting for the whole answer
+            print("\nAtul: ", end="", flush=True)
+            for token in stream:
+                print(token, end="", flush=True)
+            print()
+            ai_answer = stream.text
+            print(f"   ⏱️  {stream.summary()}")
+            if config.API_URL:
+                current_sources = stream.sources
+            else:
+                current_sources = [f"{s['title']}: {s['source'] or 'Link not available'}" for s in stream.sections]
 
-            # --- STEP D: GENERATE ANSWER ---
-            formatted_prompt = template.format(
-                history=history_str if history_str else "No previous history.",
-                context=context_text,
-                question=query
-            )
-            
-            response = llm.invoke(formatted_prompt)
-            ai_answer = response.content
-            
-            print(f"\nAtul: {ai_answer}")
-            
             # --- STEP E: UPDATE HISTORY ---
             # Save the exchange to memory
             chat_history.append(HumanMessage(content=query))
             chat_history.append(AIMessage(content=ai_answer))
             
-            # Keep history short (prevent memory bloat)
-            if len(chat_history) > MAX_HISTORY:
-                chat_history = chat_history[-MAX_HISTORY:]
+            # Fold older turns into the summary in the background (the answer is already printed)
+            if not config.API_URL:
+                history.schedule(chat_history)
 
             # Display Links
             if current_sources:
@@ -0,0 +1,6 @@
+import uvicorn
+from src import config
+
+if __name__ == "__main__":
+    # One worker process; concurrency comes from asyncio, not threads
+    uvicorn.run("src.api:app", host=config.API_HOST, port=config.API_PORT)
@@ -0,0 +1,127 @@
+import threading
+import time
+import numpy as np
+from src import config
+
+class SemanticAnswerCache:
+    """
+    Remembers answers to standalone questions. A new question whose embedding
+    is within 'threshold' cosine similarity of a cached one gets the cached
+    answer without an LLM call, but only if every chunk the answer was built
+    from still exists (chunk IDs change whenever their content changes).
+    """
+    def __init__(self, threshold=config.ANSWER_CACHE_THRESHOLD, maxsize=config.ANSWER_CACHE_SIZE,
+                 ttl=config.ANSWER_CACHE_TTL):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = []      # dicts: vector, point_ids, sources, answer, expires, last_used
+        self.matrix = None     # normalized vectors, rebuilt lazily
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refused = 0
+
+    @staticmethod
+    def _normalize(vector):
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def _drop_expired(self):
+        now = time.monotonic()
+        alive = [e for e in self.entries if e["expires"] > now]
+        if len(alive) != len(self.entries):
+            self.entries = alive
+            self.matrix = None
+
+    def _best_match(self, vector):
+        self._drop_expired()
+        if not self.entries:
+            return None, 0.0
+        if self.matrix is None:
+            self.matrix = np.stack([e["vector"] for e in self.entries])
+        scores = self.matrix @ self._normalize(vector)
+        best = int(np.argmax(scores))
+        return self.entries[best], float(scores[best])
+
+    def _chunks_unchanged(self, client, point_ids):
+        try:
+            points = client.retrieve(
+                collection_name=config.COLLECTION_NAME,
+                ids=point_ids,
+                with_payload=False,
+                with_vectors=False,
+            )
+        except Exception:
+            return False
+        return len(points) == len(point_ids)
+
+    def _match(self, vector):
+        with self.lock:
+            entry, score = self._best_match(vector)
+            if entry is None or score < self.threshold:
+                self.misses += 1
+                return None
+            return entry
+
+    def _settle(self, entry, unchanged):
+        with self.lock:
+            if not unchanged:
+                if entry in self.entries:
+                    self.entries.remove(entry)
+                    self.matrix = None
+                self.refused += 1
+                return None
+            entry["last_used"] = time.monotonic()
+            self.hits += 1
+        return entry
+
+    def lookup(self, client, vector):
+        """
+        Returns the cached entry for a near-duplicate question, or None.
+        """
+        entry = self._match(vector)
+        if entry is None:
+            return None
+        # Network check outside the lock so other sessions aren't blocked
+        return self._settle(entry, self._chunks_unchanged(client, entry["point_ids"]))
+
+    async def alookup(self, aclient, vector):
+        """
+        Same as lookup, checking the chunks through an AsyncQdrantClient.
+        """
+        entry = self._match(vector)
+        if entry is None:
+            return None
+        try:
+            points = await aclient.retrieve(
+                collection_name=config.COLLECTION_NAME,
+                ids=entry["point_ids"],
+                with_payload=False,
+                with_vectors=False,
+            )
+            unchanged = len(points) == len(entry["point_ids"])
+        except Exception:
+            unchanged = False
+        return self._settle(entry, unchanged)
+
+    def add(self, vector, point_ids, sources, answer):
+        with self.lock:
+            now = time.monotonic()
+            self.entries.append({
+                "vector": self._normalize(vector),
+                "point_ids": list(point_ids),
+                "sources": list(sources),
+                "answer": answer,
+                "expires": now + self.ttl,
+                "last_used": now,
+            })
+            # Evict the least recently used entries beyond the size limit
+            if len(self.entries) > self.maxsize:
+                self.entries.sort(key=lambda e: e["last_used"], reverse=True)
+                del self.entries[self.maxsize:]
+            self.matrix = None
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "refused": self.refused, "entries": len(self.entries)}
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from src import config
+from src.answer_cache import SemanticAnswerCache
+from src.api_client import to_messages
+from src.embedding_batcher import find_batcher
+from src.engine import RAGEngine
+from src.history import HistoryManager
+from src.prompts import ANSWER_TEMPLATE
+from src.query_cache import RetrievalCache, TTLCache
+from src.telemetry import METRICS
+
+# Usage: python serve.py  (then POST /chat, answers stream back as server-sent events)
+#   request:  {"question": "...", "history": [{"role": "user" | "assistant", "content": "..."}],
+#              "session_id": "..." (optional: enables the rolling history summary)}
+#   events:   sources -> token* -> done   (or error)
+# GET /metrics: per-stage latency histograms (Prometheus text), GET /health: counters
+
+# --- CONFIGURATION ---
+SESSION_TTL = 6 * 3600
+MAX_SESSIONS = 10000
+
+class Resources:
+    """
+    Everything shared across requests: the RAG engine (one AsyncQdrantClient,
+    one embedder, one LLM client, the retrieval and answer caches) and the
+    per-session history managers.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.sessions = TTLCache(MAX_SESSIONS, SESSION_TTL)
+        self.in_flight = 0
+        self.served = 0
+
+    @classmethod
+    def from_config(cls):
+        return cls(RAGEngine(
+            config.get_qdrant_client(), config.get_llm(), config.get_embeddings(),
+            RetrievalCache(), ANSWER_TEMPLATE, answer_cache=SemanticAnswerCache(),
+            aclient=config.get_async_qdrant_client(),
+        ))
+
+    def history_for(self, session_id):
+        if not session_id:
+            return HistoryManager(self.engine.llm)
+        manager = self.sessions.get(session_id)
+        if manager is None:
+            manager = HistoryManager(self.engine.llm)
+        # Re-put on every turn so active sessions don't expire
+        self.sessions.put(session_id, manager)
+        return manager
+
+# 1. SERVER-SENT EVENTS
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def answer_events(resources, question, history, session_id=None):
+    """
+    Runs one turn through the engine and yields it as server-sent events.
+    """
+    start = time.perf_counter()
+    manager = resources.history_for(session_id)
+    try:
+        turn = await resources.engine.aask(question, to_messages(history), manager, api=True)
+        yield sse("sources", {"sources": turn.sources})
+        async for token in turn:
+            yield sse("token", {"text": token})
+        stream = turn.stream
+        yield sse("done", {
+            "first_token": stream.first_token if stream else None,
+            "total": time.perf_counter() - start,
+            "llm_total": stream.total if stream else None,
+            "cached": turn.record["cached"],
+            "spans_ms": turn.record["spans_ms"],
+        })
+        # The answer is out; refresh this session's summary in the background
+        if session_id:
+            manager.schedule(history + [
+                {"role": "user", "content": question},
+                {"role": "assistant", "content": turn.text},
+            ])
+    except asyncio.CancelledError:
+        # Client went away; stop generating
+        raise
+    except Exception as e:
+        print(f"❌ [api] {e}")
+        yield sse("error", {"message": str(e)})
+
+# 2. ROUTES
+async def chat(request):
+    body = await request.json()
+    question = (body.get("question") or "").strip()
+    if not question:
+        return JSONResponse({"error": "question is required"}, status_code=400)
+    history = body.get("history") or []
+    session_id = body.get("session_id")
+    resources = request.app.state.resources
+
+    async def events():
+        resources.in_flight += 1
+        try:
+            async for event in answer_events(resources, question, history, session_id):
+                yield event
+        finally:
+            resources.in_flight -= 1
+            resources.served += 1
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def health(request):
+    resources = request.app.state.resources
+    batcher = find_batcher(resources.engine.embedder)
+    return JSONResponse({
+        "status": "ok",
+        "in_flight": resources.in_flight,
+        "served": resources.served,
+        "lexical_chunks": len(resources.engine.retrieval_cache.lexical),
+        "query_batching": batcher.stats() if batcher else None,
+    })
+
+async def metrics(request):
+    return PlainTextResponse(METRICS.export_text())
+
+def create_app(resources=None):
+    """
+    Builds the ASGI app. Without 'resources', real clients are created from
+    config when the server starts (the load test passes stubs instead).
+    """
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.resources = resources or Resources.from_config()
+        print(f"🚀 API ready ({len(app.state.resources.engine.retrieval_cache.lexical)} lexical chunks).")
+        yield
+        await app.state.resources.engine.aclient.close()
+
+    app = Starlette(
+        routes=[Route("/chat", chat, methods=["POST"]), Route("/health", health),
+                Route("/metrics", metrics)],
+        lifespan=lifespan,
+    )
+    if resources is not None:
+        # Usable without running the lifespan (e.g. in-process ASGI transport)
+        app.state.resources = resources
+    return app
+
+app = create_app()
@@ -0,0 +1,69 @@
+import json
+import httpx
+from langchain_core.messages import AIMessage, HumanMessage
+
+class APIStream:
+    """
+    Thin client for the /chat endpoint. Iterate it to get answer tokens as
+    they arrive; '.sources' is filled in before the first token, '.timing'
+    once the stream is done.
+    """
+    def __init__(self, api_url, question, history, session_id=None, timeout=120):
+        self.url = f"{api_url.rstrip('/')}/chat"
+        # With a session id the server keeps a rolling summary of older turns
+        self.payload = {"question": question, "history": history, "session_id": session_id}
+        self.timeout = timeout
+        self.sources = []
+        self.timing = {}
+        self.parts = []
+
+    def events(self):
+        with httpx.stream("POST", self.url, json=self.payload, timeout=self.timeout) as response:
+            response.raise_for_status()
+            event = None
+            for line in response.iter_lines():
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    yield event, json.loads(line[len("data: "):])
+
+    def __iter__(self):
+        for event, data in self.events():
+            if event == "sources":
+                self.sources = data["sources"]
+            elif event == "token":
+                self.parts.append(data["text"])
+                yield data["text"]
+            elif event == "done":
+                self.timing = data
+            elif event == "error":
+                raise RuntimeError(data["message"])
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+    def summary(self):
+        first = self.timing.get("first_token")
+        total = self.timing.get("total")
+        first = f"{first:.2f}s" if first is not None else "n/a"
+        total = f"{total:.2f}s" if total is not None else "n/a"
+        return f"first token {first} · total {total}"
+
+def to_history(messages):
+    """
+    LangChain messages -> the API's [{"role", "content"}] history format.
+    """
+    return [
+        {"role": "user" if m.type == "human" else "assistant", "content": m.content}
+        for m in messages
+    ]
+
+def to_messages(history):
+    """
+    The API's [{"role", "content"}] history format -> LangChain messages.
+    """
+    return [
+        HumanMessage(content=m.get("content", "")) if m.get("role") == "user" else AIMessage(content=m.get("content", ""))
+        for m in history
+    ]
@@ -0,0 +1,130 @@
+import json
+import mmap
+import os
+import uuid
+
+# --- CONFIGURATION ---
+CHUNK_STORE_DIR = os.path.join("data", "chunk_store")
+HEADER_SIZE = 32   # build id (uuid hex) at the start of chunks.bin, must match index.json
+
+class ChunkStore:
+    """
+    Read-only local copy of every chunk's payload. chunks.bin holds the
+    UTF-8 JSON payloads back to back and is memory-mapped; index.json maps
+    point id -> (offset, length). With it, Qdrant only has to return IDs and
+    scores, and a payload is decoded only for the hits actually returned.
+
+    Lookups run on other threads while refresh() re-opens a rebuilt store, so
+    (offsets, data) is swapped in as one tuple and an old mmap is never closed
+    under a reader: it is released once the last lookup using it drops it.
+    """
+    EMPTY = ({}, None)
+
+    def __init__(self, path=CHUNK_STORE_DIR):
+        self.path = path
+        self.state = self.EMPTY
+        self.mtime = None
+        self._open()
+
+    @property
+    def offsets(self):
+        return self.state[0]
+
+    @property
+    def data(self):
+        return self.state[1]
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _index_mtime(self):
+        try:
+            return os.path.getmtime(self._file("index.json"))
+        except OSError:
+            return None
+
+    def _open(self):
+        self.mtime = self._index_mtime()
+        if self.mtime is None:
+            return
+        with open(self._file("index.json"), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        with open(self._file("chunks.bin"), 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # A reader racing a rebuild can see a new index with old data (or vice versa):
+        # keep serving the current state and try again on the next refresh
+        if data[:HEADER_SIZE] != index["build"].encode("ascii"):
+            data.close()
+            self.mtime = None
+            return
+        self.state = (index["offsets"], data)
+
+    def refresh(self):
+        """
+        Re-opens the store if ingestion has rewritten it. The new files are
+        opened first; readers switch over with the state swap.
+        """
+        if self._index_mtime() != self.mtime:
+            self._open()
+
+    def close(self):
+        # Only for shutdown: a concurrent get() would fail on the closed mmap
+        data = self.data
+        self.state = self.EMPTY
+        if data is not None:
+            data.close()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    # 1. WRITING (ingestion)
+    @staticmethod
+    def write(docs, path=CHUNK_STORE_DIR):
+        """
+        Rebuilds the store from {point id: {"text", "metadata"}}, the same
+        shape the lexical index keeps.
+        """
+        os.makedirs(path, exist_ok=True)
+        build = uuid.uuid4().hex
+        offsets = {}
+        data_tmp = os.path.join(path, "chunks.bin.tmp")
+        with open(data_tmp, 'wb') as f:
+            f.write(build.encode("ascii"))
+            offset = HEADER_SIZE
+            for point_id, doc in docs.items():
+                blob = json.dumps(
+                    {"page_content": doc["text"], "metadata": doc["metadata"]}, ensure_ascii=False
+                ).encode("utf-8")
+                f.write(blob)
+                offsets[str(point_id)] = (offset, len(blob))
+                offset += len(blob)
+        index_tmp = os.path.join(path, "index.json.tmp")
+        with open(index_tmp, 'w', encoding='utf-8') as f:
+            json.dump({"build": build, "offsets": offsets}, f)
+        os.replace(data_tmp, os.path.join(path, "chunks.bin"))
+        os.replace(index_tmp, os.path.join(path, "index.json"))
+        return len(offsets)
+
+    # 2. READING (serving)
+    def get(self, point_id, state=None):
+        offsets, data = state or self.state
+        location = offsets.get(str(point_id))
+        if location is None or data is None:
+            return None
+        offset, length = location
+        return json.loads(data[offset:offset + length])
+
+    def fill(self, hits):
+        """
+        Sets the payload of each hit from the store. Returns the IDs it
+        couldn't resolve (e.g. points newer than the last ingestion here).
+        """
+        missing = []
+        state = self.state   # one store version for the whole hit list
+        for hit in hits:
+            payload = self.get(hit.id, state)
+            if payload is None:
+                missing.append(hit.id)
+            else:
+                hit.payload = payload
+        return missing
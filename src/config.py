@@ -1,8 +1,15 @@
 # src/config.py
+import asyncio
 import os
+import threading
 from dotenv import load_dotenv
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_google_genai import ChatGoogleGenerativeAI
+from src.embedding_cache import CachedEmbeddings
+from src.embedding_batcher import QueryBatcher
+from src.storage_profiles import get_profile, TruncatedEmbeddings
+from src.fakes import FakeEmbeddings, FakeLLM
 
 # Load environment variables once
 load_dotenv()
@@ -18,18 +25,171 @@ COLLECTION_NAME = "srivaishnava_knowledge"
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 100
 
-# Validation
-if not all([GOOGLE_API_KEY, QDRANT_URL, QDRANT_API_KEY]):
+# Embedding quota (Gemini requests/tokens per minute) and upload concurrency
+EMBED_RPM = int(os.getenv("EMBED_RPM", "100"))
+EMBED_TPM = int(os.getenv("EMBED_TPM", "30000"))
+UPLOAD_MAX_CONCURRENCY = int(os.getenv("UPLOAD_MAX_CONCURRENCY", "4"))
+
+# Local embedding cache (set EMBEDDING_CACHE_MAX_MB=0 to disable)
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join("data", "embedding_cache.sqlite"))
+EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "512"))
+
+# In-process query cache for the app (entries, seconds)
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", "3600"))
+# Semantic answer cache: reuse answers for near-identical standalone questions
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "86400"))
+# Upper bound on the archive context pasted into each prompt (~4 characters per token)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+# Ceiling for the conversation history pasted into each prompt (older turns get summarized)
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "600"))
+# Dense search backend: "qdrant" (remote query_points) or "local" (memory-mapped NumPy snapshot)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "qdrant")
+LOCAL_SEARCH_DTYPE = os.getenv("LOCAL_SEARCH_DTYPE", "float32")
+# Slim payloads: Qdrant returns only IDs + scores, chunk text comes from the local chunk store
+SLIM_PAYLOADS = os.getenv("SLIM_PAYLOADS", "0") == "1"
+# Concurrent query embeddings are coalesced into one API call (max wait 0 = off)
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "5"))
+# Vector storage profile (dimension / quantization / on-disk), see src/storage_profiles.py
+STORAGE_PROFILE_NAME = os.getenv("STORAGE_PROFILE", "full")
+STORAGE_PROFILE = get_profile(STORAGE_PROFILE_NAME)
+# HNSW graph (applied when the collection is created/updated) and search depth.
+# Pick values with benchmarks/tune_search.py; HNSW_EF=0 leaves Qdrant's default
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCT = int(os.getenv("HNSW_EF_CONSTRUCT", "100"))
+HNSW_EF = int(os.getenv("HNSW_EF", "0"))
+SEARCH_EXACT = os.getenv("SEARCH_EXACT", "0") == "1"
+SEARCH_LIMIT = int(os.getenv("SEARCH_LIMIT", "5"))
+# Async HTTP API (serve.py). When API_URL is set, app.py and chat.py act as thin clients of it
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_URL = os.getenv("API_URL", "")
+# Tiny side collection holding a version counter that ingestion bumps
+VERSION_COLLECTION_NAME = f"{COLLECTION_NAME}_meta"
+
+# Offline mode (benchmarks, development without keys):
+#   QDRANT_LOCATION=":memory:" or a folder -> embedded local Qdrant instead of the cluster
+#   FAKE_MODELS=1                         -> deterministic fake embeddings / LLM instead of Gemini
+QDRANT_LOCATION = os.getenv("QDRANT_LOCATION", "")
+FAKE_MODELS = os.getenv("FAKE_MODELS", "0") == "1"
+FAKE_EMBED_DIM = int(os.getenv("FAKE_EMBED_DIM", "768"))
+FAKE_EMBED_LATENCY_MS = float(os.getenv("FAKE_EMBED_LATENCY_MS", "0"))
+FAKE_LLM_FIRST_TOKEN_MS = float(os.getenv("FAKE_LLM_FIRST_TOKEN_MS", "0"))
+FAKE_LLM_TOKEN_MS = float(os.getenv("FAKE_LLM_TOKEN_MS", "0"))
+FAKE_429_RATE = float(os.getenv("FAKE_429_RATE", "0"))
+
+# Validation (only for the services actually in use)
+required = []
+if not FAKE_MODELS:
+    required.append(GOOGLE_API_KEY)
+if not QDRANT_LOCATION:
+    required += [QDRANT_URL, QDRANT_API_KEY]
+if not all(required):
     raise ValueError("❌ CRITICAL: Missing API Keys in .env file")
 
+# Shared Qdrant client
+_local_client = None
+
+class _SerializedClient:
+    """
+    The embedded client isn't thread-safe (concurrent upserts corrupt its
+    arrays), so every call goes through one lock. The cluster needs no such thing.
+    """
+    def __init__(self, client):
+        self._client = client
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+        def locked(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+        return locked
+
+def get_qdrant_client(**kwargs):
+    """
+    The cluster client, or in local mode one embedded client shared by the
+    whole process (an in-memory store or folder can't be opened twice).
+    """
+    global _local_client
+    if QDRANT_LOCATION:
+        if _local_client is None:
+            if QDRANT_LOCATION == ":memory:":
+                _local_client = _SerializedClient(QdrantClient(location=":memory:"))
+            else:
+                _local_client = _SerializedClient(QdrantClient(path=QDRANT_LOCATION))
+        return _local_client
+    return QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, **kwargs)
+
+class _ThreadedAsyncClient:
+    """
+    Async face of the shared embedded client: every call runs on a worker
+    thread, so the API and its sync housekeeping see the same local store.
+    """
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+        async def threaded(*args, **kwargs):
+            return await asyncio.to_thread(attr, *args, **kwargs)
+        return threaded
+
+def get_async_qdrant_client(**kwargs):
+    """
+    Async counterpart for the API server. In local mode it wraps the same
+    embedded client get_qdrant_client() returns (a store can't be opened twice).
+    """
+    if QDRANT_LOCATION:
+        return _ThreadedAsyncClient(get_qdrant_client())
+    return AsyncQdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, **kwargs)
+
 # Shared Embedding Function
 def get_embeddings():
-    return GoogleGenerativeAIEmbeddings(
-        model=EMBEDDING_MODEL,
-        google_api_key=GOOGLE_API_KEY
-    )
+    if FAKE_MODELS:
+        embedder = FakeEmbeddings(
+            dim=FAKE_EMBED_DIM, latency=FAKE_EMBED_LATENCY_MS / 1000, error_rate=FAKE_429_RATE
+        )
+    else:
+        embedder = GoogleGenerativeAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            google_api_key=GOOGLE_API_KEY
+        )
+    if EMBED_BATCH_MAX_WAIT_MS > 0:
+        # Below the cache: only cache misses wait for a batch
+        embedder = QueryBatcher(
+            embedder,
+            max_batch=min(EMBED_BATCH_MAX_SIZE, 100),   # the API accepts at most 100 texts per call
+            max_wait=EMBED_BATCH_MAX_WAIT_MS / 1000,
+        )
+    if EMBEDDING_CACHE_MAX_MB > 0:
+        # Same interface, but repeated texts are served from disk
+        embedder = CachedEmbeddings(
+            embedder,
+            # Fake vectors must never be served for the real model
+            model_name=f"fake-{FAKE_EMBED_DIM}" if FAKE_MODELS else EMBEDDING_MODEL,
+            path=EMBEDDING_CACHE_PATH,
+            max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+        )
+    if STORAGE_PROFILE["dim"]:
+        # Reduced-dimension profile: truncate (after the cache, so it stays profile-agnostic)
+        embedder = TruncatedEmbeddings(embedder, STORAGE_PROFILE["dim"])
+    return embedder
 
 def get_llm():
+    if FAKE_MODELS:
+        return FakeLLM(
+            first_token=FAKE_LLM_FIRST_TOKEN_MS / 1000,
+            token_interval=FAKE_LLM_TOKEN_MS / 1000,
+            error_rate=FAKE_429_RATE,
+        )
     return ChatGoogleGenerativeAI(
         # Try the most stable current model
         model="gemini-2.5-flash", 
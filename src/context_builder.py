@@ -0,0 +1,113 @@
+from src import config
+from src.uploader import estimate_tokens
+
+# --- CONFIGURATION ---
+MIN_OVERLAP = 20         # shortest suffix/prefix match treated as a real chunk overlap
+MIN_PARTIAL_TOKENS = 50  # don't bother including a trimmed piece smaller than this
+GAP_MARKER = "\n[...]\n"
+
+def _overlap(left, right, max_overlap):
+    """
+    Length of the longest suffix of 'left' that is also a prefix of 'right'.
+    The splitter repeats up to CHUNK_OVERLAP characters at chunk boundaries.
+    """
+    for size in range(min(len(left), len(right), max_overlap), MIN_OVERLAP - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+def merge_chunks(texts, max_overlap=None):
+    """
+    Merges one source's chunks (given in rank order) into non-redundant segments.
+    Returns [(text, rank)] where rank is the best rank of the chunks inside.
+    """
+    max_overlap = max_overlap or config.CHUNK_OVERLAP * 2
+    segments = []
+    for rank, text in enumerate(texts):
+        text = text.strip()
+        if not text or any(text in seg[0] for seg in segments):
+            continue
+        segments = [seg for seg in segments if seg[0] not in text] + [(text, rank)]
+        # Keep stitching until no two segments overlap at their edges
+        merged = True
+        while merged:
+            merged = False
+            for i, (a, rank_a) in enumerate(segments):
+                for j, (b, rank_b) in enumerate(segments):
+                    if i == j:
+                        continue
+                    size = _overlap(a, b, max_overlap)
+                    if size:
+                        joined = (a + b[size:], min(rank_a, rank_b))
+                        segments = [s for k, s in enumerate(segments) if k not in (i, j)] + [joined]
+                        merged = True
+                        break
+                if merged:
+                    break
+    return sorted(segments, key=lambda seg: seg[1])
+
+def _trim(text, tokens):
+    """
+    Cuts 'text' to roughly 'tokens' tokens at a word boundary.
+    """
+    cut = text[:tokens * 4]
+    if len(cut) < len(text) and " " in cut:
+        cut = cut[:cut.rfind(" ")]
+    return cut + " ..."
+
+def assemble_context(hits, token_budget=None):
+    """
+    Groups hits by metadata.source, merges adjacent/overlapping chunks and
+    packs the result into 'token_budget' tokens.
+    Every source that makes it in gets its best segment first; leftover budget
+    then goes to the remaining segments in rank order. Returns a list of
+    sections {"source", "title", "text"} in rank order - only these sources
+    should be cited.
+    """
+    token_budget = token_budget or config.CONTEXT_TOKEN_BUDGET
+
+    # 1. Group by source, keeping the order in which sources first appear
+    groups = {}
+    for hit in hits:
+        payload = hit.payload or {}
+        text = payload.get("page_content", "")
+        if not text:
+            continue
+        meta = payload.get("metadata", {})
+        key = meta.get("source", "") or f"#{len(groups)}"
+        group = groups.setdefault(key, {"source": meta.get("source", ""), "title": meta.get("title", "Source"), "texts": []})
+        group["texts"].append(text)
+
+    # 2. Merge within each source
+    for group in groups.values():
+        group["segments"] = merge_chunks(group["texts"])
+        group["picked"] = []
+
+    # 3. Pack: best segment of each source first, then the rest by rank
+    remaining = token_budget
+    ordered = list(groups.values())
+    candidates = [(group, seg) for group in ordered for seg in group["segments"][:1]]
+    candidates += sorted(
+        [(group, seg) for group in ordered for seg in group["segments"][1:]],
+        key=lambda item: item[1][1],
+    )
+    for i, (group, (text, rank)) in enumerate(candidates):
+        if remaining <= 0:
+            break
+        # While placing best segments, hold back a minimal share for every source still to come
+        allowed = remaining - MIN_PARTIAL_TOKENS * max(0, len(ordered) - i - 1)
+        allowed = max(allowed, min(remaining, MIN_PARTIAL_TOKENS))
+        cost = estimate_tokens(text)
+        if cost > allowed:
+            if allowed < MIN_PARTIAL_TOKENS:
+                continue
+            text = _trim(text, allowed)
+            cost = allowed
+        group["picked"].append((text, rank))
+        remaining -= cost
+
+    return [
+        {"source": group["source"], "title": group["title"],
+         "text": GAP_MARKER.join(text for text, _ in sorted(group["picked"], key=lambda seg: seg[1]))}
+        for group in ordered if group["picked"]
+    ]
@@ -1,76 +1,148 @@
 import time
-from langchain_community.vectorstores import Qdrant
-from qdrant_client import QdrantClient, models
+from qdrant_client import models
 from src import config
+from src.uploader import ConcurrentUploader
 
-# 1. HELPER: Check if a URL exists
-def url_exists_in_db(client, url):
+# 1. HELPER: Load every known source URL in one pass
+def get_existing_sources(client, page_size=1000):
     """
-    Returns True if the database already contains chunks from this source URL.
-    This is a crucial check to prevent duplicates, especially when re-running the pipeline."""
+    Returns a set of every distinct 'metadata.source' already in the database.
+    Scrolls the whole collection once (payload only, no vectors), so the
+    pipeline can check each document against the set instead of making one
+    round trip per URL. Returns None if the scroll fails part-way: an
+    incomplete set would look like missing sources.
+    """
+    sources = set()
+    offset = None
     try:
-        result, _ = client.scroll(
-            collection_name=config.COLLECTION_NAME,
-            scroll_filter=models.Filter(
+        while True:
+            points, offset = client.scroll(
+                collection_name=config.COLLECTION_NAME,
+                limit=page_size,
+                offset=offset,
+                with_payload=models.PayloadSelectorInclude(include=["metadata.source"]),
+                with_vectors=False,
+            )
+            for point in points:
+                source = (point.payload or {}).get("metadata", {}).get("source")
+                if source:
+                    sources.add(source)
+            if offset is None:
+                break
+    except Exception as e:
+        print(f"   ⚠️ Could not load existing sources: {e}")
+        return None
+    return sources
+
+# 1c. HELPER: Check for specific points
+def any_points_exist(client, point_ids):
+    """
+    True if Qdrant holds at least one of these point IDs.
+    """
+    if not point_ids:
+        return False
+    found = client.retrieve(
+        collection_name=config.COLLECTION_NAME,
+        ids=list(point_ids),
+        with_payload=False,
+        with_vectors=False,
+    )
+    return len(found) > 0
+
+# 1d. HELPERS: Remove stale points
+def delete_points(client, point_ids):
+    """
+    Deletes specific points (e.g. chunks whose content changed).
+    """
+    if not point_ids:
+        return
+    client.delete(
+        collection_name=config.COLLECTION_NAME,
+        points_selector=models.PointIdsList(points=list(point_ids)),
+    )
+
+def delete_source(client, url):
+    """
+    Deletes every point that came from this source URL.
+    """
+    client.delete(
+        collection_name=config.COLLECTION_NAME,
+        points_selector=models.FilterSelector(
+            filter=models.Filter(
                 must=[
                     models.FieldCondition(
                         key="metadata.source",
                         match=models.MatchValue(value=url),
                     )
                 ]
-            ),
-            limit=1
+            )
+        ),
+    )
+
+# 1d. HELPERS: Collection version (lets caches notice new ingestions)
+VERSION_POINT_ID = 1
+
+def get_collection_version(client):
+    """
+    Returns the version counter ingestion bumps after every change (0 if never set).
+    """
+    try:
+        points = client.retrieve(
+            collection_name=config.VERSION_COLLECTION_NAME,
+            ids=[VERSION_POINT_ID],
+            with_payload=True,
         )
-        return len(result) > 0
+        return points[0].payload.get("version", 0) if points else 0
     except Exception:
-        return False
+        return 0
+
+def bump_collection_version(client):
+    """
+    Increments the version counter so running apps drop their cached results.
+    """
+    if not client.collection_exists(config.VERSION_COLLECTION_NAME):
+        client.create_collection(
+            collection_name=config.VERSION_COLLECTION_NAME,
+            vectors_config=models.VectorParams(size=1, distance=models.Distance.DOT),
+        )
+    version = get_collection_version(client) + 1
+    client.upsert(
+        collection_name=config.VERSION_COLLECTION_NAME,
+        points=[models.PointStruct(
+            id=VERSION_POINT_ID,
+            vector=[1.0],
+            payload={"version": version, "updated_at": time.time()},
+        )],
+    )
+    return version
 
 # 2. ENGINE: The Upload Logic
-def upload_chunks(chunks, batch_size=10):
+def upload_chunks(chunks, batch_size=10, ids=None, on_batch_done=None):
     """
-    Uploads chunks with robust retry logic.
+    Uploads chunks with several batches in flight, paced to the embedding quota.
+    'chunks' may be a list or a lazy generator; only a few batches are held at once.
+    If 'ids' is given (one per chunk), points are upserted under those IDs,
+    so re-uploading the same chunk replaces it instead of duplicating it.
+    'on_batch_done(batch_ids)' is called as each batch is acknowledged by Qdrant.
     """
     # 1. Setup Client
-    client = QdrantClient(
-        url=config.QDRANT_URL, 
-        api_key=config.QDRANT_API_KEY,
-        timeout=60 
-    )
+    client = config.get_qdrant_client(timeout=60)
 
-    # 2. Setup Vector Store (Uses config.get_embeddings() now!)
-    vector_store = Qdrant(
+    # 2. Setup Uploader (Uses config.get_embeddings() now!)
+    uploader = ConcurrentUploader(
         client=client,
+        embedder=config.get_embeddings(),
         collection_name=config.COLLECTION_NAME,
-        embeddings=config.get_embeddings(),
+        rpm=config.EMBED_RPM,
+        tpm=config.EMBED_TPM,
+        max_concurrency=config.UPLOAD_MAX_CONCURRENCY,
     )
 
-    total_chunks = len(chunks)
-    current_index = 0
-    
-    print(f"🚀 Engine: Uploading {total_chunks} chunks in batches of {batch_size}...")
+    total = f"{len(chunks)} " if hasattr(chunks, "__len__") else ""
+    print(f"🚀 Engine: Uploading {total}chunks in batches of {batch_size}...")
 
-    # 3. The Smart Loop
-    while current_index < total_chunks:
-        batch = chunks[current_index : current_index + batch_size]
-        
-        try:
-            vector_store.add_documents(batch)
-            current_index += batch_size
-            print(f"   Saved {min(current_index, total_chunks)}/{total_chunks} chunks...")
-            # (Commented out to reduce noise in the main loop)
-            time.sleep(1)
-            
-        except Exception as e:
-            error_msg = str(e).lower()
-            
-            # HANDLE RATE LIMITS
-            if "429" in error_msg or "resource_exhausted" in error_msg or "timed out" in error_msg:
-                print(f"   ⏳ Hit Limit/Timeout. Sleeping 60s... (Retrying batch)")
-                time.sleep(60)
-                # We do NOT increment current_index, so it retries the same batch
-            
-            # HANDLE CRITICAL ERRORS
-            else:
-                print(f"   ❌ Critical Error on batch starting at {current_index}: {e}")
-                # Skip bad batch to avoid infinite loop
-                current_index += batch_size
\ No newline at end of file
+    # 3. The Smart Loop (retries, backoff and concurrency live in the uploader)
+    saved, failed = uploader.upload(chunks, ids=ids, batch_size=batch_size, on_batch_done=on_batch_done)
+    if failed:
+        print(f"   ⚠️ {failed} chunks failed and were skipped.")
+    return saved
@@ -0,0 +1,117 @@
+import asyncio
+import inspect
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from langchain_core.embeddings import Embeddings
+
+QUERY_TASK = "RETRIEVAL_QUERY"
+
+class QueryBatcher(Embeddings):
+    """
+    Coalesces concurrent 'embed_query' calls into one 'embed_documents' call
+    with the query task type. A worker thread waits for the first query, keeps
+    collecting for up to 'max_wait' seconds (or 'max_batch' texts), sends them
+    together and hands each caller its own vector. Up to 'max_in_flight'
+    batches run at once, so collecting never stalls behind a slow call. Works for threads (Streamlit)
+    and coroutines (the API) alike. 'embed_documents' passes straight through.
+    """
+    def __init__(self, embedder, max_batch, max_wait, max_in_flight=4, sample_size=10000):
+        self.embedder = embedder
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.worker = None
+        self.senders = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="query-batch")
+        self.start_lock = threading.Lock()
+        # Older/other embedders have no task_type: fall back to one embed_query per text
+        self.batched = "task_type" in inspect.signature(embedder.embed_documents).parameters
+        self.batch_sizes = Counter()
+        self.waits = deque(maxlen=sample_size)   # seconds each query sat in the queue
+
+    # 1. WORKER
+    def _start(self):
+        with self.start_lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+                self.worker.start()
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _send(self, batch):
+        texts = [text for text, _, _ in batch]
+        try:
+            if self.batched:
+                vectors = self.embedder.embed_documents(texts, task_type=QUERY_TASK)
+            else:
+                vectors = [self.embedder.embed_query(t) for t in texts]
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        for (_, future, _), vector in zip(batch, vectors):
+            future.set_result(vector)
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            sent = time.perf_counter()
+            self.batch_sizes[len(batch)] += 1
+            self.waits.extend(sent - queued for _, _, queued in batch)
+            self.senders.submit(self._send, batch)
+
+    def _submit(self, text):
+        if self.worker is None:
+            self._start()
+        future = Future()
+        self.queue.put((text, future, time.perf_counter()))
+        return future
+
+    # 2. EMBEDDINGS INTERFACE
+    def embed_query(self, text):
+        return self._submit(text).result()
+
+    async def aembed_query(self, text):
+        return await asyncio.wrap_future(self._submit(text))
+
+    def embed_documents(self, texts):
+        return self.embedder.embed_documents(texts)
+
+    # 3. METRICS
+    def stats(self):
+        waits = sorted(self.waits)
+        batches = sum(self.batch_sizes.values())
+        queries = sum(size * n for size, n in self.batch_sizes.items())
+
+        def pct(p):
+            return waits[min(len(waits) - 1, int(p / 100 * len(waits)))] * 1000 if waits else 0.0
+
+        return {
+            "batches": batches,
+            "queries": queries,
+            "mean_batch": queries / batches if batches else 0.0,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            "wait_p50_ms": pct(50),
+            "wait_p99_ms": pct(99),
+        }
+
+def find_batcher(embedder):
+    """
+    Digs the QueryBatcher out of a wrapped embedder (cache, truncation...), or None.
+    """
+    while embedder is not None and not isinstance(embedder, QueryBatcher):
+        embedder = getattr(embedder, "embedder", None)
+    return embedder
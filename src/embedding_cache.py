@@ -0,0 +1,165 @@
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from langchain_core.embeddings import Embeddings
+
+DOCUMENT_TASK = "RETRIEVAL_DOCUMENT"
+QUERY_TASK = "RETRIEVAL_QUERY"
+
+class CachedEmbeddings(Embeddings):
+    """
+    Drop-in embeddings wrapper backed by a local SQLite cache.
+    Vectors are stored as float32 blobs keyed by (model, task type, text hash),
+    so rebuilding the collection or repeating a query never pays the API twice.
+    The least recently used entries are evicted once the cache exceeds 'max_bytes'.
+    Hits only note their time in memory; those 'last_used' updates are written
+    in one batch with the next store (before eviction reads them) or on flush(),
+    so a cache hit never writes to disk.
+    """
+    def __init__(self, embedder, model_name, path, max_bytes):
+        self.embedder = embedder
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.touched = {}   # key -> last hit time, not yet written
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+        self.db.commit()
+        self.total_bytes = self.db.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+        atexit.register(self.flush)
+
+    def _key(self, task_type, text):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.model_name}|{task_type}|{digest}"
+
+    def _lookup(self, keys):
+        found = {}
+        with self.lock:
+            # SQLite caps the number of bound parameters, so look up in slices
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                rows = self.db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})",
+                    part,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array('f', blob).tolist()
+            now = time.time()
+            self.touched.update((key, now) for key in found)
+        return found
+
+    def _write_touched(self):
+        if self.touched:
+            self.db.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(now, key) for key, now in self.touched.items()],
+            )
+            self.touched = {}
+
+    def flush(self):
+        """
+        Writes the pending 'last_used' updates (also runs at exit).
+        """
+        with self.lock:
+            if self.touched:
+                self._write_touched()
+                self.db.commit()
+
+    def _store(self, items):
+        now = time.time()
+        blobs = {key: array('f', vector).tobytes() for key, vector in items}
+        rows = [(key, blob, now) for key, blob in blobs.items()]
+        with self.lock:
+            # INSERT OR REPLACE may overwrite keys another thread just stored: count those bytes once
+            replaced = self._stored_bytes(list(blobs))
+            self._write_touched()
+            self.db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                rows,
+            )
+            self.total_bytes += sum(len(blob) for blob in blobs.values()) - replaced
+            self._evict()
+            self.db.commit()
+
+    def _stored_bytes(self, keys):
+        total = 0
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            total += self.db.execute(
+                f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings WHERE key IN ({','.join('?' * len(part))})",
+                part,
+            ).fetchone()[0]
+        return total
+
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        # Trim to 90% so we don't evict on every single insert
+        target = int(self.max_bytes * 0.9)
+        rows = self.db.execute(
+            "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used ASC"
+        )
+        doomed = []
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            doomed.append((key,))
+            self.total_bytes -= size
+        self.db.executemany("DELETE FROM embeddings WHERE key = ?", doomed)
+
+    def _embed(self, texts, task_type, compute):
+        keys = [self._key(task_type, t) for t in texts]
+        found = self._lookup(list(set(keys)))
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        with self.lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            # Only send each distinct missing text to the API once
+            todo = list(dict.fromkeys(texts[i] for i in missing))
+            vectors = compute(todo)
+            new_items = [(self._key(task_type, t), v) for t, v in zip(todo, vectors)]
+            self._store(new_items)
+            found.update(new_items)
+
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts):
+        return self._embed(list(texts), DOCUMENT_TASK, self.embedder.embed_documents)
+
+    def embed_query(self, text):
+        return self._embed([text], QUERY_TASK, lambda todo: [self.embedder.embed_query(todo[0])])[0]
+
+    async def aembed_query(self, text):
+        # The SQLite lookup is local and fast; only a miss awaits the API
+        key = self._key(QUERY_TASK, text)
+        found = self._lookup([key])
+        with self.lock:
+            if key in found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if key in found:
+            return found[key]
+        vector = await self.embedder.aembed_query(text)
+        self._store([(key, vector)])
+        return vector
@@ -0,0 +1,254 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.messages import HumanMessage
+from src import config
+from src.context_builder import assemble_context
+from src.prompts import REWRITE_TEMPLATE
+from src.query_cache import normalize_query
+from src.query_rewrite import needs_rewrite
+from src.streaming import TimedStream
+from src.telemetry import Trace
+from src.uploader import estimate_tokens
+
+# --- CONFIGURATION ---
+NO_ANSWER_MARKER = "Adiyen, I do not have"
+NO_CONTEXT = "No specific archives found for this query."
+RECENT_MESSAGES = 5   # a question is standalone if none of these came from the user
+
+# Speculative searches nobody awaits any more, kept alive until they finish
+_abandoned = set()
+
+def _forget(task):
+    _abandoned.discard(task)
+    if not task.cancelled():
+        task.exception()   # retrieve it, so a failure isn't reported as unhandled
+
+class _TimedEmbedder:
+    """
+    Passes embed_query through, timing it as the 'embed' span.
+    """
+    def __init__(self, embedder, trace):
+        self.embedder = embedder
+        self.trace = trace
+
+    def embed_query(self, text):
+        with self.trace.span("embed"):
+            return self.embedder.embed_query(text)
+
+    async def aembed_query(self, text):
+        with self.trace.span("embed"):
+            return await self.embedder.aembed_query(text)
+
+class Turn:
+    """
+    One question being answered. Iterate it to stream the answer (async for,
+    if it came from aask); the trace is closed (logged + recorded) when the
+    stream is exhausted.
+    """
+    def __init__(self, engine, trace, standalone, sections=(), hits=(), stream=None,
+                 cached=None, question_vector=None, prompt_tokens=0, fields=None):
+        self.engine = engine
+        self.trace = trace
+        self.standalone = standalone
+        self.sections = list(sections)
+        self.hits = list(hits)
+        self.stream = stream
+        self.cached = cached
+        self.question_vector = question_vector
+        self.prompt_tokens = prompt_tokens
+        self.fields = fields or {}   # extra fields for the trace's log line
+        self.record = None
+
+    @property
+    def sources(self):
+        if self.cached:
+            return self.cached["sources"]
+        return [s["source"] for s in self.sections if s["source"]]
+
+    @property
+    def text(self):
+        return self.cached["answer"] if self.cached else self.stream.text
+
+    def summary(self):
+        if self.record is None:
+            return "n/a"
+        return " · ".join(f"{name} {ms:.0f}ms" for name, ms in self.record["spans_ms"].items())
+
+    def __iter__(self):
+        if self.cached:
+            yield self.cached["answer"]
+        else:
+            for token in self.stream:
+                yield token
+        self.engine._finish(self)
+
+    async def __aiter__(self):
+        if self.cached:
+            yield self.cached["answer"]
+        else:
+            async for token in self.stream:
+                yield token
+        self.engine._finish(self)
+
+class RAGEngine:
+    """
+    The whole question -> answer path shared by app.py, chat.py (ask) and the
+    API (aask, with the AsyncQdrantClient 'aclient'):
+    history -> (semantic cache) -> rewrite -> embed -> search -> context -> generate.
+    Every stage is timed into the turn's Trace.
+    """
+    def __init__(self, client, llm, embedder, retrieval_cache, template, search_limit=None,
+                 answer_cache=None, empty_history="", aclient=None):
+        self.client = client
+        self.aclient = aclient
+        self.llm = llm
+        self.embedder = embedder
+        self.retrieval_cache = retrieval_cache
+        self.template = template
+        self.search_limit = search_limit or config.SEARCH_LIMIT
+        self.answer_cache = answer_cache
+        self.empty_history = empty_history
+
+    # 1. RETRIEVAL
+    def _search(self, trace, embedder, query):
+        with trace.span("search"):
+            # Served from cache for repeat questions
+            return self.retrieval_cache.search(self.client, embedder, query, self.search_limit)
+
+    def _rewrite(self, trace, question, history_str):
+        """
+        Rewrites the user's question to be self-contained for search.
+        Ex: "Explain it in Kannada" -> "Explain Injimedu Swami's history in Kannada"
+        """
+        with trace.span("rewrite"):
+            response = self.llm.invoke(REWRITE_TEMPLATE.format(history=history_str, question=question))
+        return response.content
+
+    def _search_with_rewrite(self, trace, embedder, question, history_str):
+        """
+        Runs retrieval on the raw question while the rewrite is in flight, and
+        only searches again if the rewrite actually changed the question.
+        """
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            raw_hits = pool.submit(self._search, trace, embedder, question)
+            search_query = self._rewrite(trace, question, history_str)
+            if normalize_query(search_query) == normalize_query(question):
+                return raw_hits.result()
+        return self._search(trace, embedder, search_query)
+
+    async def _asearch(self, trace, embedder, query):
+        with trace.span("search"):
+            return await self.retrieval_cache.asearch(self.client, self.aclient, embedder, query, self.search_limit)
+
+    async def _arewrite(self, trace, question, history_str):
+        with trace.span("rewrite"):
+            response = await self.llm.ainvoke(REWRITE_TEMPLATE.format(history=history_str, question=question))
+        return response.content
+
+    async def _asearch_with_rewrite(self, trace, embedder, question, history_str):
+        # Same speculation as _search_with_rewrite, with a task instead of a thread
+        raw_hits = asyncio.ensure_future(self._asearch(trace, embedder, question))
+        search_query = await self._arewrite(trace, question, history_str)
+        if normalize_query(search_query) == normalize_query(question):
+            return await raw_hits
+        # Not needed any more; let it finish (it fills the caches) without waiting for it
+        _abandoned.add(raw_hits)
+        raw_hits.add_done_callback(_forget)
+        return await self._asearch(trace, embedder, search_query)
+
+    # 2. ONE TURN
+    def _begin(self, question, messages, history):
+        trace = Trace(question)
+        # A. History: summary of older turns + recent ones, under the token ceiling
+        with trace.span("history"):
+            history_str = history.render(messages) if history is not None else ""
+        standalone = not any(isinstance(m, HumanMessage) for m in messages[-RECENT_MESSAGES:])
+        return trace, _TimedEmbedder(self.embedder, trace), history_str, standalone
+
+    def _prompt(self, trace, question, history_str, hits):
+        # D. Context: one section per source, overlaps merged, within the token budget
+        with trace.span("context"):
+            sections = assemble_context(hits)
+            context = "\n\n".join(f"Source: {s['title']}\nContent: {s['text']}" for s in sections)
+            prompt = self.template.format(
+                context=context or NO_CONTEXT,
+                chat_history=history_str or self.empty_history,
+                question=question,
+            )
+        trace.count("context_tokens", estimate_tokens(context) if context else 0)
+        return sections, prompt
+
+    def ask(self, question, messages, history=None):
+        """
+        'messages' is the conversation so far (LangChain messages, without the
+        new question); 'history' an optional HistoryManager. Returns a Turn.
+        """
+        trace, embedder, history_str, standalone = self._begin(question, messages, history)
+
+        # B. Semantic cache: a standalone question that closely matches one we
+        #    already answered reuses that answer without calling the LLM
+        question_vector = None
+        if self.answer_cache is not None and standalone:
+            question_vector = self.retrieval_cache.embed_query(embedder, question)
+            with trace.span("cache"):
+                cached = self.answer_cache.lookup(self.client, question_vector)
+            if cached:
+                return Turn(self, trace, standalone, cached=cached)
+
+        # C. Rewrite only follow-ups that reference previous context;
+        #    self-contained questions go straight to retrieval
+        if not standalone and history_str and needs_rewrite(question):
+            hits = self._search_with_rewrite(trace, embedder, question, history_str)
+        else:
+            hits = self._search(trace, embedder, question)
+
+        sections, prompt = self._prompt(trace, question, history_str, hits)
+
+        # E. Generate (streamed; timed as the caller consumes it)
+        stream = TimedStream(self.llm.stream(prompt))
+        return Turn(self, trace, standalone, sections=sections, hits=hits, stream=stream,
+                    question_vector=question_vector, prompt_tokens=estimate_tokens(prompt))
+
+    async def aask(self, question, messages, history=None, **fields):
+        """
+        Same as ask, without blocking the event loop: the LLM, the embedder and
+        Qdrant ('aclient') are awaited. Iterate the Turn with 'async for'.
+        'fields' are added to the turn's log line.
+        """
+        trace, embedder, history_str, standalone = self._begin(question, messages, history)
+
+        question_vector = None
+        if self.answer_cache is not None and standalone:
+            question_vector = await self.retrieval_cache.aembed_query(embedder, question)
+            with trace.span("cache"):
+                cached = await self.answer_cache.alookup(self.aclient, question_vector)
+            if cached:
+                return Turn(self, trace, standalone, cached=cached, fields=fields)
+
+        if not standalone and history_str and needs_rewrite(question):
+            hits = await self._asearch_with_rewrite(trace, embedder, question, history_str)
+        else:
+            hits = await self._asearch(trace, embedder, question)
+
+        sections, prompt = self._prompt(trace, question, history_str, hits)
+        stream = TimedStream(self.llm.astream(prompt))
+        return Turn(self, trace, standalone, sections=sections, hits=hits, stream=stream,
+                    question_vector=question_vector, prompt_tokens=estimate_tokens(prompt), fields=fields)
+
+    def _finish(self, turn):
+        trace = turn.trace
+        if turn.cached:
+            turn.record = trace.finish(cached=True, sources=len(turn.sources), **turn.fields)
+            return
+        stream = turn.stream
+        trace.add("first_token", stream.first_token)
+        trace.add("generate", stream.total)
+        # Prefer the model's own counts; fall back to the ~4 characters per token estimate
+        trace.count("prompt_tokens", stream.input_tokens or turn.prompt_tokens)
+        trace.count("completion_tokens", stream.output_tokens or estimate_tokens(stream.text))
+        turn.record = trace.finish(cached=False, sources=len(turn.sources), **turn.fields)
+
+        # Remember grounded answers to standalone questions
+        grounded = turn.hits and NO_ANSWER_MARKER not in stream.text
+        if self.answer_cache is not None and turn.standalone and grounded:
+            self.answer_cache.add(turn.question_vector, [hit.id for hit in turn.hits], turn.sources, stream.text)
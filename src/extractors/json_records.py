@@ -0,0 +1,59 @@
+import json
+
+WHITESPACE = " \t\r\n,"
+
+def iter_json_records(path, chunk_size=1 << 16):
+    """
+    Yields records one at a time from either a JSON array dump or a JSONL file.
+    Arrays are decoded incrementally, so memory stays bounded by the largest
+    single record instead of the whole file.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = f.read(chunk_size)
+        first = buf.lstrip()[:1]
+
+        # JSONL: one record per line
+        if first != "[":
+            f.seek(0)
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn line (e.g. the dump was cut off by a crash): skip it, keep the rest
+                    print(f"   ⚠️ Skipping unreadable line {line_no} in {path}")
+                    continue
+                yield record
+            return
+
+        # JSON array: decode one element at a time from a sliding buffer
+        decoder = json.JSONDecoder()
+        pos = buf.index("[") + 1
+        while True:
+            # Skip separators, pulling more text when the buffer runs dry
+            while pos < len(buf) and buf[pos] in WHITESPACE:
+                pos += 1
+            if pos >= len(buf):
+                more = f.read(chunk_size)
+                if not more:
+                    return
+                buf, pos = buf[pos:] + more, 0
+                continue
+
+            if buf[pos] == "]":
+                return
+
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Record is cut off at the end of the buffer: read more and retry
+                more = f.read(chunk_size)
+                if not more:
+                    raise
+                buf, pos = buf[pos:] + more, 0
+                continue
+
+            yield record
+            pos = end
@@ -1,159 +1,406 @@
-import requests
-from bs4 import BeautifulSoup
-import time
+import asyncio
 import json
-import random
-import re
 import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+import httpx
+from bs4 import BeautifulSoup
 
-def get_article_links(index_url, max_pages=100):
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# --- POLITENESS ---
+MAX_PER_HOST = 4          # requests in flight per host
+MIN_INTERVAL = 0.25       # seconds between request starts on the same host
+LISTING_WINDOW = 4        # listing pages fetched together
+# Only articles published this recently are re-validated on a refresh (edits cluster
+# right after publishing); older ones are trusted until a full re-validation
+REVALIDATE_DAYS = 30
+
+# Returned by scrape_article_content when the server answers 304 Not Modified
+NOT_MODIFIED = "not-modified"
+
+# 0. CRAWL STATE: seen URLs + validators, so daily refreshes only pay for changes
+def load_crawl_state(path):
     """
-    Crawls the blog pagination to find article links.
+    Reads {"articles": {url: {"etag", "last_modified"}}, "api_modified_after": ...,
+    "pending": [urls found on a listing whose fetch failed, retried next crawl]}.
     """
+    state = {"articles": {}, "api_modified_after": None, "pending": []}
+    if path and Path(path).exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state.update(json.load(f))
+        except json.JSONDecodeError as e:
+            print(f"⚠️ Could not read crawl state (starting fresh): {e}")
+    return state
+
+def save_crawl_state(state, path):
+    # Write to a temp file and swap it in, so a crash never leaves half a state file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+# 1. PARSERS (pure functions, no network)
+def extract_article_links(html):
+    """
+    Returns the set of blog-post links on a listing page.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
     links = set()
-    page = 1
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    for a in soup.find_all('a', href=True):
+        href = a['href']
+        # Filter for years (2020-2029 or 2010-2019) to find blog posts
+        # This regex looks for /YYYY/MM/ pattern common in WordPress
+        if re.search(r'/\d{4}/\d{2}/', href):
+            links.add(href)
+    return links
+
+def parse_article(html, url):
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # 1. Get Title
+    title_tag = soup.find('h1')
+    title = title_tag.get_text(strip=True) if title_tag else "No Title"
+
+    # 2. Get Date
+    date_meta = soup.find('meta', property='article:published_time')
+    date = date_meta['content'] if date_meta else ""
+
+    # 3. Get Content
+    article_body = soup.find(class_='entry-content') or \
+                   soup.find(class_='post-content') or \
+                   soup.find('article') or \
+                   soup.find('main')
+
+    if article_body:
+        # Optional: Remove "Share this" buttons if present
+        for junk in article_body.find_all(class_='sharedaddy'):
+            junk.decompose()
+        content = article_body.get_text(separator="\n", strip=True)
+    else:
+        content = ""
+
+    return {
+        "title": title,
+        "link": url,
+        "date": date,
+        "content": content
     }
 
+def parse_api_post(post):
+    """
+    Converts one /wp-json/wp/v2/posts item into the same shape as parse_article.
+    """
+    title_html = post.get("title", {}).get("rendered", "")
+    content_html = post.get("content", {}).get("rendered", "")
+    content_soup = BeautifulSoup(content_html, 'html.parser')
+    for junk in content_soup.find_all(class_='sharedaddy'):
+        junk.decompose()
+    return {
+        "title": BeautifulSoup(title_html, 'html.parser').get_text(strip=True) or "No Title",
+        "link": post.get("link", ""),
+        "date": post.get("date", ""),
+        "content": content_soup.get_text(separator="\n", strip=True)
+    }
+
+def as_utc(timestamp):
+    """
+    WordPress's *_gmt fields carry no offset; mark them as UTC ("Z") so the
+    API doesn't read them in the site's timezone.
+    """
+    if not timestamp or timestamp.endswith("Z") or re.search(r'[+-]\d{2}:\d{2}$', timestamp):
+        return timestamp
+    return timestamp + "Z"
+
+# 2. HTTP: one pooled session with a per-host budget
+class PoliteClient:
+    """
+    Wraps a single pooled httpx.AsyncClient (connections are reused across
+    requests) and caps concurrency and request rate per host.
+    """
+    def __init__(self, max_per_host=MAX_PER_HOST, min_interval=MIN_INTERVAL, timeout=15):
+        self.client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_per_host * 4, max_keepalive_connections=max_per_host * 2),
+        )
+        self.max_per_host = max_per_host
+        self.min_interval = min_interval
+        self.semaphores = {}
+        self.next_slot = {}
+        self.slot_lock = asyncio.Lock()
+
+    async def _wait_turn(self, host):
+        # Reserve the next start time for this host, then sleep until it arrives
+        async with self.slot_lock:
+            now = time.monotonic()
+            start = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = start + self.min_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def get(self, url, **kwargs):
+        host = urlsplit(url).netloc
+        semaphore = self.semaphores.setdefault(host, asyncio.Semaphore(self.max_per_host))
+        async with semaphore:
+            await self._wait_turn(host)
+            return await self.client.get(url, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+# 3. DISCOVERY
+async def get_article_links(http, index_url, max_pages=100, known_links=None):
+    """
+    Crawls the blog pagination to find article links, a few pages at a time.
+    With 'known_links', only unseen links are returned and the crawl stops at
+    the first listing page that holds nothing new (the blog is newest-first).
+    """
+    known_links = known_links or set()
+    links = set()
+    page = 1
+
     print(f"🔍 [Scraper] Collecting links from {index_url}...")
 
+    async def fetch_page(n):
+        url = index_url if n == 1 else f"{index_url.rstrip('/')}/page/{n}/"
+        try:
+            return n, await http.get(url)
+        except Exception as e:
+            return n, e
+
+    # Incremental crawls usually stop on page 1, so don't fetch pages ahead
+    step = 1 if known_links else LISTING_WINDOW
+
     while page <= max_pages:
-        # Construct pagination URL
-        if page == 1:
-            url = index_url
-        else:
-            url = f"{index_url.rstrip('/')}/page/{page}/"
+        window = range(page, min(page + step, max_pages + 1))
+        results = await asyncio.gather(*(fetch_page(n) for n in window))
+
+        # Process in page order so the stopping rules behave like a serial crawl
+        for n, resp in results:
+            if isinstance(resp, Exception):
+                print(f"\n   ❌ Error on page {n}: {resp}")
+                return list(links)
 
-        try:
-            print(f"   ⏳ Checking Page {page}...", end="\r")
-            resp = requests.get(url, headers=headers, timeout=15)
-            
             # If 404, we have gone past the last page
             if resp.status_code == 404:
-                print(f"\n   🏁 Reached end of blog at Page {page}. Stopping.")
-                break
-            
+                print(f"\n   🏁 Reached end of blog at Page {n}. Stopping.")
+                return list(links)
+
             if resp.status_code != 200:
-                print(f"\n   ⚠️ Page {page} returned {resp.status_code}. Skipping.")
-                page += 1
+                print(f"\n   ⚠️ Page {n} returned {resp.status_code}. Skipping.")
                 continue
 
-            soup = BeautifulSoup(resp.text, 'html.parser')
-            
-            new_links_found = 0
-            for a in soup.find_all('a', href=True):
-                href = a['href']
-                
-                # Filter for years (2020-2029 or 2010-2019) to find blog posts
-                # This regex looks for /YYYY/MM/ pattern common in WordPress
-                if re.search(r'/\d{4}/\d{2}/', href):
-                    if href not in links:
-                        links.add(href)
-                        new_links_found += 1
-            
-            print(f"   ✅ Page {page}: Found {new_links_found} new articles. (Total: {len(links)})")
-            
-            # If we load a valid page but find 0 new article links, we are likely on a 
+            page_links = extract_article_links(resp.text)
+            new_links = page_links - links - known_links
+            links |= new_links
+            print(f"   ✅ Page {n}: Found {len(new_links)} new articles. (Total: {len(links)})")
+
+            # If we load a valid page but find 0 new article links, we are likely on a
             # widget page or archive that isn't the main loop. Best to stop.
-            if new_links_found == 0 and page > 1:
+            if not new_links and (n > 1 or known_links):
                 print("   🏁 No new article links found on this page. Stopping.")
-                break
+                return list(links)
 
-            page += 1
-            # Sleep to prevent blocking
-            time.sleep(random.uniform(1, 2))
-
-        except Exception as e:
-            print(f"\n   ❌ Error on page {page}: {e}")
-            break
+        page += step
 
     return list(links)
 
-def scrape_article_content(url):
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-    
+async def fetch_posts_via_api(http, site_url, per_page=100, modified_after=None):
+    """
+    Bulk discovery through the WordPress REST API: each response carries up to
+    100 full posts, so no per-article HTML fetch is needed.
+    With 'modified_after', only posts edited since then are returned.
+    Returns (articles, latest modified timestamp), or None if the site does
+    not expose the API.
+    """
+    parts = urlsplit(site_url)
+    api_url = f"{parts.scheme}://{parts.netloc}/wp-json/wp/v2/posts"
+    print(f"🔍 [Scraper] Trying REST API at {api_url}...")
+
+    params = {"per_page": per_page}
+    if modified_after:
+        params["modified_after"] = as_utc(modified_after)
+
+    try:
+        first = await http.get(api_url, params={**params, "page": 1})
+    except Exception as e:
+        print(f"   ⚠️ REST API unavailable ({e}).")
+        return None
+    if first.status_code != 200:
+        print(f"   ⚠️ REST API returned {first.status_code}.")
+        return None
+
+    total_pages = int(first.headers.get("X-WP-TotalPages", "1"))
+    print(f"   👉 {first.headers.get('X-WP-Total', '?')} posts across {total_pages} API pages.")
+
+    async def fetch(n):
+        resp = await http.get(api_url, params={**params, "page": n})
+        resp.raise_for_status()
+        return resp.json()
+
+    pages = [first.json()]
+    try:
+        pages += await asyncio.gather(*(fetch(n) for n in range(2, total_pages + 1)))
+    except Exception as e:
+        # A partial post list would look complete to the caller: fall back to HTML instead
+        print(f"   ⚠️ REST API page failed ({e}).")
+        return None
+    posts = [post for page_posts in pages for post in page_posts]
+    latest = max((as_utc(post.get("modified_gmt")) or "" for post in posts), default="")
+    return [parse_api_post(post) for post in posts], latest or as_utc(modified_after)
+
+def is_recent(article, days=REVALIDATE_DAYS):
+    """
+    True if the article's published date is within 'days' (undated counts as old).
+    """
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
+        published = datetime.fromisoformat(article.get("date", ""))
+    except ValueError:
+        return False
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published >= datetime.now(timezone.utc) - timedelta(days=days)
+
+# 4. SCRAPING
+async def scrape_article_content(http, url, validators=None):
+    """
+    Fetches one article. With 'validators' from a previous crawl, sends a
+    conditional GET so an unchanged post costs a 304 instead of a full parse.
+    Returns (article or NOT_MODIFIED or None, new validators).
+    """
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    try:
+        resp = await http.get(url, timeout=10, headers=headers)
+        if resp.status_code == 304:
+            return NOT_MODIFIED, validators
         if resp.status_code != 200:
-            return None
-
-        soup = BeautifulSoup(resp.text, 'html.parser')
-
-        # 1. Get Title
-        title_tag = soup.find('h1')
-        title = title_tag.get_text(strip=True) if title_tag else "No Title"
-        
-        # 2. Get Date
-        date_meta = soup.find('meta', property='article:published_time')
-        date = date_meta['content'] if date_meta else ""
-
-        # 3. Get Content
-        article_body = soup.find(class_='entry-content') or \
-                       soup.find(class_='post-content') or \
-                       soup.find('article') or \
-                       soup.find('main')
-        
-        if article_body:
-            # Optional: Remove "Share this" buttons if present
-            for junk in article_body.find_all(class_='sharedaddy'):
-                junk.decompose()
-            content = article_body.get_text(separator="\n", strip=True)
-        else:
-            content = ""
-
-        return {
-            "title": title,
-            "link": url,
-            "date": date,
-            "content": content
+            return None, None
+        new_validators = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
         }
+        return parse_article(resp.text, url), new_validators
 
     except Exception as e:
         print(f"Error scraping {url}: {e}")
-        return None
+        return None, None
+
+async def crawl(index_url, max_pages=100, use_api=True, partial_path=None, http=None,
+                state=None, previous=None, revalidate_all=False):
+    """
+    Collects every article from the blog. Tries the REST API first (if enabled),
+    falling back to listing pages + concurrent per-article scraping.
+    'state' (see load_crawl_state) and 'previous' (last crawl's articles) make the
+    crawl incremental: known pages stop pagination early, and known articles
+    published in the last REVALIDATE_DAYS (all of them with 'revalidate_all')
+    are only re-downloaded if the server says they changed. New links that fail
+    to download are kept in state["pending"] and retried on the next crawl.
+    'state' is updated in place.
+    """
+    state = state if state is not None else {"articles": {}, "api_modified_after": None, "pending": []}
+    merged = {a["link"]: a for a in (previous or [])}
+    own_client = http is None
+    http = http or PoliteClient()
+    try:
+        if use_api:
+            result = await fetch_posts_via_api(http, index_url, modified_after=state.get("api_modified_after"))
+            if result is not None:
+                articles, latest = result
+                print(f"   👉 {len(articles)} new or edited posts since the last crawl.")
+                for art in articles:
+                    merged[art["link"]] = art
+                    state["articles"].setdefault(art["link"], {})
+                state["api_modified_after"] = latest
+                return list(merged.values())
+
+        # 1. Collect Links (stops at the first page with nothing new)
+        known = set(state["articles"]) & set(merged)
+        new_urls = await get_article_links(http, index_url, max_pages=max_pages, known_links=known)
+        # Earlier failures may have dropped off the listing pages this crawl reads
+        new_urls = set(new_urls) | {link for link in state.get("pending", []) if link not in merged}
+        pending = set()
+        to_check = sorted(link for link in known if revalidate_all or is_recent(merged[link]))
+        to_fetch = list(new_urls) + to_check
+        print(f"\n🚀 Fetching {len(new_urls)} new articles, re-validating {len(to_fetch) - len(new_urls)} known ones...")
+
+        # 2. Scrape concurrently (the client enforces the per-host budget)
+        async def fetch(link):
+            validators = state["articles"].get(link) if link in merged else None
+            data, new_validators = await scrape_article_content(http, link, validators)
+            return link, data, new_validators
+
+        scraped_data = []
+        unchanged = 0
+        tasks = [asyncio.create_task(fetch(link)) for link in to_fetch]
+        for i, task in enumerate(asyncio.as_completed(tasks)):
+            link, data, new_validators = await task
+            if data == NOT_MODIFIED:
+                unchanged += 1
+            elif data:
+                merged[link] = data
+                state["articles"][link] = new_validators
+                scraped_data.append(data)
+                print(f"   [{i+1}/{len(to_fetch)}] Scraped: {link}")
+            elif link in new_urls:
+                pending.add(link)
+
+            # Save every 10 articles (so you don't lose data if it crashes)
+            if partial_path and (i + 1) % 10 == 0:
+                with open(partial_path, "w", encoding="utf-8") as f:
+                    json.dump(scraped_data, f, ensure_ascii=False, indent=4)
+                print("      💾 (Auto-saved progress)")
+
+        state["pending"] = sorted(pending)
+        print(f"   ♻️  {unchanged} articles unchanged (304).")
+        if pending:
+            print(f"   ⏳ {len(pending)} new articles failed; they will be retried next crawl.")
+        return list(merged.values())
+    finally:
+        if own_client:
+            await http.aclose()
 
 # --- MAIN EXECUTION ---
 if __name__ == "__main__":
-    blog_index_url = "https://apnswami.wordpress.com/blogpages" 
-    
-    # 1. Collect Links (INCREASED MAX_PAGES TO 100)
-    article_urls = get_article_links(blog_index_url, max_pages=100)
-    
-    print(f"\n🚀 Starting scrape of {len(article_urls)} articles...")
-    
-    # Check if file exists to load previous progress (Optional, simple overwrite here)
+    blog_index_url = "https://apnswami.wordpress.com/blogpages"
+
     # Ensure data directory exists and set file paths (project-root data, robust)
-    from pathlib import Path
     project_root = Path(__file__).resolve().parents[2]
     data_dir = project_root / 'data'
     data_dir.mkdir(parents=True, exist_ok=True)
     partial_path = data_dir / "scraped_articles_partial.json"
     final_path = data_dir / "scraped_articles_final.json"
+    state_path = data_dir / "crawl_state.json"
+
+    # Previous results + validators turn the daily refresh into a handful of requests
+    previous = []
+    if final_path.exists():
+        with open(final_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    state = load_crawl_state(state_path)
 
-    scraped_data = []
-    
-    # 2. Scrape & Save Incrementally
-    for i, link in enumerate(article_urls):
-        print(f"   [{i+1}/{len(article_urls)}] Scraping: {link}")
-        
-        data = scrape_article_content(link)
-        if data:
-            scraped_data.append(data)
-        
-        # Save every 10 articles (so you don't lose data if it crashes)
-        if (i + 1) % 10 == 0:
-            with open(partial_path, "w", encoding="utf-8") as f:
-                json.dump(scraped_data, f, ensure_ascii=False, indent=4)
-            print("      💾 (Auto-saved progress)")
-            
-        time.sleep(1) 
+    # --revalidate-all: conditional GET for every known article, not just recent ones (slow)
+    scraped_data = asyncio.run(crawl(blog_index_url, max_pages=100, partial_path=partial_path,
+                                     state=state, previous=previous,
+                                     revalidate_all="--revalidate-all" in sys.argv))
 
     # 3. Final Save
     with open(final_path, "w", encoding="utf-8") as f:
         json.dump(scraped_data, f, ensure_ascii=False, indent=4)
+    save_crawl_state(state, state_path)
 
-    print(f"\n✅ DONE! Saved {len(scraped_data)} articles to '{final_path}'.")
\ No newline at end of file
+    print(f"\n✅ DONE! Saved {len(scraped_data)} articles to '{final_path}'.")
@@ -1,5 +1,7 @@
-import os
 import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import scrapetube
 from youtube_transcript_api import YouTubeTranscriptApi
 from pathlib import Path
@@ -8,73 +10,133 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DATA_DIR = PROJECT_ROOT / 'data'
 INPUT_FILE = DATA_DIR / "youtube_links.txt"
-OUTPUT_FILE = DATA_DIR / "youtube_dump.json"
+OUTPUT_FILE = DATA_DIR / "youtube_dump.jsonl"
+LEGACY_OUTPUT_FILE = DATA_DIR / "youtube_dump.json"
+MAX_WORKERS = 6
+MAX_RETRIES = 3
+LANGUAGES = ['en', 'ta', 'hi', 'kn', 'te']
 
-def get_transcript_safe(video_id):
+# Errors that retrying will never fix (the video simply has no usable transcript)
+PERMANENT_ERRORS = {
+    "TranscriptsDisabled", "NoTranscriptFound", "VideoUnavailable",
+    "InvalidVideoId", "AgeRestricted", "NotTranslatable",
+}
+
+def _fetch_transcript(video_id):
     """
     Retrieves transcript text using whatever method is available.
+    Raises on failure so the caller can decide whether to retry.
     """
-    try:
-        if hasattr(YouTubeTranscriptApi, 'list_transcripts'):
-            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-            t = transcript_list.find_transcript(['en', 'ta', 'hi', 'kn', 'te'])
+    if hasattr(YouTubeTranscriptApi, 'list_transcripts'):
+        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+        t = transcript_list.find_transcript(LANGUAGES)
+        return t.fetch()
+
+    api = YouTubeTranscriptApi()
+    if hasattr(api, 'list'):
+        transcript_list = api.list(video_id)
+        if hasattr(transcript_list, 'find_transcript'):
+            t = transcript_list.find_transcript(LANGUAGES)
             return t.fetch()
+    
+    if hasattr(api, 'fetch'):
+        return api.fetch(video_id, languages=LANGUAGES)
+    return None
 
-        api = YouTubeTranscriptApi()
-        if hasattr(api, 'list'):
-            transcript_list = api.list(video_id)
-            if hasattr(transcript_list, 'find_transcript'):
-                t = transcript_list.find_transcript(['en', 'ta', 'hi', 'kn', 'te'])
-                return t.fetch()
-        
-        if hasattr(api, 'fetch'):
-            return api.fetch(video_id, languages=['en', 'ta', 'hi', 'kn', 'te'])
-
-    except Exception:
-        return None
+def get_transcript_safe(video_id, retries=MAX_RETRIES):
+    """
+    Retrieves a transcript, retrying transient failures (throttling, network)
+    with jittered exponential backoff. Returns None if there is no transcript.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return _fetch_transcript(video_id)
+        except Exception as e:
+            if type(e).__name__ in PERMANENT_ERRORS or attempt == retries:
+                return None
+            time.sleep(random.uniform(0, 2 * (2 ** attempt)))
     return None
 
-def fetch_youtube_data():
-    if not INPUT_FILE.exists():
-        print(f"❌ Error: Input file '{INPUT_FILE}' not found.")
-        return
+def build_video_entry(vid_id, vid_title, raw_transcript):
+    full_text_parts = []
+    for item in raw_transcript:
+        if hasattr(item, 'text'):
+             full_text_parts.append(item.text)
+        elif isinstance(item, dict) and 'text' in item:
+             full_text_parts.append(item['text'])
+    
+    return {
+        "source": f"https://www.youtube.com/watch?v={vid_id}",
+        "title": vid_title,
+        "content": " ".join(full_text_parts),
+        "type": "youtube"
+    }
 
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
+def video_id_from_source(source):
+    # Extract ID from source url "https://...v=ID"
+    if 'v=' in source:
+        return source.split('v=')[-1]
+    return None
 
-    # --- 1. LOAD EXISTING DATA (Optimization) ---
-    existing_data = []
-    existing_ids = set()
-    
-    if OUTPUT_FILE.exists():
-        try:
-            with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
-                # Create a set of IDs for fast lookup
-                for item in existing_data:
-                    # Extract ID from source url "https://...v=ID"
-                    if 'v=' in item['source']:
-                        vid = item['source'].split('v=')[-1]
-                        existing_ids.add(vid)
-            print(f"📂 Loaded {len(existing_data)} videos from existing JSON.")
-        except Exception as e:
-            print(f"⚠️ Could not load existing JSON (starting fresh): {e}")
+def migrate_legacy_dump():
+    """
+    One-off: converts the old indent=4 youtube_dump.json into JSONL.
+    """
+    if OUTPUT_FILE.exists() or not LEGACY_OUTPUT_FILE.exists():
+        return
+    print(f"📦 Converting '{LEGACY_OUTPUT_FILE.name}' to '{OUTPUT_FILE.name}'...")
+    with open(LEGACY_OUTPUT_FILE, 'r', encoding='utf-8') as f:
+        videos = json.load(f)
+    tmp_path = OUTPUT_FILE.with_suffix(".jsonl.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for video in videos:
+            f.write(json.dumps(video, ensure_ascii=False) + "\n")
+    tmp_path.replace(OUTPUT_FILE)
 
-    # --- 2. PARSE INPUT LINKS ---
-    entries = []
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+def load_existing_ids():
+    """
+    Reads only the video IDs from the JSONL dump, one line at a time.
+    """
+    existing_ids = set()
+    if not OUTPUT_FILE.exists():
+        return existing_ids
+    with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
         for line in f:
-            line = line.strip()
-            # Skip empty lines OR lines starting with # (comments)
-            if not line or line.startswith("#"):
+            try:
+                vid = video_id_from_source(json.loads(line).get('source', ''))
+            except json.JSONDecodeError:
+                # A torn last line from a crash: that video will just be fetched again
                 continue
-            entries.append(line)
+            if vid:
+                existing_ids.add(vid)
+    return existing_ids
 
-    new_videos_count = 0
-    print(f"🎥 Crawler: Processing {len(entries)} playlists/links...")
+def trim_torn_tail(path, block_size=1 << 16):
+    """
+    Cuts a torn last line (a crash mid-write) off the dump, back to the last
+    newline, so the next append starts on a fresh line. Returns bytes removed.
+    """
+    if not path.exists():
+        return 0
+    with open(path, 'rb+') as f:
+        size = f.seek(0, 2)
+        end = size
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        f.truncate(end)
+    return size - end
 
+def iter_video_details(entries):
+    """
+    Yields {'id', 'title'} for every video in every playlist/link.
+    """
     for entry in entries:
-        video_details = [] 
-
         try:
             if "list=" in entry:
                 playlist_id = entry.split("list=")[-1].split("&")[0]
@@ -88,59 +150,77 @@ def fetch_youtube_data():
                             title = v['title'].get('runs', [{}])[0].get('text', 'Unknown Title')
                         else:
                             title = v['title']
-                    video_details.append({'id': v['videoId'], 'title': title})
+                    yield {'id': v['videoId'], 'title': title}
             else:
                 vid = entry.split("v=")[-1].split("&")[0]
-                video_details.append({'id': vid, 'title': 'Single Video'})
+                yield {'id': vid, 'title': 'Single Video'}
         except Exception:
             continue
 
-        # --- 3. PROCESS VIDEOS ---
-        for video in video_details:
-            vid_id = video['id']
-            vid_title = video['title']
-            
+def fetch_youtube_data(max_workers=MAX_WORKERS):
+    if not INPUT_FILE.exists():
+        print(f"❌ Error: Input file '{INPUT_FILE}' not found.")
+        return
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+    # --- 1. LOAD EXISTING IDS (Optimization) ---
+    migrate_legacy_dump()
+    existing_ids = load_existing_ids()
+    # The torn video isn't in existing_ids, so it gets fetched again below
+    if trim_torn_tail(OUTPUT_FILE):
+        print(f"🩹 Removed a torn last line from '{OUTPUT_FILE.name}'.")
+    print(f"📂 Found {len(existing_ids)} videos already in '{OUTPUT_FILE.name}'.")
+
+    # --- 2. PARSE INPUT LINKS ---
+    entries = []
+    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            # Skip empty lines OR lines starting with # (comments)
+            if not line or line.startswith("#"):
+                continue
+            entries.append(line)
+
+    new_videos_count = 0
+    print(f"🎥 Crawler: Processing {len(entries)} playlists/links with {max_workers} workers...")
+
+    # --- 3. PROCESS VIDEOS (bounded worker pool, append-only output) ---
+    pending = {}
+    with open(OUTPUT_FILE, 'a', encoding='utf-8') as out, ThreadPoolExecutor(max_workers=max_workers) as pool:
+
+        def collect(done):
+            nonlocal new_videos_count
+            for future in done:
+                video = pending.pop(future)
+                raw_transcript = future.result()
+                if raw_transcript:
+                    # One line per video, flushed immediately: progress survives a crash
+                    entry = build_video_entry(video['id'], video['title'], raw_transcript)
+                    out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                    out.flush()
+                    new_videos_count += 1
+                    print(f"      ✅ Saved: {video['id']} ({new_videos_count} new)")
+
+        for video in iter_video_details(entries):
             # --- THE CHECK: SKIP IF EXISTS ---
-            if vid_id in existing_ids:
-                # print(f"      ⏭️  Skipping (Already in JSON): {vid_id}", end="\r")
+            if video['id'] in existing_ids:
                 continue
+            existing_ids.add(video['id'])
 
-            print(f"      ⬇️  Fetching New: {vid_id}...", end="\r")
-            
-            raw_transcript = get_transcript_safe(vid_id)
-            
-            if raw_transcript:
-                full_text_parts = []
-                for item in raw_transcript:
-                    if hasattr(item, 'text'):
-                         full_text_parts.append(item.text)
-                    elif isinstance(item, dict) and 'text' in item:
-                         full_text_parts.append(item['text'])
-                
-                full_text = " ".join(full_text_parts)
-                
-                video_entry = {
-                    "source": f"https://www.youtube.com/watch?v={vid_id}",
-                    "title": vid_title,
-                    "content": full_text,
-                    "type": "youtube"
-                }
-                
-                # Append to memory lists
-                existing_data.append(video_entry)
-                existing_ids.add(vid_id)
-                new_videos_count += 1
-            else:
-                pass
+            if len(pending) >= max_workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending[pool.submit(get_transcript_safe, video['id'])] = video
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
 
-    # --- 4. SAVE ONLY IF NEW DATA ---
     if new_videos_count > 0:
-        print(f"\n\n💾 Saving {len(existing_data)} videos (Added {new_videos_count} new) to '{OUTPUT_FILE}'...")
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, ensure_ascii=False, indent=4)
-        print("✅ Done!")
+        print(f"\n✅ Done! Added {new_videos_count} new videos to '{OUTPUT_FILE}'.")
     else:
-        print(f"\n✅ No new videos found. JSON is up to date.")
+        print(f"\n✅ No new videos found. Dump is up to date.")
 
 if __name__ == "__main__":
-    fetch_youtube_data()
\ No newline at end of file
+    fetch_youtube_data()
@@ -1,29 +1,26 @@
-import json
 import os
 from langchain_core.documents import Document
+from src.extractors.json_records import iter_json_records
 
-def load_youtube_json(json_path):
+def iter_youtube_json(json_path):
     """
-    Reads the youtube_dump.json and converts it into standard AI Documents.
+    Streams the youtube dump (JSON array or JSONL) as LangChain Documents,
+    one video at a time.
     """
     if not os.path.exists(json_path):
         print(f"❌ Error: File '{json_path}' not found.")
         print("   (Run 'src/extractors/youtube.py' first!)")
-        return []
+        return
 
-    with open(json_path, 'r', encoding='utf-8') as f:
-        videos = json.load(f)
-    
-    documents = []
-    print(f"🎥 Loader: Loading {len(videos)} videos from JSON...")
+    print(f"🎥 Loader: Streaming videos from '{json_path}'...")
 
-    for vid in videos:
+    for vid in iter_json_records(json_path):
         # Construct content for AI
         enhanced_content = f"Video Title: {vid.get('title', 'Unknown')}\n"
         enhanced_content += f"Author: {vid.get('author', '')}\n\n"
         enhanced_content += vid.get('content', '')
         
-        doc = Document(
+        yield Document(
             page_content=enhanced_content,
             metadata={
                 "source": vid.get('source', ''),
@@ -32,6 +29,9 @@ def load_youtube_json(json_path):
                 "thumbnail": vid.get('thumbnail', '') # Store thumbnail for UI!
             }
         )
-        documents.append(doc)
-        
-    return documents
\ No newline at end of file
+
+def load_youtube_json(json_path):
+    """
+    Reads the youtube_dump.json and converts it into standard AI Documents.
+    """
+    return list(iter_youtube_json(json_path))
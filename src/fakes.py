@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+import random
+import threading
+import time
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+# Stand-ins for Gemini so the whole pipeline runs offline (FAKE_MODELS=1).
+# Both can inject 429s, which flow through the same retry/backoff paths as real ones:
+# at random ('error_rate') or, for the embedder, on a fixed schedule of call numbers.
+
+class RateLimitError(Exception):
+    pass
+
+def _maybe_throttle(rng, rate, lock):
+    with lock:
+        hit = rate > 0 and rng.random() < rate
+    if hit:
+        raise RateLimitError("429 RESOURCE_EXHAUSTED (injected)")
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic embeddings: the same text always maps to the same unit
+    vector (seeded by its hash), so search results are reproducible.
+    'fail_calls' lists 1-based call numbers that fail with a 429.
+    """
+    def __init__(self, dim=768, latency=0.0, per_text_latency=0.0, error_rate=0.0, seed=0, fail_calls=()):
+        self.dim = dim
+        self.latency = latency
+        self.per_text_latency = per_text_latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.fail_calls = set(fail_calls)
+
+    def _vector(self, text, task_type):
+        digest = hashlib.sha256(f"{task_type}|{text}".encode("utf-8")).digest()
+        v = np.random.default_rng(int.from_bytes(digest[:8], "little")).normal(size=self.dim)
+        return (v / np.linalg.norm(v)).tolist()
+
+    def _call(self, n):
+        with self.lock:
+            self.calls += 1
+            scheduled = self.calls in self.fail_calls
+        time.sleep(self.latency + self.per_text_latency * n)
+        if scheduled:
+            raise RateLimitError(f"429 RESOURCE_EXHAUSTED (scheduled, call {self.calls})")
+        _maybe_throttle(self.rng, self.error_rate, self.lock)
+
+    def embed_documents(self, texts, task_type=None):
+        self._call(len(texts))
+        # Query and document vectors of the same text are identical, so questions copied from
+        # the corpus find their source
+        return [self._vector(t, "") for t in texts]
+
+    def embed_query(self, text):
+        self._call(1)
+        return self._vector(text, "")
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(self.latency + self.per_text_latency)
+        _maybe_throttle(self.rng, self.error_rate, self.lock)
+        return self._vector(text, "")
+
+class FakeLLM:
+    """
+    Streams a canned answer with a fixed time to first token and per-token gap.
+    """
+    def __init__(self, first_token=0.0, token_interval=0.0, n_tokens=50, error_rate=0.0, seed=0):
+        self.first_token = first_token
+        self.token_interval = token_interval
+        self.n_tokens = n_tokens
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def _tokens(self):
+        return [f"word{i} " for i in range(self.n_tokens)]
+
+    def invoke(self, prompt):
+        time.sleep(self.first_token)
+        _maybe_throttle(self.rng, self.error_rate, self.lock)
+        return AIMessage(content="".join(self._tokens()))
+
+    def stream(self, prompt):
+        time.sleep(self.first_token)
+        _maybe_throttle(self.rng, self.error_rate, self.lock)
+        for token in self._tokens():
+            time.sleep(self.token_interval)
+            yield AIMessageChunk(content=token)
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(self.first_token)
+        _maybe_throttle(self.rng, self.error_rate, self.lock)
+        return AIMessage(content="".join(self._tokens()))
+
+    async def astream(self, prompt):
+        await asyncio.sleep(self.first_token)
+        _maybe_throttle(self.rng, self.error_rate, self.lock)
+        for token in self._tokens():
+            await asyncio.sleep(self.token_interval)
+            yield AIMessageChunk(content=token)
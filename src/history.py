@@ -0,0 +1,107 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src import config
+from src.prompts import SUMMARY_TEMPLATE
+from src.uploader import estimate_tokens
+
+# --- CONFIGURATION ---
+KEEP_RECENT = 4            # newest messages always kept word for word
+MIN_PIECE_TOKENS = 20      # smallest truncated message worth including
+
+# Summaries run here, never on the request path
+_summarizers = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+
+def _role_text(message):
+    # Accepts LangChain messages or the API's {"role", "content"} dicts
+    if isinstance(message, dict):
+        role = "User" if message.get("role") == "user" else "Assistant"
+        return role, message.get("content", "")
+    return ("User" if message.type == "human" else "Assistant"), message.content
+
+def _clip(text, tokens):
+    cut = text[:tokens * 4]
+    if len(cut) < len(text) and " " in cut:
+        cut = cut[:cut.rfind(" ")]
+    return cut + " ..."
+
+class HistoryManager:
+    """
+    Keeps the history section of a prompt under 'token_ceiling' tokens,
+    however long the conversation gets: older turns are folded into a rolling
+    summary, the newest ones stay verbatim. One instance per session; the
+    summary is refreshed in the background after an answer has been shown.
+    """
+    def __init__(self, llm, token_ceiling=None):
+        self.llm = llm
+        self.token_ceiling = token_ceiling or config.HISTORY_TOKEN_BUDGET
+        self.summary = ""
+        self.summarized = 0      # number of leading messages already folded into the summary
+        self.future = None
+        self.lock = threading.Lock()
+
+    def render(self, messages, empty=""):
+        """
+        Summary + the unsummarized tail, newest messages first to get budget.
+        """
+        with self.lock:
+            if len(messages) < self.summarized:
+                # The conversation was cleared: start over
+                self.summary, self.summarized = "", 0
+            summary, start = self.summary, self.summarized
+
+        budget = self.token_ceiling
+        header = ""
+        if summary:
+            summary = summary if estimate_tokens(summary) <= budget // 2 else _clip(summary, budget // 2)
+            header = f"Summary of the earlier conversation: {summary}"
+            budget -= estimate_tokens(header)
+
+        lines = []
+        for message in reversed(messages[start:]):
+            role, text = _role_text(message)
+            line = f"{role}: {text}"
+            cost = estimate_tokens(line)
+            if cost > budget:
+                if budget >= MIN_PIECE_TOKENS:
+                    lines.append(_clip(line, budget))
+                break
+            lines.append(line)
+            budget -= cost
+        lines.reverse()
+
+        history = "\n".join(([header] if header else []) + lines)
+        return history or empty
+
+    def schedule(self, messages):
+        """
+        Call after an answer has been shown. If the verbatim tail has grown past
+        half the ceiling, folds all but the newest KEEP_RECENT messages into the
+        summary on a background thread.
+        """
+        with self.lock:
+            if self.future is not None and not self.future.done():
+                return
+            upto = len(messages) - KEEP_RECENT
+            if upto <= self.summarized:
+                return
+            tail_tokens = sum(estimate_tokens(_role_text(m)[1]) for m in messages[self.summarized:])
+            if tail_tokens <= self.token_ceiling // 2:
+                return
+            older = list(messages[self.summarized:upto])
+            self.future = _summarizers.submit(self._summarize, self.summary, older, upto)
+
+    def _summarize(self, summary, older, upto):
+        transcript = "\n".join(f"{role}: {text}" for role, text in map(_role_text, older))
+        try:
+            response = self.llm.invoke(SUMMARY_TEMPLATE.format(
+                summary=summary or "(none)",
+                transcript=transcript,
+                max_words=self.token_ceiling // 2 * 3 // 4,   # ~0.75 words per token
+            ))
+        except Exception as e:
+            # Keep the old summary; the verbatim tail is still trimmed to the ceiling
+            print(f"⚠️  History summary failed: {e}")
+            return
+        with self.lock:
+            self.summary = response.content.strip()
+            self.summarized = upto
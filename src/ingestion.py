@@ -0,0 +1,403 @@
+# src/ingestion.py
+# The one ingestion engine: load -> split -> diff against manifest -> upload,
+# resumable from the checkpoint journal.
+import os
+import time
+from itertools import tee
+from qdrant_client import models
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.extractors.wordpress_loader import iter_cleaned_json
+from src.database import upload_chunks, get_existing_sources, delete_points, delete_source, bump_collection_version, any_points_exist
+from src.manifest import load_manifest, save_manifest, content_hash, chunk_ids_for
+from src.extractors.youtube_loader import iter_youtube_json
+from src import config
+from src.journal import CheckpointJournal
+from src.lexical_index import LexicalIndex
+from src.chunk_store import ChunkStore, CHUNK_STORE_DIR
+from src.storage_profiles import vectors_config, quantization_config, hnsw_config
+
+# --- CONFIGURATION ---
+ARTICLES_JSON_FILE = os.path.join("data", "cleaned_articles.json")
+YOUTUBE_JSON_FILE = os.path.join("data", "youtube_dump.jsonl")
+# Older crawls wrote a single JSON array; still readable until youtube.py converts it
+LEGACY_YOUTUBE_JSON_FILE = os.path.join("data", "youtube_dump.json")
+
+def ensure_collection(client):
+    """
+    Creates the collection if it does not exist yet, detecting the vector size
+    from a test embedding. Returns False if the collection could not be created,
+    or if an existing one was built for a different STORAGE_PROFILE.
+    """
+    if client.collection_exists(config.COLLECTION_NAME):
+        if not check_profile(client):
+            return False
+        apply_hnsw_config(client)
+        print(f"   ✅ Collection '{config.COLLECTION_NAME}' is ready.")
+        return True
+    profile = config.STORAGE_PROFILE
+    try:
+        print("   🧪 Testing model dimensions...")
+        vector_size = expected_vector_size()
+        print(f"   📏 Detected Vector Size: {vector_size}")
+
+        print(f"   🆕 Creating collection '{config.COLLECTION_NAME}' (profile '{config.STORAGE_PROFILE_NAME}')...")
+        client.create_collection(
+            collection_name=config.COLLECTION_NAME,
+            vectors_config=vectors_config(profile, vector_size),
+            quantization_config=quantization_config(profile),
+            hnsw_config=hnsw_config(config.HNSW_M, config.HNSW_EF_CONSTRUCT),
+        )
+        return True
+    except Exception as e:
+        print(f"   ❌ Failed to initialize DB: {e}")
+        return False
+
+def expected_vector_size():
+    # get_embeddings() already truncates to the profile's dim, if it sets one
+    return config.STORAGE_PROFILE["dim"] or len(config.get_embeddings().embed_query("test"))
+
+def check_profile(client):
+    """
+    False (with the reason) if the existing collection's vector size doesn't
+    match STORAGE_PROFILE: every upload and query would fail against it.
+    A quantization mismatch still works, so it only warns.
+    """
+    try:
+        params = client.get_collection(config.COLLECTION_NAME).config
+        size = params.params.vectors.size
+        expected = expected_vector_size()
+    except Exception as e:
+        print(f"   ❌ Could not check the collection against profile '{config.STORAGE_PROFILE_NAME}': {e}")
+        return False
+    if size != expected:
+        print(f"   ❌ Collection '{config.COLLECTION_NAME}' holds {size}-dim vectors, but profile "
+              f"'{config.STORAGE_PROFILE_NAME}' produces {expected}-dim ones. Switch STORAGE_PROFILE back, "
+              f"or delete the collection (and data/ingest_manifest.json) to rebuild it with the new profile.")
+        return False
+    quantization = params.quantization_config
+    current = ("scalar" if isinstance(quantization, models.ScalarQuantization)
+               else "binary" if isinstance(quantization, models.BinaryQuantization) else None)
+    if current != config.STORAGE_PROFILE["quantization"]:
+        print(f"   ⚠️ Collection quantization is {current or 'none'}, profile "
+              f"'{config.STORAGE_PROFILE_NAME}' expects {config.STORAGE_PROFILE['quantization'] or 'none'}.")
+    return True
+
+def apply_hnsw_config(client):
+    """
+    Brings an existing collection's HNSW graph in line with HNSW_M /
+    HNSW_EF_CONSTRUCT. Qdrant rebuilds the graph in the background.
+    """
+    if config.QDRANT_LOCATION:
+        return   # the embedded store searches exhaustively, there is no graph to tune
+    try:
+        current = client.get_collection(config.COLLECTION_NAME).config.hnsw_config
+        if (current.m, current.ef_construct) == (config.HNSW_M, config.HNSW_EF_CONSTRUCT):
+            return
+        print(f"   🔧 Updating HNSW (m {current.m} -> {config.HNSW_M}, "
+              f"ef_construct {current.ef_construct} -> {config.HNSW_EF_CONSTRUCT}); the index rebuilds in the background.")
+        client.update_collection(
+            collection_name=config.COLLECTION_NAME,
+            hnsw_config=hnsw_config(config.HNSW_M, config.HNSW_EF_CONSTRUCT),
+        )
+    except Exception as e:
+        # The old graph still serves queries: ingest anyway, retry on the next run
+        print(f"   ⚠️ Could not update the HNSW config (keeping the current one): {e}")
+
+def ensure_database_setup(client):
+    """
+    Ensures the Qdrant collection has the necessary search index 
+    for 'metadata.source'. Without this, filtering will fail.
+    """
+    print("⚙️  Verifying database structure...")
+    try:
+        client.create_payload_index(
+            collection_name=config.COLLECTION_NAME,
+            field_name="metadata.source",
+            field_schema=models.PayloadSchemaType.KEYWORD,
+        )
+        # Give the server a moment to register the change (local mode has no server)
+        if not config.QDRANT_LOCATION:
+            time.sleep(1)
+    except Exception:
+        # If it already exists, it might throw a harmless error, which we ignore
+        pass
+
+def iter_all_documents():
+    """
+    Lazily yields every Document from every source, one at a time.
+    """
+    # Articles
+    if os.path.exists(ARTICLES_JSON_FILE):
+        print(f"📄 Checking {ARTICLES_JSON_FILE}...")
+        yield from iter_cleaned_json(ARTICLES_JSON_FILE)
+    else:
+        print(f"⚠️  File not found: {ARTICLES_JSON_FILE} (Skipping articles)")
+
+    # YouTube
+    youtube_file = YOUTUBE_JSON_FILE if os.path.exists(YOUTUBE_JSON_FILE) else LEGACY_YOUTUBE_JSON_FILE
+    if os.path.exists(youtube_file):
+        print(f"🎥 Checking {youtube_file}...")
+        yield from iter_youtube_json(youtube_file)
+    else:
+        print(f"⚠️  File not found: {YOUTUBE_JSON_FILE} (Skipping YouTube)")
+
+class ChangeTracker:
+    """
+    Turns a stream of Documents into a stream of (chunk, point_id) pairs that
+    actually need embedding, and commits each source to the manifest only once
+    all of its new chunks have been acknowledged by Qdrant.
+    'known_sources' is the set of sources Qdrant holds (None if unknown).
+    """
+    def __init__(self, client, manifest, known_sources, splitter, journal=None, dry_run=False, lexical=None):
+        self.client = client
+        self.lexical = lexical
+        self.journal = journal
+        self.dry_run = dry_run
+        self.acked = journal.acked if journal else set()
+        self.restoring = journal.missing if journal else set()
+        self.manifest = manifest
+        self.known_sources = known_sources
+        self.splitter = splitter
+        self.pending = {}        # source -> {"remaining", "entry", "stale", "is_new"}
+        self.id_to_source = {}   # point id -> source, for in-flight chunks only
+        self.unsaved = 0
+        self.seen = 0
+        self.new_items = 0
+        self.updated_items = 0
+        self.skipped = 0
+        self.missing = 0
+
+    def _log(self, message):
+        # Dry runs (the status command) only count, they don't narrate
+        if not self.dry_run:
+            print(message)
+
+    def plan(self, docs):
+        for doc in docs:
+            self.seen += 1
+            # We use 'source' because that's where we stored the URL
+            link = doc.metadata.get("source", "Unknown URL")
+            doc_hash = content_hash(doc.page_content)
+            entry = self.manifest.get(link)
+
+            # Points removed behind the manifest's back (repair scripts, a reset
+            # collection): treat the source as new so it gets uploaded again.
+            # The journal remembers it in case this run is cut short.
+            if entry is not None and (
+                (self.known_sources is not None and link not in self.known_sources)
+                or link in self.restoring
+            ):
+                self._log(f"   [MISSING] Not in the database any more: {link}")
+                if self.journal and not self.dry_run and link not in self.restoring:
+                    self.journal.mark_missing(link)
+                entry = None
+                self.missing += 1
+
+            # A. CHECK (Idempotency): unchanged content costs nothing
+            if entry and entry["hash"] == doc_hash:
+                self.skipped += 1
+                # Backfill the lexical index (local split only, no embedding)
+                if self.lexical is not None and entry["chunks"] and link not in self.lexical.by_source:
+                    self.lexical.set_source(link, entry["chunks"], self.splitter.split_documents([doc]))
+                continue
+
+            # B. SPLIT (Only if it's new or changed!)
+            chunks = self.splitter.split_documents([doc])
+            chunk_ids = chunk_ids_for(link, chunks)
+
+            # Uploaded before the manifest existed: adopt it as-is (random point IDs).
+            # If the journal or Qdrant has some of its chunk IDs, it is a half-finished
+            # upload instead (a batch can land without its ack reaching the journal).
+            if (entry is None and link in (self.known_sources or ())
+                    and not self.acked.intersection(chunk_ids)
+                    and (self.dry_run or not any_points_exist(self.client, chunk_ids))):
+                self.manifest[link] = {"hash": doc_hash, "chunks": None}
+                self.skipped += 1
+                continue
+
+            if entry is None:
+                self._log(f"   [NEW] Processing: {link}")
+                old_ids = set()
+            elif entry["chunks"] is None:
+                # Legacy points have no stable IDs, so clear the whole source first
+                self._log(f"   [CHANGED] Re-uploading legacy source: {link}")
+                if not self.dry_run:
+                    delete_source(self.client, link)
+                old_ids = set()
+            else:
+                self._log(f"   [CHANGED] Processing: {link}")
+                old_ids = set(entry["chunks"])
+
+            # C. Only chunks whose (position, content) is new need embedding,
+            #    minus any the journal says Qdrant already acknowledged
+            changed = [
+                (c, pid) for c, pid in zip(chunks, chunk_ids)
+                if pid not in old_ids and pid not in self.acked
+            ]
+            self.pending[link] = {
+                "remaining": {pid for _, pid in changed},
+                "entry": {"hash": doc_hash, "chunks": chunk_ids},
+                "stale": old_ids - set(chunk_ids),
+                "is_new": entry is None,
+                "chunks": chunks,
+            }
+            if not changed:
+                self._finish(link)
+                continue
+
+            for chunk, pid in changed:
+                self.id_to_source[pid] = link
+                yield chunk, pid
+
+    def on_batch_done(self, batch_ids):
+        if self.journal:
+            self.journal.ack(batch_ids)
+        for pid in batch_ids:
+            link = self.id_to_source.pop(pid, None)
+            if link is None or link not in self.pending:
+                continue
+            self.pending[link]["remaining"].discard(pid)
+            if not self.pending[link]["remaining"]:
+                self._finish(link)
+
+    def _finish(self, link):
+        state = self.pending.pop(link)
+        if self.dry_run:
+            return
+
+        # D. REMOVE chunks that no longer exist in the new version
+        if state["stale"]:
+            delete_points(self.client, state["stale"])
+            print(f"      🗑️  Removed {len(state['stale'])} stale chunks from {link}.")
+
+        self.manifest[link] = state["entry"]
+        if self.lexical is not None:
+            self.lexical.set_source(link, state["entry"]["chunks"], state["chunks"])
+        if state["is_new"]:
+            self.new_items += 1
+        else:
+            self.updated_items += 1
+
+        # Save now and then rather than rewriting the manifest for every source
+        self.unsaved += 1
+        if self.unsaved >= 20:
+            self.save()
+
+    def save(self):
+        if self.dry_run:
+            return
+        save_manifest(self.manifest)
+        self.unsaved = 0
+
+def run_pipeline():
+    """
+    Runs (or resumes) a full ingestion. Safe to kill at any point: the next
+    run picks up from the checkpoint journal without re-embedding anything.
+    """
+    print("🤖 STARTING SMART INGESTION...")
+    print("-" * 50)
+    
+    # 1. Setup Client
+    client = config.get_qdrant_client()
+    if not ensure_collection(client):
+        return
+    ensure_database_setup(client)
+
+    # Fetch every known source once, then check each doc in memory
+    known_sources = get_existing_sources(client)
+    if known_sources is None:
+        print("   ⚠️ Sources missing from the database won't be detected this run.")
+    else:
+        print(f"   📚 {len(known_sources)} sources already in the database.")
+
+    # The manifest remembers the content hash + point IDs of every source we uploaded;
+    # the journal remembers chunks acknowledged since the last complete run
+    manifest = load_manifest()
+    journal = CheckpointJournal()
+    if journal.acked:
+        print(f"   ♻️  Resuming: {len(journal.acked)} chunks already acknowledged in the journal.")
+    journal.start_run()
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=config.CHUNK_SIZE, chunk_overlap=config.CHUNK_OVERLAP)
+    lexical = LexicalIndex.load()
+    tracker = ChangeTracker(client, manifest, known_sources, splitter, journal=journal, lexical=lexical)
+
+    # 2. STREAM: load -> split -> upload, one document at a time
+    try:
+        pairs_a, pairs_b = tee(tracker.plan(iter_all_documents()))
+        upload_chunks(
+            (chunk for chunk, _ in pairs_a),
+            ids=(pid for _, pid in pairs_b),
+            on_batch_done=tracker.on_batch_done,
+        )
+    except KeyboardInterrupt:
+        print("\n   ✋ Interrupted. Progress is saved; re-run to resume.")
+    finally:
+        tracker.save()
+        journal.close()
+        # The lexical index self-heals from the manifest, so saving once per run is enough
+        rebuild_store = lexical.dirty or not os.path.exists(os.path.join(CHUNK_STORE_DIR, "index.json"))
+        if lexical.dirty:
+            lexical.save()
+            print(f"   🔤 Lexical index saved ({len(lexical)} chunks).")
+        # Same chunks, laid out for lookups by point id (slim-payload serving)
+        if rebuild_store:
+            count = ChunkStore.write(lexical.docs)
+            print(f"   🗃️  Chunk store written ({count} chunks).")
+
+    if tracker.seen == 0:
+        print("\n❌ No documents found from ANY source. Exiting.")
+        return
+
+    # Tell running apps their cached search results are out of date
+    if tracker.new_items or tracker.updated_items:
+        version = bump_collection_version(client)
+        print(f"   🔖 Collection version is now {version}.")
+
+    # Everything landed and the manifest covers it: the journal is no longer needed
+    if not tracker.pending:
+        journal.clear()
+
+    print("-" * 50)
+    print(f"🎉 DONE!")
+    print(f"   - Skipped: {tracker.skipped} (Unchanged)")
+    print(f"   - Uploaded: {tracker.new_items} new items")
+    print(f"   - Updated: {tracker.updated_items} changed items")
+    if tracker.missing:
+        print(f"   - Restored: {tracker.missing} items missing from the database")
+    if tracker.pending:
+        print(f"   - Incomplete: {len(tracker.pending)} items (re-run to resume)")
+
+def print_status():
+    """
+    Reports progress of the current/last run from the journal, plus an ETA
+    based on a dry run of the planner (splits locally; the only network call
+    lists the sources already in Qdrant, so legacy ones count as adopted).
+    """
+    journal = CheckpointJournal()
+    run_acked, total_acked, elapsed = journal.current_run_stats()
+
+    try:
+        client = config.get_qdrant_client()
+        known_sources = get_existing_sources(client) if client.collection_exists(config.COLLECTION_NAME) else set()
+    except Exception as e:
+        print(f"   ⚠️ Could not reach Qdrant, legacy sources count as remaining: {e}")
+        known_sources = None
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=config.CHUNK_SIZE, chunk_overlap=config.CHUNK_OVERLAP)
+    tracker = ChangeTracker(None, load_manifest(), known_sources, splitter, journal=journal, dry_run=True)
+    remaining = sum(1 for _ in tracker.plan(iter_all_documents()))
+
+    print("-" * 50)
+    print(f"📊 Chunks acknowledged (this run): {run_acked}")
+    print(f"📊 Chunks acknowledged (journal):  {total_acked}")
+    print(f"📦 Chunks remaining:               {remaining}")
+    if run_acked and elapsed > 0:
+        rate = run_acked / elapsed
+        print(f"⚡ Throughput: {rate:.2f} chunks/sec ({rate * 60:.0f}/min)")
+        print(f"⏱️  ETA: {remaining / rate / 60:.1f} minutes")
+    elif remaining == 0:
+        print("✅ Nothing left to ingest.")
+    else:
+        print("⏱️  ETA: unknown (no throughput measured yet)")
+    print("-" * 50)
@@ -0,0 +1,84 @@
+import json
+import os
+import time
+
+# --- CONFIGURATION ---
+JOURNAL_FILE = os.path.join("data", "ingest_journal.jsonl")
+
+class CheckpointJournal:
+    """
+    Append-only log of chunk IDs that Qdrant has acknowledged.
+    Every acknowledged batch is written and fsync'd before we move on, so after
+    a crash, kill or quota exhaustion the next run skips exactly those chunks.
+    The journal is cleared once a run completes and the manifest covers everything.
+    It also lists sources found missing from Qdrant, until they are re-uploaded.
+    """
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.acked = set()
+        self.missing = set()
+        self.records = []
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from a crash mid-write: ignore it
+                        continue
+                    self.records.append(record)
+                    self.acked.update(record.get("ids", []))
+                    if "missing" in record:
+                        self.missing.add(record["missing"])
+        self.file = None
+
+    def _write(self, record):
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.file = open(self.path, 'a', encoding='utf-8')
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.records.append(record)
+
+    def start_run(self):
+        self._write({"t": time.time(), "event": "start"})
+
+    def ack(self, ids):
+        self._write({"t": time.time(), "ids": list(ids)})
+        self.acked.update(ids)
+
+    def mark_missing(self, source):
+        self._write({"t": time.time(), "missing": source})
+        self.missing.add(source)
+
+    def clear(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.acked = set()
+        self.missing = set()
+        self.records = []
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def current_run_stats(self):
+        """
+        Returns (chunks acked this run, chunks acked in total, seconds elapsed)
+        for the most recent run in the journal.
+        """
+        start_t = None
+        run_acked = 0
+        last_t = None
+        for record in self.records:
+            if record.get("event") == "start":
+                start_t = record["t"]
+                run_acked = 0
+            elif "ids" in record:
+                run_acked += len(record["ids"])
+            last_t = record["t"]
+        elapsed = (last_t - start_t) if start_t is not None and last_t is not None else 0.0
+        return run_acked, len(self.acked), elapsed
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from qdrant_client import models
+from src import config
+from src.storage_profiles import search_params
+
+# --- CONFIGURATION ---
+LEXICAL_INDEX_FILE = os.path.join("data", "lexical_index.json")
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60
+
+def tokenize(text):
+    return re.findall(r"\w+", text.casefold())
+
+def normalize_title(text):
+    """
+    "Sri Stuti", "sri stuti?" and '"Sri  Stuti"' all map to the same key.
+    """
+    return " ".join(tokenize(text))
+
+def fusion_key(payload):
+    # Chunks are matched by content, so legacy points with random IDs still fuse
+    return hashlib.sha256(payload.get("page_content", "").encode("utf-8")).hexdigest()
+
+class LexicalIndex:
+    """
+    In-process BM25 inverted index over the same chunks that live in Qdrant.
+    Ingestion keeps it in sync per source; the app loads it once at start.
+    """
+    def __init__(self):
+        self.docs = {}                      # point id -> {"text", "metadata"}
+        self.by_source = defaultdict(list)  # source -> point ids, in chunk order
+        self.postings = defaultdict(dict)   # term -> {point id: term frequency}
+        self.lengths = {}                   # point id -> number of tokens
+        self.titles = defaultdict(list)     # normalized title -> point ids
+        self.total_length = 0
+        self.dirty = False
+
+    # 1. BUILDING
+    def _add(self, point_id, text, metadata):
+        tokens = tokenize(text)
+        self.docs[point_id] = {"text": text, "metadata": metadata}
+        self.lengths[point_id] = len(tokens)
+        self.total_length += len(tokens)
+        for term, tf in Counter(tokens).items():
+            self.postings[term][point_id] = tf
+        self.by_source[metadata.get("source", "")].append(point_id)
+        title = normalize_title(metadata.get("title", ""))
+        if title:
+            self.titles[title].append(point_id)
+
+    def _remove(self, point_id):
+        doc = self.docs.pop(point_id, None)
+        if doc is None:
+            return
+        for term in set(tokenize(doc["text"])):
+            postings = self.postings.get(term)
+            if postings:
+                postings.pop(point_id, None)
+                if not postings:
+                    del self.postings[term]
+        self.total_length -= self.lengths.pop(point_id)
+        title = normalize_title(doc["metadata"].get("title", ""))
+        if point_id in self.titles.get(title, []):
+            self.titles[title].remove(point_id)
+            if not self.titles[title]:
+                del self.titles[title]
+
+    def set_source(self, source, point_ids, chunks):
+        """
+        Replaces every indexed chunk of 'source' with the given chunks.
+        """
+        for point_id in self.by_source.pop(source, []):
+            self._remove(point_id)
+        for point_id, chunk in zip(point_ids, chunks):
+            self._add(point_id, chunk.page_content, chunk.metadata)
+        self.dirty = True
+
+    @classmethod
+    def from_collection(cls, client, page_size=500):
+        """
+        Builds the index from everything already in Qdrant (covers points
+        uploaded before ingestion started maintaining the index).
+        """
+        index = cls()
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=config.COLLECTION_NAME,
+                limit=page_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            for point in points:
+                payload = point.payload or {}
+                index._add(str(point.id), payload.get("page_content", ""), payload.get("metadata", {}))
+            if offset is None:
+                break
+        index.dirty = True
+        return index
+
+    # 2. PERSISTENCE (only the chunks are stored; postings are rebuilt on load)
+    def save(self, path=LEXICAL_INDEX_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.docs, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path=LEXICAL_INDEX_FILE):
+        """
+        Returns the saved index, or an empty one if none has been built yet.
+        """
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        with open(path, 'r', encoding='utf-8') as f:
+            docs = json.load(f)
+        for point_id, doc in docs.items():
+            index._add(point_id, doc["text"], doc["metadata"])
+        return index
+
+    def __len__(self):
+        return len(self.docs)
+
+    # 3. SEARCH
+    def _hit(self, point_id, score):
+        doc = self.docs[point_id]
+        return models.ScoredPoint(
+            id=point_id,
+            version=0,
+            score=score,
+            payload={"page_content": doc["text"], "metadata": doc["metadata"]},
+        )
+
+    def search(self, query, limit):
+        """
+        BM25 top-k as Qdrant-style ScoredPoints.
+        """
+        if not self.docs:
+            return []
+        n = len(self.docs)
+        avg_length = self.total_length / n
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for point_id, tf in postings.items():
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[point_id] / avg_length)
+                scores[point_id] += idf * tf * (BM25_K1 + 1) / norm
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [self._hit(point_id, score) for point_id, score in best]
+
+    def title_lookup(self, query, limit):
+        """
+        If the query is exactly an article/video title, returns that source's
+        first chunks. No embedding call needed.
+        """
+        point_ids = self.titles.get(normalize_title(query))
+        if not point_ids:
+            return []
+        return [self._hit(point_id, 1.0) for point_id in point_ids[:limit]]
+
+def reciprocal_rank_fusion(result_lists, limit, k=RRF_K):
+    """
+    Merges ranked hit lists: each hit scores sum(1 / (k + rank)) across lists.
+    The first list's copy of a hit (the dense one) is kept.
+    """
+    scores = defaultdict(float)
+    first_seen = {}
+    for hits in result_lists:
+        for rank, hit in enumerate(hits, start=1):
+            key = fusion_key(hit.payload or {})
+            scores[key] += 1.0 / (k + rank)
+            first_seen.setdefault(key, hit)
+    best = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [first_seen[key] for key in best]
+
+def _title_hits(index, query, limit):
+    if index is not None and len(index):
+        return index.title_lookup(query, limit)
+    return []
+
+def _fuse(dense_hits, index, query, limit):
+    if index is None or not len(index):
+        return dense_hits
+    lexical_hits = index.search(query, limit * 2)
+    return reciprocal_rank_fusion([dense_hits, lexical_hits], limit)
+
+def _search_params():
+    return search_params(config.STORAGE_PROFILE, hnsw_ef=config.HNSW_EF or None, exact=config.SEARCH_EXACT)
+
+def _fill_from_qdrant(hits, points):
+    by_id = {p.id: p.payload for p in points}
+    for hit in hits:
+        if hit.payload is None:
+            hit.payload = by_id.get(hit.id) or {}
+
+def hybrid_search(client, embed_query, query, limit, index=None, vectors=None, store=None):
+    """
+    Exact-title fast path, else dense search fused with BM25 via RRF.
+    Dense search uses the local vector snapshot if given, otherwise Qdrant.
+    With a chunk store, Qdrant returns IDs + scores only and the text is read locally.
+    'embed_query' is only called when the dense search actually runs.
+    """
+    title_hits = _title_hits(index, query, limit)
+    if title_hits:
+        return title_hits
+
+    if vectors is not None:
+        dense_hits = vectors.search(embed_query(query), limit)
+    else:
+        dense_hits = client.query_points(
+            collection_name=config.COLLECTION_NAME,
+            query=embed_query(query),
+            limit=limit,
+            search_params=_search_params(),
+            with_payload=store is None,
+        ).points
+        missing = store.fill(dense_hits) if store is not None else []
+        if missing:
+            _fill_from_qdrant(dense_hits, client.retrieve(config.COLLECTION_NAME, ids=missing, with_payload=True))
+    return _fuse(dense_hits, index, query, limit)
+
+async def ahybrid_search(client, aembed_query, query, limit, index=None, vectors=None, store=None):
+    """
+    Same as hybrid_search, with an AsyncQdrantClient and an async embedder.
+    """
+    title_hits = _title_hits(index, query, limit)
+    if title_hits:
+        return title_hits
+
+    if vectors is not None:
+        dense_hits = vectors.search(await aembed_query(query), limit)
+    else:
+        response = await client.query_points(
+            collection_name=config.COLLECTION_NAME,
+            query=await aembed_query(query),
+            limit=limit,
+            search_params=_search_params(),
+            with_payload=store is None,
+        )
+        dense_hits = response.points
+        missing = store.fill(dense_hits) if store is not None else []
+        if missing:
+            points = await client.retrieve(config.COLLECTION_NAME, ids=missing, with_payload=True)
+            _fill_from_qdrant(dense_hits, points)
+    return _fuse(dense_hits, index, query, limit)
@@ -0,0 +1,230 @@
+import json
+import os
+import threading
+import time
+import uuid
+import numpy as np
+from qdrant_client import models
+from src import config
+from src.database import get_collection_version
+
+# --- CONFIGURATION ---
+SNAPSHOT_DIR = os.path.join("data", "vector_snapshot")
+BLOCK_ROWS = 2048   # float16 snapshots are scored in float32 blocks of this many rows
+HEADER_SIZE = 32    # build id (uuid hex) at the start of vectors.bin, must match meta.json / points.json
+OPEN_RETRIES = 3    # a reader racing a rewrite retries before giving up on the snapshot
+
+class LocalVectorIndex:
+    """
+    A local copy of every vector in the collection, kept in a memory-mapped
+    matrix on disk. Top-k is one vectorized matmul in-process, so queries skip
+    the network round trip to Qdrant entirely. Rows are L2-normalized, so the
+    dot product is the same cosine score Qdrant reports.
+
+    Searches run on other threads while a sync rewrites the snapshot, so the
+    (ids, payloads, matrix, version) state is immutable and swapped in as one
+    tuple; a search keeps using the tuple it started with.
+    """
+    EMPTY = ([], [], None, None)
+
+    def __init__(self, path=SNAPSHOT_DIR, dtype=None):
+        self.path = path
+        self.dtype = np.dtype(dtype or config.LOCAL_SEARCH_DTYPE)
+        self.state = self.EMPTY
+        self.sync_lock = threading.Lock()
+        self._open()
+
+    @property
+    def ids(self):
+        return self.state[0]
+
+    @property
+    def payloads(self):
+        return self.state[1]
+
+    @property
+    def matrix(self):
+        return self.state[2]
+
+    @property
+    def version(self):
+        return self.state[3]
+
+    # 1. FILES
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _read(self):
+        """
+        Loads the files on disk as a new state tuple, or None if they come
+        from different writes (a rewrite is in progress).
+        """
+        with open(self._file("meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(self._file("points.json"), 'r', encoding='utf-8') as f:
+            points = json.load(f)
+        build = meta.get("build")
+        if build is None or points.get("build") != build:
+            return None
+        matrix = None
+        if meta["count"]:
+            with open(self._file("vectors.bin"), 'rb') as f:
+                if f.read(HEADER_SIZE) != build.encode("ascii"):
+                    return None
+            matrix = np.memmap(
+                self._file("vectors.bin"), dtype=np.dtype(meta["dtype"]), mode="r",
+                offset=HEADER_SIZE, shape=(meta["count"], meta["dim"]),
+            )
+        ids = [p["id"] for p in points["points"]]
+        payloads = [p["payload"] for p in points["points"]]
+        return ids, payloads, matrix, meta.get("version")
+
+    def _open(self):
+        if not os.path.exists(self._file("meta.json")):
+            return
+        for attempt in range(OPEN_RETRIES):
+            try:
+                state = self._read()
+            except (OSError, ValueError, KeyError, AttributeError):
+                state = None   # missing, truncated or pre-build-id files
+            if state is not None:
+                self.dtype = state[2].dtype if state[2] is not None else self.dtype
+                self.state = state
+                return
+            time.sleep(0.1 * (attempt + 1))
+        # Unusable snapshot: start empty, the next sync downloads everything
+        self.state = self.EMPTY
+
+    def _write(self, ids, payloads, matrix, version):
+        os.makedirs(self.path, exist_ok=True)
+        build = uuid.uuid4().hex
+        # Write everything to temp files first, then swap them in; all three carry
+        # the build id, so a reader can tell files from different writes apart
+        if len(ids):
+            tmp_vectors = self._file("vectors.bin.tmp")
+            with open(tmp_vectors, 'wb') as f:
+                f.write(build.encode("ascii"))
+            out = np.memmap(tmp_vectors, dtype=self.dtype, mode="r+", offset=HEADER_SIZE, shape=matrix.shape)
+            out[:] = matrix
+            out.flush()
+            del out
+            os.replace(tmp_vectors, self._file("vectors.bin"))
+        with open(self._file("points.json.tmp"), 'w', encoding='utf-8') as f:
+            json.dump({"build": build, "points": [{"id": i, "payload": p} for i, p in zip(ids, payloads)]},
+                      f, ensure_ascii=False)
+        os.replace(self._file("points.json.tmp"), self._file("points.json"))
+        meta = {"count": len(ids), "dim": int(matrix.shape[1]) if len(ids) else 0,
+                "dtype": self.dtype.name, "version": version, "build": build}
+        with open(self._file("meta.json.tmp"), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(self._file("meta.json.tmp"), self._file("meta.json"))
+        # Searches already running keep the old memmap (its inode outlives the replace)
+        self._open()
+
+    # 2. SYNC
+    @staticmethod
+    def _normalize(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _remote_ids(self, client, page_size=1000):
+        ids = []
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=config.COLLECTION_NAME,
+                limit=page_size,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False,
+            )
+            ids.extend(p.id for p in points)
+            if offset is None:
+                return ids
+
+    def sync(self, client, batch_size=256):
+        """
+        Brings the snapshot in line with the collection. Only point IDs are
+        listed remotely; vectors are downloaded for new IDs only. Point IDs are
+        derived from chunk content, so an edited chunk shows up as a new ID.
+        Returns (added, removed).
+        """
+        # One sync at a time; searches keep running against the current state
+        with self.sync_lock:
+            return self._sync(client, batch_size, self.state)
+
+    def _sync(self, client, batch_size, state):
+        old_ids, old_payloads, old_matrix, old_version = state
+        version = get_collection_version(client)
+        remote_ids = self._remote_ids(client)
+        remote_set = set(remote_ids)
+        local_rows = {pid: row for row, pid in enumerate(old_ids)}
+
+        removed = [pid for pid in old_ids if pid not in remote_set]
+        added = [pid for pid in remote_ids if pid not in local_rows]
+        if not added and not removed:
+            if version != old_version:
+                matrix = np.asarray(old_matrix) if old_matrix is not None else np.zeros((0, 0), dtype=self.dtype)
+                self._write(old_ids, old_payloads, matrix, version)
+            return 0, 0
+
+        new_vectors = []
+        new_payloads = []
+        for i in range(0, len(added), batch_size):
+            points = client.retrieve(
+                collection_name=config.COLLECTION_NAME,
+                ids=added[i:i + batch_size],
+                with_payload=True,
+                with_vectors=True,
+            )
+            by_id = {p.id: p for p in points}
+            for pid in added[i:i + batch_size]:
+                new_vectors.append(by_id[pid].vector)
+                new_payloads.append(by_id[pid].payload or {})
+
+        # Collection was rebuilt with a different vector size: start over
+        if new_vectors and old_matrix is not None and old_matrix.shape[1] != len(new_vectors[0]):
+            return self._sync(client, batch_size, self.EMPTY)
+
+        keep = [pid for pid in old_ids if pid in remote_set]
+        parts = []
+        if keep:
+            parts.append(np.asarray(old_matrix)[[local_rows[pid] for pid in keep]].astype(np.float32))
+        if new_vectors:
+            parts.append(self._normalize(new_vectors))
+        matrix = np.concatenate(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+        ids = keep + added
+        payloads = [old_payloads[local_rows[pid]] for pid in keep] + new_payloads
+        self._write(ids, payloads, matrix.astype(self.dtype), version)
+        return len(added), len(removed)
+
+    def __len__(self):
+        return len(self.ids)
+
+    # 3. SEARCH
+    def search(self, query_vector, limit):
+        """
+        Top-k by cosine similarity as Qdrant-style ScoredPoints.
+        """
+        # One consistent snapshot for the whole search, even if a sync swaps it meanwhile
+        ids, payloads, matrix, _ = self.state
+        if matrix is None or not len(ids):
+            return []
+        q = self._normalize(query_vector)
+        if matrix.dtype == np.float32:
+            scores = np.asarray(matrix) @ q
+        else:
+            # No BLAS for float16: upcast block by block instead of the whole matrix
+            scores = np.empty(len(ids), dtype=np.float32)
+            for start in range(0, len(ids), BLOCK_ROWS):
+                block = np.asarray(matrix[start:start + BLOCK_ROWS], dtype=np.float32)
+                scores[start:start + BLOCK_ROWS] = block @ q
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [
+            models.ScoredPoint(id=ids[i], version=0, score=float(scores[i]), payload=payloads[i])
+            for i in top
+        ]
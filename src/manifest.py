@@ -0,0 +1,55 @@
+import hashlib
+import json
+import os
+import uuid
+
+# --- CONFIGURATION ---
+# The manifest lives next to the scraped data so it travels with it
+MANIFEST_FILE = os.path.join("data", "ingest_manifest.json")
+
+def content_hash(text):
+    """
+    Short, stable fingerprint of a piece of text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def chunk_point_id(source, index, chunk_hash):
+    """
+    Deterministic Qdrant point ID for a chunk.
+    The same (source, position, content) always maps to the same UUID,
+    so re-uploading an unchanged chunk overwrites it instead of duplicating it.
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source}#{index}#{chunk_hash}"))
+
+def chunk_ids_for(source, chunks):
+    """
+    Returns the point IDs for a document's chunks, in order.
+    """
+    return [
+        chunk_point_id(source, i, content_hash(chunk.page_content))
+        for i, chunk in enumerate(chunks)
+    ]
+
+def load_manifest(path=MANIFEST_FILE):
+    """
+    Reads the manifest: {source: {"hash": ..., "chunks": [point ids]}}.
+    Returns an empty manifest if the file is missing or unreadable.
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"⚠️ Could not read manifest '{path}' (starting fresh): {e}")
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    """
+    Writes the manifest atomically so a crash never leaves half a file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
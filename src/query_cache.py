@@ -0,0 +1,180 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from src import config
+from src.database import get_collection_version
+from src.lexical_index import LexicalIndex, LEXICAL_INDEX_FILE, hybrid_search, ahybrid_search
+from src.local_vectors import LocalVectorIndex
+from src.chunk_store import ChunkStore
+
+def normalize_query(text):
+    """
+    Case-folds, collapses whitespace and drops trailing punctuation, so
+    "What is Thiruppavai?" and "what is thiruppavai" share one cache entry.
+    """
+    return re.sub(r"\s+", " ", text.casefold()).strip().rstrip("?!.").strip()
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after 'ttl' seconds.
+    """
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self.data[key]
+                self.misses += 1
+                return None
+            self.data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, value):
+        with self.lock:
+            self.data[key] = (time.monotonic() + self.ttl, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def __len__(self):
+        return len(self.data)
+
+class RetrievalCache:
+    """
+    Process-wide cache of query embeddings and top-k hits, shared by every
+    Streamlit session. Hits are dropped whenever ingestion bumps the collection
+    version; embeddings stay valid across versions and are kept.
+    """
+    def __init__(self, maxsize=config.QUERY_CACHE_SIZE, ttl=config.QUERY_CACHE_TTL, version_check_interval=60,
+                 lexical_path=LEXICAL_INDEX_FILE):
+        self.lexical_path = lexical_path
+        self.lexical = LexicalIndex.load(lexical_path)
+        self.lexical_mtime = self._mtime()
+        self.vectors = LocalVectorIndex() if config.SEARCH_BACKEND == "local" else None
+        self.store = ChunkStore() if config.SLIM_PAYLOADS else None
+        self.embeddings = TTLCache(maxsize, ttl)
+        self.results = TTLCache(maxsize, ttl)
+        self.version = None
+        self.version_checked = 0.0
+        self.version_check_interval = version_check_interval
+        self.lock = threading.Lock()
+
+    def _mtime(self):
+        try:
+            return os.path.getmtime(self.lexical_path)
+        except OSError:
+            return None
+
+    def _check_version(self, client):
+        # At most one cheap version lookup per interval, not one per query
+        with self.lock:
+            now = time.monotonic()
+            if now - self.version_checked < self.version_check_interval:
+                return
+            self.version_checked = now
+            version = get_collection_version(client)
+            if self.version is not None and version != self.version:
+                print(f"♻️  Collection version {self.version} -> {version}: clearing cached results.")
+                self.results.clear()
+            self.version = version
+
+            # Local search backend: pull only the vectors that changed
+            if self.vectors is not None and (self.vectors.version != version or not len(self.vectors)):
+                added, removed = self.vectors.sync(client)
+                print(f"🔄 Local vectors synced: +{added} / -{removed} ({len(self.vectors)} total).")
+
+            # Pick up a lexical index rebuilt by a local ingestion run
+            mtime = self._mtime()
+            if mtime != self.lexical_mtime:
+                self.lexical = LexicalIndex.load(self.lexical_path)
+                self.lexical_mtime = mtime
+                self.results.clear()
+            if self.store is not None:
+                self.store.refresh()
+
+    def embed_query(self, embedder, query):
+        key = normalize_query(query)
+        vector = self.embeddings.get(key)
+        if vector is None:
+            vector = embedder.embed_query(query)
+            self.embeddings.put(key, vector)
+        return vector
+
+    def search(self, client, embedder, query, limit):
+        """
+        Returns the top 'limit' points for 'query', from cache when possible.
+        """
+        self._check_version(client)
+        key = (normalize_query(query), limit)
+        hits = self.results.get(key)
+        if hits is None:
+            # Exact titles skip embedding entirely; otherwise dense + BM25 fused
+            hits = hybrid_search(
+                client,
+                lambda q: self.embed_query(embedder, q),
+                query,
+                limit,
+                index=self.lexical,
+                vectors=self.vectors,
+                store=self.store,
+            )
+            self.results.put(key, hits)
+        return hits
+
+    async def aembed_query(self, embedder, query):
+        key = normalize_query(query)
+        vector = self.embeddings.get(key)
+        if vector is None:
+            vector = await embedder.aembed_query(query)
+            self.embeddings.put(key, vector)
+        return vector
+
+    async def asearch(self, client, aclient, embedder, query, limit):
+        """
+        Same as search, for the API: the query runs on the AsyncQdrantClient
+        'aclient', while the periodic version check (and any local vector sync
+        or index reload) runs on a worker thread with the sync 'client'.
+        """
+        if time.monotonic() - self.version_checked >= self.version_check_interval:
+            await asyncio.to_thread(self._check_version, client)
+        key = (normalize_query(query), limit)
+        hits = self.results.get(key)
+        if hits is None:
+            hits = await ahybrid_search(
+                aclient,
+                lambda q: self.aembed_query(embedder, q),
+                query,
+                limit,
+                index=self.lexical,
+                vectors=self.vectors,
+                store=self.store,
+            )
+            self.results.put(key, hits)
+        return hits
+
+    def stats(self):
+        return {
+            "result_hits": self.results.hits,
+            "result_misses": self.results.misses,
+            "embedding_hits": self.embeddings.hits,
+            "embedding_misses": self.embeddings.misses,
+            "entries": len(self.results),
+            "version": self.version,
+            "lexical_chunks": len(self.lexical),
+        }
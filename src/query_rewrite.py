@@ -0,0 +1,33 @@
+import re
+
+# Pronouns and deictic words that point back at something said earlier in the conversation.
+# Words like "this", "that", "more" or "explain" appear in most self-contained questions
+# too, so they are left out; short follow-ups ("explain that") are caught by length instead.
+ANAPHORA = {
+    "it", "its", "these", "those", "he", "him", "his", "she", "her",
+    "they", "them", "their", "theirs", "same", "aforementioned", "above", "previous",
+    "former", "latter",
+}
+
+# Openers that only make sense as a follow-up ("and in Tamil?", "what about ...")
+FOLLOW_UP_OPENERS = (
+    "and ", "but ", "so ", "also ", "what about", "how about", "why so", "why not",
+    "tell me more", "say more", "go on", "in tamil", "in kannada", "in telugu",
+    "in hindi", "in sanskrit", "in english",
+)
+
+SHORT_QUESTION_WORDS = 4
+
+def needs_rewrite(question):
+    """
+    Cheap local check: does this question lean on earlier turns?
+    True for pronouns/anaphora, follow-up openers and very short questions;
+    False means it is self-contained and can be searched as-is.
+    """
+    text = question.casefold().strip()
+    words = re.findall(r"[\w']+", text)
+    if len(words) <= SHORT_QUESTION_WORDS:
+        return True
+    if text.startswith(FOLLOW_UP_OPENERS):
+        return True
+    return any(word in ANAPHORA for word in words)
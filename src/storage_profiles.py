@@ -0,0 +1,82 @@
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from qdrant_client import models
+
+# Each profile trades memory and search cost against recall:
+#   dim          -> Matryoshka truncation of gemini-embedding-001 (None = full size)
+#   quantization -> None, "scalar" (int8) or "binary" (1 bit), kept in RAM and rescored
+#   on_disk      -> keep the original float32 vectors on disk instead of RAM
+PROFILES = {
+    "full":          {"dim": None, "quantization": None,     "on_disk": False},
+    "dim1536":       {"dim": 1536, "quantization": None,     "on_disk": False},
+    "dim768":        {"dim": 768,  "quantization": None,     "on_disk": False},
+    "scalar":        {"dim": None, "quantization": "scalar", "on_disk": True},
+    "binary":        {"dim": None, "quantization": "binary", "on_disk": True},
+    "dim1536-scalar": {"dim": 1536, "quantization": "scalar", "on_disk": True},
+    "dim768-scalar": {"dim": 768,  "quantization": "scalar", "on_disk": True},
+}
+
+# Quantized search fetches this many times 'limit' candidates, then rescores with the originals
+RESCORE_OVERSAMPLING = {"scalar": 2.0, "binary": 3.0}
+
+def get_profile(name):
+    if name not in PROFILES:
+        raise ValueError(f"❌ Unknown STORAGE_PROFILE '{name}'. Choose one of: {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+def vectors_config(profile, size):
+    return models.VectorParams(size=size, distance=models.Distance.COSINE, on_disk=profile["on_disk"])
+
+def quantization_config(profile):
+    if profile["quantization"] == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if profile["quantization"] == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+    return None
+
+def hnsw_config(m, ef_construct):
+    return models.HnswConfigDiff(m=m, ef_construct=ef_construct)
+
+def search_params(profile, hnsw_ef=None, exact=False):
+    """
+    Query-time parameters for the profile (rescoring for quantized vectors).
+    """
+    quantization = None
+    if profile["quantization"]:
+        quantization = models.QuantizationSearchParams(
+            rescore=True,
+            oversampling=RESCORE_OVERSAMPLING[profile["quantization"]],
+        )
+    if quantization is None and hnsw_ef is None and not exact:
+        return None
+    return models.SearchParams(hnsw_ef=hnsw_ef, exact=exact, quantization=quantization)
+
+def truncate(vectors, dim):
+    """
+    Matryoshka truncation: keep the first 'dim' components and re-normalize.
+    """
+    v = np.asarray(vectors, dtype=np.float32)[..., :dim]
+    norms = np.linalg.norm(v, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return v / norms
+
+class TruncatedEmbeddings(Embeddings):
+    """
+    Wraps an embedder so every vector comes out at 'dim' dimensions.
+    Sits on top of the embedding cache, so one cached full-size vector
+    serves every profile.
+    """
+    def __init__(self, embedder, dim):
+        self.embedder = embedder
+        self.dim = dim
+
+    def embed_documents(self, texts):
+        return truncate(self.embedder.embed_documents(texts), self.dim).tolist()
+
+    def embed_query(self, text):
+        return truncate(self.embedder.embed_query(text), self.dim).tolist()
+
+    async def aembed_query(self, text):
+        return truncate(await self.embedder.aembed_query(text), self.dim).tolist()
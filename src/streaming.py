@@ -0,0 +1,56 @@
+import time
+
+class TimedStream:
+    """
+    Wraps an 'llm.stream(...)' iterator (or 'llm.astream(...)' with async for): yields the text of each chunk and
+    records time to first token and total latency separately. The full text
+    is available as '.text' once the stream is exhausted.
+    """
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.start = time.perf_counter()
+        self.first_token = None
+        self.total = None
+        self.parts = []
+        # Token usage reported by the model (chunks carry deltas, so they add up)
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def _record(self, chunk):
+        usage = getattr(chunk, "usage_metadata", None)
+        if usage:
+            self.input_tokens += usage.get("input_tokens", 0)
+            self.output_tokens += usage.get("output_tokens", 0)
+        text = getattr(chunk, "content", chunk)
+        if not isinstance(text, str):
+            # Some models return content as a list of parts
+            text = "".join(p.get("text", "") if isinstance(p, dict) else str(p) for p in text)
+        if text:
+            if self.first_token is None:
+                self.first_token = time.perf_counter() - self.start
+            self.parts.append(text)
+        return text
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            text = self._record(chunk)
+            if text:
+                yield text
+        self.total = time.perf_counter() - self.start
+
+    async def __aiter__(self):
+        # Same, for 'llm.astream(...)'
+        async for chunk in self.chunks:
+            text = self._record(chunk)
+            if text:
+                yield text
+        self.total = time.perf_counter() - self.start
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+    def summary(self):
+        first = f"{self.first_token:.2f}s" if self.first_token is not None else "n/a"
+        total = f"{self.total:.2f}s" if self.total is not None else "n/a"
+        return f"first token {first} · total {total}"
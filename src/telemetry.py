@@ -0,0 +1,210 @@
+import atexit
+import bisect
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# --- CONFIGURATION ---
+METRICS_DIR = os.path.join("data", "metrics")   # one <pid>.json snapshot per serving process
+SNAPSHOT_INTERVAL = 10     # seconds between metric snapshots (only written if something changed)
+STAGES = ("history", "rewrite", "embed", "search", "context", "first_token", "generate", "total")
+# Histogram bucket upper bounds in seconds (log-spaced by sqrt(2), 1 ms .. ~65 s)
+BUCKETS = tuple(0.001 * 2 ** (i / 2) for i in range(33))
+
+# One JSON object per answered question
+logger = logging.getLogger("atul.rag")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram (Prometheus style). Percentiles are
+    interpolated inside the bucket, which is plenty for p50/p95.
+    """
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot: above the largest bound
+        self.total = 0.0
+        self.count = 0
+        self.low = None
+        self.high = None
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.low = seconds if self.low is None else min(self.low, seconds)
+        self.high = seconds if self.high is None else max(self.high, seconds)
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = max(self.buckets[i - 1] if i > 0 else 0.0, self.low)
+                high = min(self.buckets[i] if i < len(self.buckets) else self.high, self.high)
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.high
+
+class Metrics:
+    """
+    Process-wide per-stage histograms. A background thread writes a snapshot
+    to METRICS_DIR/<pid>.json every SNAPSHOT_INTERVAL while new turns come in
+    (and once more at exit), so p50/p95 can be read from outside a running
+    app, chat or API process (python -m utils.dump_metrics).
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.histograms = {}
+        self.tokens = {"prompt_tokens": 0, "completion_tokens": 0}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.flusher_pid = None
+
+    def record(self, trace):
+        with self.lock:
+            for stage, seconds in trace.spans.items():
+                self.histograms.setdefault(stage, Histogram()).observe(seconds)
+            for name, value in trace.counts.items():
+                if name in self.tokens:
+                    self.tokens[name] += value
+            self.dirty = True
+            # Started lazily (and again in a forked worker, which doesn't inherit threads)
+            if self.flusher_pid != os.getpid():
+                self.flusher_pid = os.getpid()
+                threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+                atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(SNAPSHOT_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        """
+        Writes a snapshot if anything was recorded since the last one.
+        """
+        with self.lock:
+            dirty, self.dirty = self.dirty, False
+        if not dirty:
+            return
+        try:
+            self.snapshot()
+        except OSError as e:
+            print(f"⚠️ Could not write metrics snapshot: {e}")
+
+    def summary(self):
+        """
+        {stage: {"count", "p50_ms", "p95_ms", "mean_ms"}} in pipeline order.
+        """
+        with self.lock:
+            names = sorted(self.histograms, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES))
+            out = {}
+            for name in names:
+                h = self.histograms[name]
+                out[name] = {
+                    "count": h.count,
+                    "p50_ms": round(h.percentile(50) * 1000, 1),
+                    "p95_ms": round(h.percentile(95) * 1000, 1),
+                    "mean_ms": round(h.total / h.count * 1000, 1),
+                }
+            return out
+
+    def snapshot(self):
+        path = self.path or os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+        with self.lock:
+            tokens = dict(self.tokens)
+        data = {"pid": os.getpid(), "time": time.time(), "stages": self.summary(), "tokens": tokens}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def export_text(self):
+        """
+        Prometheus text exposition of the histograms.
+        """
+        lines = ["# TYPE rag_stage_seconds histogram"]
+        with self.lock:
+            for name, h in self.histograms.items():
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    lines.append(f'rag_stage_seconds_bucket{{stage="{name}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'rag_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {h.count}')
+                lines.append(f'rag_stage_seconds_sum{{stage="{name}"}} {h.total:.6f}')
+                lines.append(f'rag_stage_seconds_count{{stage="{name}"}} {h.count}')
+            for name, value in self.tokens.items():
+                lines.append(f"rag_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+METRICS = Metrics()
+
+# Spans open in the current thread or asyncio task. Each task starts from a copy
+# of its parent's, so concurrent tasks never close each other's spans.
+_open_spans = contextvars.ContextVar("open_spans", default=())
+
+class Trace:
+    """
+    Timing spans and token counts for one question. Spans nest: a parent's
+    time excludes its children (so 'search' doesn't include 'embed').
+    Spans may be opened from helper threads or concurrent asyncio tasks
+    (speculative search).
+    """
+    def __init__(self, question=""):
+        self.question = question
+        self.start = time.perf_counter()
+        self.spans = {}
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name):
+        frame = [self, time.perf_counter(), 0.0]   # trace, start, time spent in children
+        token = _open_spans.set(_open_spans.get() + (frame,))
+        try:
+            yield
+        finally:
+            _open_spans.reset(token)
+            elapsed = time.perf_counter() - frame[1]
+            parent = _open_spans.get()[-1:]
+            if parent and parent[0][0] is self:
+                parent[0][2] += elapsed
+            self.add(name, elapsed - frame[2])
+
+    def add(self, name, seconds):
+        if seconds is None:
+            return
+        with self.lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def count(self, name, value):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def finish(self, **fields):
+        """
+        Closes the trace: emits one structured log line and feeds the histograms.
+        """
+        self.add("total", time.perf_counter() - self.start)
+        record = {
+            "event": "rag_turn",
+            "question": self.question[:200],
+            "spans_ms": {k: round(v * 1000, 1) for k, v in self.spans.items()},
+            **self.counts,
+            **fields,
+        }
+        logger.info(json.dumps(record, ensure_ascii=False))
+        METRICS.record(self)
+        return record
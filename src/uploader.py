@@ -0,0 +1,196 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from qdrant_client import models
+
+# 1. HELPER: Spot rate-limit / transient errors
+def is_rate_limit_error(error):
+    """
+    True for errors worth retrying (429s, quota exhaustion, timeouts).
+    """
+    error_msg = str(error).lower()
+    return "429" in error_msg or "resource_exhausted" in error_msg or "timed out" in error_msg
+
+def backoff_delay(attempt, base=2.0, cap=60.0):
+    """
+    Exponential backoff with full jitter: a random wait in [0, base * 2^attempt],
+    capped. Jitter stops parallel workers from retrying in lock-step.
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def estimate_tokens(text):
+    """
+    Rough token count (~4 characters per token), good enough for quota pacing.
+    """
+    return max(1, len(text) // 4)
+
+# 2. LIMITERS
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at 'per_minute' tokens per minute.
+    acquire() blocks until enough tokens are available.
+    """
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1):
+        # A single request bigger than the bucket would wait forever
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait_time = (amount - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+class AIMDLimiter:
+    """
+    Concurrency limit that grows by one after a run of successes (additive increase)
+    and halves on every 429 (multiplicative decrease).
+    """
+    def __init__(self, initial, maximum, minimum=1, increase_after=5):
+        self.limit = initial
+        self.maximum = maximum
+        self.minimum = minimum
+        self.increase_after = increase_after
+        self.in_flight = 0
+        self.successes = 0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while self.in_flight >= self.limit:
+                self.cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    def on_success(self):
+        with self.cond:
+            self.successes += 1
+            if self.successes >= self.increase_after and self.limit < self.maximum:
+                self.limit += 1
+                self.successes = 0
+                self.cond.notify_all()
+
+    def on_throttle(self):
+        with self.cond:
+            self.limit = max(self.minimum, self.limit // 2)
+            self.successes = 0
+
+# 3. ENGINE: Concurrent uploader
+class ConcurrentUploader:
+    """
+    Embeds and upserts chunks with several batches in flight.
+    The embedder only needs 'embed_documents(texts)', so a fake one can be
+    dropped in to test the retry/backoff behaviour without hitting Gemini.
+    """
+    def __init__(self, client, embedder, collection_name, rpm, tpm,
+                 max_concurrency=4, max_retries=6, initial_concurrency=2):
+        self.client = client
+        self.embedder = embedder
+        self.collection_name = collection_name
+        self.requests_bucket = TokenBucket(rpm)
+        self.tokens_bucket = TokenBucket(tpm)
+        self.limiter = AIMDLimiter(min(initial_concurrency, max_concurrency), max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.throttled = 0
+
+    def _upload_batch(self, batch, batch_ids):
+        texts = [doc.page_content for doc in batch]
+        tokens = sum(estimate_tokens(t) for t in texts)
+
+        for attempt in range(self.max_retries + 1):
+            self.requests_bucket.acquire(1)
+            self.tokens_bucket.acquire(tokens)
+            self.limiter.acquire()
+            try:
+                vectors = self.embedder.embed_documents(texts)
+                points = [
+                    models.PointStruct(
+                        id=pid,
+                        vector=vector,
+                        payload={"page_content": doc.page_content, "metadata": doc.metadata},
+                    )
+                    for doc, pid, vector in zip(batch, batch_ids, vectors)
+                ]
+                self.client.upsert(collection_name=self.collection_name, points=points)
+                self.limiter.on_success()
+                return
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                self.limiter.on_throttle()
+                self.throttled += 1
+                delay = backoff_delay(attempt)
+                print(f"   ⏳ Hit Limit/Timeout. Backing off {delay:.1f}s (concurrency now {self.limiter.limit})...")
+            finally:
+                self.limiter.release()
+            time.sleep(delay)
+
+    def _batches(self, chunks, ids, batch_size):
+        if ids is None:
+            pairs = ((c, uuid.uuid4().hex) for c in chunks)
+        else:
+            pairs = zip(chunks, ids)
+        while True:
+            batch = list(islice(pairs, batch_size))
+            if not batch:
+                return
+            yield [c for c, _ in batch], [pid for _, pid in batch]
+
+    def upload(self, chunks, ids=None, batch_size=10, on_batch_done=None):
+        """
+        Uploads any iterable of chunks. Only a bounded number of batches is
+        queued at once, so the input can be a lazy generator.
+        Returns (saved, failed) chunk counts.
+        """
+        saved = 0
+        failed = 0
+        pending = {}
+        max_pending = self.max_concurrency * 2
+
+        def collect(done):
+            nonlocal saved, failed
+            for future in done:
+                batch_ids = pending.pop(future)
+                try:
+                    future.result()
+                    saved += len(batch_ids)
+                    if on_batch_done:
+                        on_batch_done(batch_ids)
+                    print(f"   Saved {saved} chunks...")
+                except Exception as e:
+                    # Skip bad batch to avoid an infinite loop
+                    failed += len(batch_ids)
+                    print(f"   ❌ Critical Error on batch of {len(batch_ids)}: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            for batch, batch_ids in self._batches(chunks, ids, batch_size):
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending[pool.submit(self._upload_batch, batch, batch_ids)] = batch_ids
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+        return saved, failed
@@ -0,0 +1,34 @@
+import json
+import os
+import pytest
+
+# Tests run offline: fake models and an in-memory Qdrant, never the real services.
+# Must be set before anything imports src.config.
+os.environ.update({
+    "QDRANT_LOCATION": ":memory:",
+    "FAKE_MODELS": "1",
+    "FAKE_EMBED_DIM": "32",
+    "EMBEDDING_CACHE_MAX_MB": "0",
+    "EMBED_RPM": "1000000",
+    "EMBED_TPM": "1000000000",
+})
+
+def write_articles(articles):
+    with open(os.path.join("data", "cleaned_articles.json"), 'w', encoding='utf-8') as f:
+        json.dump(articles, f)
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    A scratch cwd (every data/ path is relative, so the real data stays
+    untouched) and an empty collection in the shared in-memory Qdrant.
+    Returns the client.
+    """
+    from src import config
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    client = config.get_qdrant_client()
+    for name in (config.COLLECTION_NAME, config.VERSION_COLLECTION_NAME):
+        if client.collection_exists(name):
+            client.delete_collection(name)
+    return client
@@ -0,0 +1,101 @@
+import asyncio
+import json
+from src import api, config
+from src.answer_cache import SemanticAnswerCache
+from src.engine import RAGEngine
+from src.ingestion import run_pipeline
+from src.prompts import ANSWER_TEMPLATE
+from src.query_cache import RetrievalCache
+from tests.conftest import write_articles
+
+def article(i):
+    return {"title": f"Teaching number {i}", "link": f"https://example.org/{i}",
+            "content": " ".join(f"word{i}x{k}" for k in range(200))}
+
+class CountingClient:
+    """
+    The API's async client, counting the dense searches sent to Qdrant.
+    """
+    def __init__(self, client):
+        self.client = client
+        self.queries = 0
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    async def query_points(self, *args, **kwargs):
+        self.queries += 1
+        return await self.client.query_points(*args, **kwargs)
+
+def make_resources(client, answer_cache=None):
+    engine = RAGEngine(
+        client, config.get_llm(), config.get_embeddings(),
+        RetrievalCache(version_check_interval=0), ANSWER_TEMPLATE, answer_cache=answer_cache,
+        aclient=CountingClient(config.get_async_qdrant_client()),
+    )
+    return api.Resources(engine)
+
+def events_for(resources, question, history=()):
+    async def go():
+        return [event async for event in api.answer_events(resources, question, list(history))]
+    events = {}
+    for block in asyncio.run(go()):
+        name, data = block.strip().split("\n")
+        events.setdefault(name[len("event: "):], []).append(json.loads(data[len("data: "):]))
+    assert "error" not in events, events["error"]
+    return events
+
+def ask(resources, question):
+    return events_for(resources, question)["sources"][0]["sources"]
+
+def test_local_backend_searches_the_snapshot_not_qdrant(workdir, monkeypatch):
+    write_articles([article(i) for i in range(3)])
+    run_pipeline()
+    monkeypatch.setattr(config, "SEARCH_BACKEND", "local")
+    resources = make_resources(workdir)
+
+    sources = ask(resources, " ".join(f"word1x{k}" for k in range(200)))
+
+    assert sources and sources[0] == "https://example.org/1"
+    assert len(resources.engine.retrieval_cache.vectors) > 0
+    assert resources.engine.aclient.queries == 0
+
+def test_articles_ingested_after_startup_reach_the_lexical_index(workdir):
+    write_articles([article(0)])
+    run_pipeline()
+    resources = make_resources(workdir)
+    assert len(resources.engine.retrieval_cache.lexical) > 0
+
+    write_articles([article(0), article(1)])
+    run_pipeline()
+    # An exact title is answered from the lexical index alone
+    assert ask(resources, "Teaching number 1") == ["https://example.org/1"]
+
+def test_repeated_standalone_question_is_served_from_the_answer_cache(workdir):
+    write_articles([article(i) for i in range(3)])
+    run_pipeline()
+    resources = make_resources(workdir, answer_cache=SemanticAnswerCache())
+    question = " ".join(f"word2x{k}" for k in range(200))
+
+    first = events_for(resources, question)
+    second = events_for(resources, question)
+
+    assert first["done"][0]["cached"] is False
+    assert second["done"][0]["cached"] is True
+    assert second["sources"] == first["sources"]
+    assert "".join(t["text"] for t in second["token"]) == "".join(t["text"] for t in first["token"])
+
+def test_follow_ups_are_rewritten_like_in_the_engine(workdir):
+    write_articles([article(0)])
+    run_pipeline()
+    resources = make_resources(workdir)
+    history = [{"role": "user", "content": "Who wrote the first teaching?"},
+               {"role": "assistant", "content": "Sri Ramanuja did."}]
+
+    follow_up = events_for(resources, "Why did he write all of it down?", history)
+    assert "rewrite" in follow_up["done"][0]["spans_ms"]
+
+    # The user's last turn is more than RECENT_MESSAGES back: standalone, searched as-is
+    older = history + [{"role": "assistant", "content": "More notes."}] * 4
+    standalone = events_for(resources, "Why did he write all of it down?", older)
+    assert "rewrite" not in standalone["done"][0]["spans_ms"]
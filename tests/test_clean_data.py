@@ -0,0 +1,26 @@
+import pytest
+from src.extractors.clean_data import NOISE_PHRASES, clean_text_logic, remove_noise_phrases
+
+def original_loop(text):
+    # The pre-optimisation behaviour the cleaner must keep
+    for phrase in NOISE_PHRASES:
+        text = text.replace(phrase, "")
+    return text
+
+@pytest.mark.parametrize("text, expected", [
+    # Overlap: "Contact details to purchase" goes first and takes "Contact" with it
+    ("WhatsApp Contact details to purchase the book", "WhatsApp  the book"),
+    # Composed: removing the inner phrase joins "WhatsApp Cont" + "act" into a phrase
+    ("WhatsApp Contwritten by Sri APN Swamiact now", " now"),
+    # Composed across words: "Download and " + "Read" after "WhatsApp Contact" goes
+    ("Download and WhatsApp ContactRead it", " it"),
+    ("Nothing to remove here", "Nothing to remove here"),
+    ("Watch this upanyasam Live on FreeConferenceCall App", " on "),
+])
+def test_noise_phrases_match_the_sequential_replace(text, expected):
+    assert original_loop(text) == expected
+    assert remove_noise_phrases(text) == expected
+
+def test_clean_text_logic_removes_every_kind_of_noise():
+    text = "Call +91 98450 12345 or Meeting ID: 8812345\n\n   \n\nsee https://example.org/a WhatsApp Contact"
+    assert clean_text_logic(text) == "Call  or \n\nsee"
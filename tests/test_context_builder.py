@@ -0,0 +1,61 @@
+from qdrant_client import models
+from src.context_builder import GAP_MARKER, MIN_PARTIAL_TOKENS, assemble_context, merge_chunks
+from src.uploader import estimate_tokens
+
+def words(start, end):
+    # Distinct words, so any long shared substring between two chunks is a real overlap
+    return " ".join(f"w{i}" for i in range(start, end))
+
+def hit(n, source, text, title=None):
+    return models.ScoredPoint(id=n, version=0, score=1.0 - n / 100, payload={
+        "page_content": text, "metadata": {"source": source, "title": title or source},
+    })
+
+def test_overlapping_neighbours_are_stitched_into_one_segment():
+    first, second = words(0, 60), words(50, 120)
+
+    # Ranked second-first, as search returns them
+    assert merge_chunks([second, first]) == [(words(0, 120), 0)]
+
+def test_contained_and_separate_chunks():
+    whole, inside, far = words(0, 60), words(20, 40), words(200, 260)
+
+    segments = merge_chunks([far, inside, whole])
+
+    # 'inside' is replaced by the chunk that contains it; 'far' stays its own segment
+    assert segments == [(far, 0), (whole, 2)]
+
+def test_edge_match_shorter_than_min_overlap_is_not_a_merge():
+    left, right = words(0, 60), words(59, 120)   # only "w59" shared
+
+    assert len(merge_chunks([left, right])) == 2
+
+def test_chunks_of_one_source_become_one_section():
+    hits = [hit(0, "a", words(50, 120)), hit(1, "b", words(300, 320)), hit(2, "a", words(0, 60))]
+
+    sections = assemble_context(hits, token_budget=10000)
+
+    assert [s["source"] for s in sections] == ["a", "b"]
+    assert sections[0]["text"] == words(0, 120)
+
+def test_budget_trims_segments_and_keeps_every_source():
+    long_a, extra_a, short_b = words(0, 150), words(300, 380), words(500, 580)
+    hits = [hit(0, "a", long_a), hit(1, "b", short_b), hit(2, "a", extra_a)]
+    budget = 150
+
+    sections = assemble_context(hits, token_budget=budget)
+
+    a, b = sections
+    # Source a's best segment was cut to leave room for b; its lower-ranked segment didn't fit
+    assert a["text"].endswith(" ...") and long_a.startswith(a["text"][:-4])
+    assert GAP_MARKER not in a["text"]
+    assert estimate_tokens(b["text"]) >= MIN_PARTIAL_TOKENS
+    # " ..." may add a token per trimmed section
+    assert sum(estimate_tokens(s["text"]) for s in sections) <= budget + len(sections)
+
+def test_nothing_fits_in_an_exhausted_budget():
+    hits = [hit(0, "a", words(0, 150)), hit(1, "b", words(300, 450))]
+
+    sections = assemble_context(hits, token_budget=MIN_PARTIAL_TOKENS)
+
+    assert [s["source"] for s in sections] == ["a"]
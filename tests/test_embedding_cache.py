@@ -0,0 +1,71 @@
+import asyncio
+import sqlite3
+import pytest
+from src.embedding_cache import CachedEmbeddings
+from src.fakes import FakeEmbeddings
+
+DIM = 8
+ROW_BYTES = DIM * 4   # float32 blobs
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.sqlite")
+
+def make_cache(path, max_bytes=10 ** 6):
+    return CachedEmbeddings(FakeEmbeddings(dim=DIM), "fake", path, max_bytes)
+
+def stored_keys(cache):
+    return {key for (key,) in cache.db.execute("SELECT key FROM embeddings")}
+
+def test_hits_and_misses(path):
+    cache = make_cache(path)
+
+    first = cache.embed_documents(["a", "b", "a"])
+    assert (cache.hits, cache.misses) == (0, 3)
+    assert cache.embedder.calls == 1   # one call, each distinct text once
+
+    second = cache.embed_documents(["a", "b"])
+    assert (cache.hits, cache.misses) == (2, 3)
+    assert cache.embedder.calls == 1
+    for cached, computed in zip(second, first):
+        assert cached == pytest.approx(computed, rel=1e-6)   # stored as float32
+    # Queries are cached under their own task type
+    cache.embed_query("a")
+    assert cache.embedder.calls == 2
+    assert cache.total_bytes == 3 * ROW_BYTES
+
+def test_a_hit_does_not_write(path):
+    cache = make_cache(path)
+    asyncio.run(cache.aembed_query("q"))
+    writes = cache.db.total_changes
+
+    asyncio.run(cache.aembed_query("q"))
+    cache.embed_query("q")
+
+    assert cache.hits == 2
+    assert cache.db.total_changes == writes
+    assert len(cache.touched) == 1
+
+def test_flush_writes_the_pending_last_used_times(path):
+    cache = make_cache(path)
+    cache.embed_query("q")
+    (before,) = cache.db.execute("SELECT last_used FROM embeddings").fetchone()
+    cache.embed_query("q")
+
+    cache.flush()
+
+    assert not cache.touched
+    (after,) = sqlite3.connect(path).execute("SELECT last_used FROM embeddings").fetchone()
+    assert after > before
+
+def test_eviction_drops_the_least_recently_used(path):
+    cache = make_cache(path, max_bytes=3 * ROW_BYTES)
+    for text in ["a", "b", "c"]:
+        cache.embed_documents([text])
+    # 'a' is the oldest insert but the most recently used
+    cache.embed_documents(["a"])
+
+    cache.embed_documents(["d"])   # over the limit: trims to 90%, i.e. two rows
+
+    assert stored_keys(cache) == {cache._key("RETRIEVAL_DOCUMENT", t) for t in ["a", "d"]}
+    assert cache.total_bytes == 2 * ROW_BYTES
@@ -0,0 +1,62 @@
+from src.fakes import FakeLLM
+from src.history import KEEP_RECENT, HistoryManager
+from src.uploader import estimate_tokens
+
+CEILING = 200
+
+def conversation(turns, words=25):
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"Question {i}: " + " ".join(f"q{i}w{k}" for k in range(words))})
+        messages.append({"role": "assistant", "content": f"Answer {i}: " + " ".join(f"a{i}w{k}" for k in range(words))})
+    return messages
+
+def verbatim(message):
+    role = "User" if message["role"] == "user" else "Assistant"
+    return f"{role}: {message['content']}"
+
+def rendered_tokens(history):
+    # render budgets line by line
+    return sum(estimate_tokens(line) for line in history.split("\n"))
+
+def test_short_conversation_is_kept_whole():
+    messages = conversation(1, words=5)
+
+    history = HistoryManager(FakeLLM(), token_ceiling=CEILING).render(messages)
+
+    assert history == "\n".join(verbatim(m) for m in messages)
+
+def test_long_conversation_stays_under_the_ceiling_newest_first():
+    messages = conversation(20)
+
+    lines = HistoryManager(FakeLLM(), token_ceiling=CEILING).render(messages).split("\n")
+
+    assert rendered_tokens("\n".join(lines)) <= CEILING + 1   # " ..." on a clipped line
+    # The newest turns come through word for word; the oldest are dropped
+    assert lines[-KEEP_RECENT:] == [verbatim(m) for m in messages[-KEEP_RECENT:]]
+    assert not any(line.startswith("User: Question 0:") for line in lines)
+
+def test_summary_replaces_older_turns_within_the_budget():
+    messages = conversation(20)
+    ceiling = 2 * CEILING   # room for half a budget of summary plus the KEEP_RECENT tail
+    # A summary longer than the whole budget gets clipped to half of it
+    manager = HistoryManager(FakeLLM(n_tokens=400), token_ceiling=ceiling)
+
+    manager.schedule(messages)
+    manager.future.result()
+    assert manager.summarized == len(messages) - KEEP_RECENT
+
+    lines = manager.render(messages).split("\n")
+    assert lines[0].startswith("Summary of the earlier conversation: word0 word1")
+    assert lines[0].endswith(" ...")
+    assert lines[1:] == [verbatim(m) for m in messages[-KEEP_RECENT:]]
+    assert rendered_tokens("\n".join(lines)) <= ceiling
+
+def test_small_tail_is_not_summarized():
+    messages = conversation(3, words=5)
+    manager = HistoryManager(FakeLLM(), token_ceiling=CEILING)
+
+    manager.schedule(messages)
+
+    assert manager.future is None
+    assert manager.summarized == 0
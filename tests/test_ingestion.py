@@ -0,0 +1,92 @@
+import pytest
+from src import config
+from src.database import delete_source
+from src.ingestion import ChangeTracker, run_pipeline
+from src.journal import CheckpointJournal
+from src.manifest import load_manifest
+from src.uploader import ConcurrentUploader
+from tests.conftest import write_articles
+
+ARTICLES = [
+    {"title": f"Article {i}", "link": f"https://example.org/{i}",
+     "content": " ".join(f"word{i}x{k}" for k in range(300))}
+    for i in range(3)
+]
+
+@pytest.fixture
+def workdir(workdir):
+    write_articles(ARTICLES)
+    return workdir
+
+def count_points(client, source=None):
+    points, _ = client.scroll(config.COLLECTION_NAME, limit=10000, with_payload=True)
+    return sum(1 for p in points if source is None or p.payload["metadata"]["source"] == source)
+
+def test_points_deleted_outside_ingestion_are_uploaded_again(workdir):
+    client = workdir
+    run_pipeline()
+    total = count_points(client)
+    lost = count_points(client, "https://example.org/1")
+    assert lost > 0
+
+    delete_source(client, "https://example.org/1")
+    assert count_points(client) == total - lost
+
+    # The manifest still says the source is unchanged; Qdrant says it is gone
+    run_pipeline()
+    assert count_points(client) == total
+    assert count_points(client, "https://example.org/1") == lost
+
+def test_unchanged_sources_are_not_uploaded_again(workdir, capsys):
+    run_pipeline()
+    capsys.readouterr()
+
+    run_pipeline()
+    out = capsys.readouterr().out
+    assert "Skipped: 3 (Unchanged)" in out
+    assert "Uploaded: 0 new items" in out
+
+def test_interrupted_run_resumes_with_the_remaining_batches(workdir, monkeypatch, capsys):
+    client = workdir
+    # Enough text for a few dozen batches of 10 chunks
+    write_articles([
+        {"title": f"Long {i}", "link": f"https://example.org/long/{i}",
+         "content": " ".join(f"long{i}x{k}" for k in range(3000))}
+        for i in range(4)
+    ])
+    uploaded = []
+    upload_batch = ConcurrentUploader._upload_batch
+    def recording_upload(self, batch, batch_ids):
+        uploaded.extend(batch_ids)
+        return upload_batch(self, batch, batch_ids)
+    monkeypatch.setattr(ConcurrentUploader, "_upload_batch", recording_upload)
+
+    on_batch_done = ChangeTracker.on_batch_done
+    acks = []
+    def interrupt_after_three(self, batch_ids):
+        on_batch_done(self, batch_ids)
+        acks.append(batch_ids)
+        if len(acks) == 3:
+            raise KeyboardInterrupt
+    monkeypatch.setattr(ChangeTracker, "on_batch_done", interrupt_after_three)
+
+    run_pipeline()
+    assert "Interrupted" in capsys.readouterr().out
+    acked = CheckpointJournal().acked
+    assert acked == {pid for batch in acks for pid in batch}
+
+    # Resume: every acknowledged chunk is skipped, everything else is uploaded
+    monkeypatch.setattr(ChangeTracker, "on_batch_done", on_batch_done)
+    first_run = len(uploaded)
+    uploaded.clear()
+    run_pipeline()
+    out = capsys.readouterr().out
+
+    expected = {pid for entry in load_manifest().values() for pid in entry["chunks"]}
+    assert len(expected) > first_run + 10
+    assert set(uploaded) == expected - acked
+    assert len(uploaded) == len(expected - acked)
+    assert count_points(client) == len(expected)
+    assert "Incomplete" not in out
+    # The run completed, so the journal was cleared
+    assert not CheckpointJournal().acked
@@ -0,0 +1,27 @@
+import json
+from src.extractors.json_records import iter_json_records
+
+RECORDS = [{"title": f"Article {i}", "content": "Sri Stuti " * i} for i in range(5)]
+
+def test_torn_last_line_is_skipped(tmp_path, capsys):
+    path = tmp_path / "articles.jsonl"
+    lines = [json.dumps(r, ensure_ascii=False) for r in RECORDS]
+    # The writer crashed halfway through the last record
+    path.write_text("\n".join(lines[:-1]) + "\n" + lines[-1][:15], encoding="utf-8")
+
+    assert list(iter_json_records(path)) == RECORDS[:-1]
+    assert f"Skipping unreadable line {len(RECORDS)} in {path}" in capsys.readouterr().out
+
+def test_torn_line_in_the_middle_keeps_the_rest(tmp_path):
+    path = tmp_path / "articles.jsonl"
+    lines = [json.dumps(r) for r in RECORDS]
+    lines[2] = lines[2][:10]
+    path.write_text("\n".join(lines) + "\n\n", encoding="utf-8")
+
+    assert list(iter_json_records(path)) == RECORDS[:2] + RECORDS[3:]
+
+def test_array_is_read_across_buffer_boundaries(tmp_path):
+    path = tmp_path / "articles.json"
+    path.write_text(json.dumps(RECORDS, indent=4), encoding="utf-8")
+
+    assert list(iter_json_records(path, chunk_size=16)) == RECORDS
@@ -0,0 +1,36 @@
+import pytest
+from src.query_rewrite import needs_rewrite
+
+@pytest.mark.parametrize("question", [
+    # Pronouns pointing back at the previous answer
+    "Can you explain it in more detail please?",
+    "Where did he spend his last years of life?",
+    "What did Swami Desikan say about them in the commentary?",
+    "Which of those pasurams should be recited first?",
+    "Is the latter interpretation accepted by the Acharyas?",
+    # Openers that only make sense after an earlier turn
+    "And what does Thiruppavai say about surrender?",
+    "What about the Kannada translation of the verse?",
+    "Tell me more about the significance of the utsavam",
+    "In Tamil, how is the meaning of this verse explained?",
+    # Too short to stand on their own
+    "Explain that",
+    "Why?",
+    "More details please",
+    "  In Kannada?  ",
+])
+def test_follow_ups_need_a_rewrite(question):
+    assert needs_rewrite(question)
+
+@pytest.mark.parametrize("question", [
+    "Who is Injimedu Azhagiyasingar and where is the ashram?",
+    "What is the meaning of the first pasuram of Thiruppavai?",
+    "Explain the significance of Vaikunta Ekadasi for Sri Vaishnavas",
+    "Which divya desams are associated with Thirumangai Azhwar?",
+    "How should one perform the Sri Stuti parayanam at home?",
+    "What does Sri Ramanuja teach about saranagati in Gadya Trayam?",
+    # "this" and "explain" are common in standalone questions, so they don't count
+    "Explain why this year's Brahmotsavam at Srirangam starts late",
+])
+def test_self_contained_questions_are_searched_as_is(question):
+    assert not needs_rewrite(question)
@@ -0,0 +1,88 @@
+import threading
+import pytest
+from langchain_core.documents import Document
+from src import uploader
+from src.fakes import FakeEmbeddings
+from src.uploader import AIMDLimiter, ConcurrentUploader
+
+class RecordingClient:
+    """
+    Stands in for QdrantClient: remembers every upserted point ID.
+    """
+    def __init__(self):
+        self.ids = []
+        self.lock = threading.Lock()
+
+    def upsert(self, collection_name, points):
+        with self.lock:
+            self.ids.extend(p.id for p in points)
+
+@pytest.fixture(autouse=True)
+def no_backoff_sleep(monkeypatch):
+    # Keep the retry path, skip the jittered wait
+    monkeypatch.setattr(uploader, "backoff_delay", lambda attempt: 0.0)
+
+def make_chunks(n):
+    return [Document(page_content=f"chunk {i}", metadata={"source": "s"}) for i in range(n)]
+
+def make_uploader(embedder, client, **kwargs):
+    return ConcurrentUploader(client, embedder, "test", rpm=100000, tpm=10 ** 9, **kwargs)
+
+def test_scheduled_429s_are_retried_and_everything_is_saved():
+    embedder = FakeEmbeddings(dim=8, fail_calls={1, 2, 3})
+    client = RecordingClient()
+    up = make_uploader(embedder, client, max_concurrency=1, initial_concurrency=1)
+    ids = [f"id{i}" for i in range(30)]
+
+    saved, failed = up.upload(make_chunks(30), ids=ids, batch_size=10)
+
+    assert (saved, failed) == (30, 0)
+    assert sorted(client.ids) == sorted(ids)
+    assert up.throttled == 3
+    # 3 batches + 3 retried calls
+    assert embedder.calls == 6
+
+def test_throttle_halves_concurrency():
+    embedder = FakeEmbeddings(dim=8, fail_calls={1})
+    up = make_uploader(embedder, RecordingClient(), max_concurrency=8, initial_concurrency=4)
+
+    up.upload(make_chunks(1), ids=["a"], batch_size=1)
+
+    assert up.limiter.limit == 2
+
+def test_batch_fails_after_max_retries():
+    embedder = FakeEmbeddings(dim=8, fail_calls={1, 2, 3})
+    client = RecordingClient()
+    up = make_uploader(embedder, client, max_concurrency=1, initial_concurrency=1, max_retries=2)
+
+    saved, failed = up.upload(make_chunks(5), ids=[f"id{i}" for i in range(5)], batch_size=5)
+
+    assert (saved, failed) == (0, 5)
+    assert client.ids == []
+
+def test_non_rate_limit_errors_are_not_retried():
+    class BrokenEmbeddings(FakeEmbeddings):
+        def embed_documents(self, texts, task_type=None):
+            self.calls += 1
+            raise ValueError("bad request")
+
+    embedder = BrokenEmbeddings(dim=8)
+    up = make_uploader(embedder, RecordingClient(), max_concurrency=1, initial_concurrency=1)
+
+    saved, failed = up.upload(make_chunks(3), ids=["a", "b", "c"], batch_size=3)
+
+    assert (saved, failed) == (0, 3)
+    assert embedder.calls == 1
+
+def test_aimd_limiter_additive_increase_multiplicative_decrease():
+    limiter = AIMDLimiter(initial=2, maximum=4, increase_after=3)
+    for _ in range(3):
+        limiter.on_success()
+    assert limiter.limit == 3
+    limiter.on_throttle()
+    assert limiter.limit == 1
+    limiter.on_throttle()
+    assert limiter.limit == 1
+    for _ in range(30):
+        limiter.on_success()
+    assert limiter.limit == 4
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+import pytest
+from src.extractors.wordpress import PoliteClient, crawl
+
+FIXTURES = Path(__file__).parent / "fixtures" / "wordpress"
+
+class FixtureSite:
+    """
+    A local stand-in for the blog: serves the fixture pages over real HTTP.
+    'routes' maps (path, api page or None) to (status, fixture file or None, headers).
+    A request whose If-None-Match matches the route's ETag gets a 304.
+    """
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                page = parse_qs(parts.query).get("page", [None])[0]
+                site.requests.append(parts.path)
+                status, fixture, headers = site.routes.get((parts.path, page), (404, None, {}))
+                if headers.get("ETag") and self.headers.get("If-None-Match") == headers["ETag"]:
+                    status, fixture = 304, None
+                body = b""
+                if fixture:
+                    body = (FIXTURES / fixture).read_text(encoding="utf-8").replace("{base}", site.base).encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def add_html_blog(self):
+        self.routes[("/blog/", None)] = (200, "listing.html", {})
+        self.routes[("/2021/05/sri-stuti/", None)] = (200, "article_sri_stuti.html", {"ETag": '"a1"'})
+        self.routes[("/2021/06/thiruppavai-notes/", None)] = (200, "article_thiruppavai_notes.html", {})
+
+    def add_api(self, page2_status=200):
+        api = "/wp-json/wp/v2/posts"
+        headers = {"Content-Type": "application/json", "X-WP-Total": "2", "X-WP-TotalPages": "2"}
+        self.routes[(api, "1")] = (200, "posts_page1.json", headers)
+        self.routes[(api, "2")] = (page2_status, "posts_page2.json" if page2_status == 200 else None, headers)
+
+@pytest.fixture
+def site():
+    site = FixtureSite()
+    site.thread.start()
+    yield site
+    site.server.shutdown()
+    site.server.server_close()
+
+def run_crawl(site, **kwargs):
+    async def go():
+        http = PoliteClient(min_interval=0)
+        try:
+            return await crawl(f"{site.base}/blog/", max_pages=5, http=http, **kwargs)
+        finally:
+            await http.aclose()
+    return asyncio.run(go())
+
+def by_title(articles):
+    return {a["title"]: a for a in articles}
+
+def test_html_fallback_when_there_is_no_api(site):
+    site.add_html_blog()
+
+    articles = by_title(run_crawl(site))
+
+    assert set(articles) == {"Sri Stuti", "Thiruppavai notes"}
+    stuti = articles["Sri Stuti"]
+    assert stuti["link"] == f"{site.base}/2021/05/sri-stuti/"
+    assert stuti["date"] == "2021-05-02T10:00:00+00:00"
+    assert "Swami Desikan" in stuti["content"]
+    assert "Share this" not in stuti["content"]
+    # Non-post links on the listing are ignored, pagination stops at the 404
+    assert "/about/" not in site.requests
+    assert "/blog/page/2/" in site.requests
+
+def test_rest_api_collects_every_page(site):
+    site.add_api()
+    state = {"articles": {}, "api_modified_after": None}
+
+    articles = by_title(run_crawl(site, state=state))
+
+    assert set(articles) == {"Sri Stuti", "Thiruppavai – notes"}
+    assert "Share this" not in articles["Sri Stuti"]["content"]
+    # modified_gmt is UTC: sent back with an explicit "Z"
+    assert state["api_modified_after"] == "2021-06-11T08:00:00Z"
+    # No HTML was scraped
+    assert "/blog/" not in site.requests
+
+def test_failing_api_page_falls_back_to_html(site):
+    site.add_html_blog()
+    site.add_api(page2_status=500)
+
+    articles = by_title(run_crawl(site))
+
+    assert set(articles) == {"Sri Stuti", "Thiruppavai notes"}
+    assert "/blog/" in site.requests
+
+def test_refresh_only_revalidates_recent_articles(site):
+    site.add_html_blog()
+    previous = run_crawl(site)
+    state = {"articles": {a["link"]: {} for a in previous}, "api_modified_after": None}
+
+    site.requests.clear()
+    run_crawl(site, state=state, previous=previous)
+    # Both fixture posts are from 2021: nothing to re-validate by default
+    assert not [p for p in site.requests if p.startswith("/2021/")]
+
+    site.requests.clear()
+    run_crawl(site, state=state, previous=previous, revalidate_all=True)
+    assert sorted(p for p in site.requests if p.startswith("/2021/")) == [
+        "/2021/05/sri-stuti/", "/2021/06/thiruppavai-notes/",
+    ]
+
+def test_not_modified_article_keeps_the_cached_copy(site):
+    site.add_html_blog()
+    state = {"articles": {}, "api_modified_after": None}
+    previous = run_crawl(site, state=state)
+    assert state["articles"][f"{site.base}/2021/05/sri-stuti/"]["etag"] == '"a1"'
+    for article in previous:
+        article["content"] = f"cached copy of {article['title']}"
+
+    articles = by_title(run_crawl(site, state=state, previous=previous, revalidate_all=True))
+
+    # Sri Stuti answered 304 to its ETag; the other one has no validators and is re-read
+    assert articles["Sri Stuti"]["content"] == "cached copy of Sri Stuti"
+    assert "cached copy" not in articles["Thiruppavai notes"]["content"]
+    assert state["articles"][f"{site.base}/2021/05/sri-stuti/"]["etag"] == '"a1"'
+
+def test_failed_new_article_is_retried_next_crawl(site):
+    site.add_html_blog()
+    notes = "/2021/06/thiruppavai-notes/"
+    site.routes[(notes, None)] = (500, None, {})
+    state = {"articles": {}, "api_modified_after": None}
+    previous = run_crawl(site, state=state)
+    assert set(by_title(previous)) == {"Sri Stuti"}
+    assert state["pending"] == [f"{site.base}{notes}"]
+
+    # The listing no longer shows it, but the pending link is fetched anyway
+    site.routes[("/blog/", None)] = (404, None, {})
+    site.routes[(notes, None)] = (200, "article_thiruppavai_notes.html", {})
+    articles = by_title(run_crawl(site, state=state, previous=previous))
+
+    assert set(articles) == {"Sri Stuti", "Thiruppavai notes"}
+    assert state["pending"] == []
@@ -0,0 +1,19 @@
+from src import config
+from src.lexical_index import LexicalIndex, LEXICAL_INDEX_FILE
+from src.chunk_store import ChunkStore, CHUNK_STORE_DIR
+
+# Rebuilds data/lexical_index.json (and the chunk store) from everything already in Qdrant.
+# Ingestion keeps the index up to date afterwards; run this once for data
+# uploaded before the index existed.
+
+def rebuild():
+    print("🔤 Building lexical index from the collection...")
+    client = config.get_qdrant_client()
+    index = LexicalIndex.from_collection(client)
+    index.save(LEXICAL_INDEX_FILE)
+    print(f"✅ Indexed {len(index)} chunks into '{LEXICAL_INDEX_FILE}'.")
+    count = ChunkStore.write(index.docs, CHUNK_STORE_DIR)
+    print(f"✅ Wrote {count} chunks to '{CHUNK_STORE_DIR}'.")
+
+if __name__ == "__main__":
+    rebuild()
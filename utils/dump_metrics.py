@@ -0,0 +1,48 @@
+import glob
+import json
+import os
+import sys
+import time
+from src.telemetry import METRICS_DIR, SNAPSHOT_INTERVAL
+
+# Prints per-stage p50/p95 from the snapshots each running app / chat / API process
+# writes to data/metrics/<pid>.json (refreshed every few seconds while it serves).
+# Usage: python -m utils.dump_metrics [snapshot.json ...]
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True   # exists, owned by someone else
+    return True
+
+def print_snapshot(data):
+    age = time.time() - data["time"]
+    status = "running" if is_running(data["pid"]) else "exited"
+    print(f"📊 Metrics from pid {data['pid']} ({status}, snapshot {age:.0f}s old)")
+    print("-" * 60)
+    print(f"{'stage':<14}{'count':>8}{'p50 (ms)':>12}{'p95 (ms)':>12}{'mean (ms)':>12}")
+    for stage, s in data["stages"].items():
+        print(f"{stage:<14}{s['count']:>8}{s['p50_ms']:>12.1f}{s['p95_ms']:>12.1f}{s['mean_ms']:>12.1f}")
+    print("-" * 60)
+    print(f"🔢 Tokens: {data['tokens']['prompt_tokens']} prompt / {data['tokens']['completion_tokens']} completion\n")
+
+def main(*paths):
+    paths = paths or sorted(glob.glob(os.path.join(METRICS_DIR, "*.json")))
+    snapshots = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                snapshots.append(json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Skipping '{path}': {e}")
+    if not snapshots:
+        print(f"❌ No metrics yet in '{METRICS_DIR}'. Ask a question first (snapshots land within {SNAPSHOT_INTERVAL}s).")
+        return
+    for data in sorted(snapshots, key=lambda d: d["time"], reverse=True):
+        print_snapshot(data)
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])